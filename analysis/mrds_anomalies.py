@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Flag long-run changes and year-over-year spikes in MRDS clean CSV output.
+
+Runs ``dig-eco anomalies`` (dig_eco.anomaly), also from a source checkout without an install.
+
+Usage:
+  python analysis/mrds_anomalies.py \
+    --input-clean data/processed/mrds_mine_disturbance_long_part_0_of_4_1984_2025_clean.csv
+"""
+
+import sys
+from pathlib import Path
+
+try:
+    from dig_eco.cli import main
+except ImportError:  # running from a source checkout without `pip install -e .`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    from dig_eco.cli import main
+
+if __name__ == "__main__":
+    main(["anomalies", *sys.argv[1:]])
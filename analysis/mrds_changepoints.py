@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Detect step changes (disturbance onsets) in MRDS clean CSV series with PELT.
+
+Same as ``dig-eco changepoints`` (dig_eco.changepoints), for checkouts where the package is not
+installed.
+
+Usage:
+  python analysis/mrds_changepoints.py \
+    --input-clean data/processed/mrds_mine_disturbance_long_part_0_of_4_1984_2025_clean.csv
+"""
+
+import sys
+from pathlib import Path
+
+try:
+    from dig_eco.cli import main
+except ImportError:  # running from a source checkout without `pip install -e .`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    from dig_eco.cli import main
+
+if __name__ == "__main__":
+    main(["changepoints", *sys.argv[1:]])
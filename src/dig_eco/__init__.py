@@ -1,3 +1,11 @@
+"""
+dig-eco: remote-sensing analysis of mining disturbance.
+
+Stages live in submodules (``io``, ``trends``, ``render``, ``anomaly``, ``changepoints``)
+and are run through the ``dig-eco`` command (``dig_eco.cli``). Importing the package loads
+none of them, and none import numpy until they vectorize.
+"""
+
 from .core import hello
 
 __all__ = ["hello"]
@@ -0,0 +1,30 @@
+"""Optional dependencies, imported on first use so the CLI starts without paying for them."""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from functools import cache
+from types import ModuleType
+
+# Below this many series, importing numpy costs more than vectorizing saves; the pure-Python
+# paths produce identical output.
+VECTORIZE_MIN_SERIES = 200
+
+
+@cache
+def optional_import(name: str) -> ModuleType | None:
+    """The named module, or None when it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def numpy() -> ModuleType | None:
+    return optional_import("numpy")
+
+
+def has_numpy() -> bool:
+    """Whether numpy is installed, without importing it."""
+    return importlib.util.find_spec("numpy") is not None
@@ -0,0 +1,266 @@
+"""
+Flag long-run changes and year-over-year spikes in MRDS clean CSV output.
+
+Every (site, buffer, metric) series yields one long-run change (first to last valid year)
+and one spike per consecutive pair of valid years. The largest of each event type are kept
+(bounded top-k heaps, not full sorts) and sites are ranked by how many strong events they
+hold.
+
+Usage:
+  dig-eco anomalies \
+    --input-clean data/processed/mrds_mine_disturbance_long_part_0_of_4_1984_2025_clean.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from ._compat import VECTORIZE_MIN_SERIES, numpy
+from .io import DEFAULT_METRICS, Point, derived_path, read_clean_series, write_csv
+from .trends import pack_series
+
+ANOMALY_FIELDS = [
+    "event_type",
+    "global_rank",
+    "site_name",
+    "site_anomaly_rank",
+    "site_anomaly_score",
+    "buffer_m",
+    "metric",
+    "start_year",
+    "end_year",
+    "n_points",
+    "value_start",
+    "value_end",
+    "delta",
+    "abs_delta",
+    "delta_per_year",
+    "abs_delta_per_year",
+    "notes",
+]
+
+# valid_px_pct is the quality filter and non_mining_soil_pct its complement share; both sit
+# near 100 and would swamp the index-scale spikes, so they are not scanned by default
+ANOMALY_METRICS = [m for m in DEFAULT_METRICS if m not in ("non_mining_soil_pct", "valid_px_pct")]
+
+LONG_RUN = "long_run_change"
+SPIKE = "short_window_spike"
+
+
+@dataclass
+class Changes:
+    """
+    Candidate events of one type, as parallel columns.
+
+    ``group`` indexes the series list; ``start``/``end`` index points within that series.
+    Columns are numpy arrays on the vectorized path, plain lists otherwise.
+    """
+
+    group: Sequence[int]
+    start: Sequence[int]
+    end: Sequence[int]
+    delta: Sequence[float]
+    per_year: Sequence[float]
+
+
+def series_changes(series: list[list[Point]]) -> tuple[Changes, Changes]:
+    """(long-run changes, year-over-year jumps) for every series; each needs >= 2 points."""
+    np = numpy() if len(series) >= VECTORIZE_MIN_SERIES else None
+    if np is not None:
+        years, values, counts = pack_series(series)
+        rows = np.arange(len(series))
+        last = counts - 1
+        long_delta = values[rows, last] - values[:, 0]
+        long_run = Changes(
+            rows,
+            np.zeros(len(series), dtype=np.int64),
+            last,
+            long_delta,
+            long_delta / (years[rows, last] - years[:, 0]),
+        )
+        # row-major nonzero keeps jumps in series then year order, which ties rely on
+        g, j = np.nonzero(np.arange(1, years.shape[1]) < counts[:, None])
+        jump = values[g, j + 1] - values[g, j]
+        return long_run, Changes(g, j, j + 1, jump, jump / (years[g, j + 1] - years[g, j]))
+
+    long_run = Changes([], [], [], [], [])
+    jumps = Changes([], [], [], [], [])
+    for g, pts in enumerate(series):
+        for changes, pairs in (
+            (long_run, [(0, len(pts) - 1)]),
+            (jumps, [(j, j + 1) for j in range(len(pts) - 1)]),
+        ):
+            for i, k in pairs:
+                delta = pts[k].value - pts[i].value
+                changes.group.append(g)
+                changes.start.append(i)
+                changes.end.append(k)
+                changes.delta.append(delta)
+                changes.per_year.append(delta / (pts[k].year - pts[i].year))
+    return long_run, jumps
+
+
+def top_k(scores: Sequence[float], k: int) -> list[int]:
+    """
+    Indices of the ``k`` largest scores, largest first; ties keep input order.
+
+    For numpy arrays the k-th largest score is found by partitioning, so only candidates at
+    or above it reach the heap.
+    """
+    if not isinstance(scores, list):
+        np = numpy()
+        candidates = np.arange(len(scores))
+        if 0 < k < len(scores):
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            candidates = np.flatnonzero(scores >= kth)
+        return heapq.nlargest(k, candidates.tolist(), key=scores.__getitem__)
+    return heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+
+
+def flag_anomalies(
+    keys: list[tuple[str, str, str]],
+    series: list[list[Point]],
+    top_long_run: int,
+    top_spikes: int,
+    top_sites: int | None = None,
+    notes: str = "",
+) -> list[dict[str, object]]:
+    """
+    Top-k long-run changes (by |delta|) and spikes (by |delta| per year), with site ranks.
+
+    An event at global rank r among the k kept for its type earns k + 1 - r points; a site's
+    anomaly score is the sum over its events. Rows are ordered by site rank, event type and
+    global rank; ``top_sites`` keeps only the highest-scoring sites.
+    """
+    long_run, jumps = series_changes(series)
+    ranked: list[tuple[str, Changes, list[int], int]] = []
+    for event_type, changes, by_per_year, k in (
+        (LONG_RUN, long_run, False, top_long_run),
+        (SPIKE, jumps, True, top_spikes),
+    ):
+        column = changes.per_year if by_per_year else changes.delta
+        magnitude = [abs(v) for v in column] if isinstance(column, list) else abs(column)
+        ranked.append((event_type, changes, top_k(magnitude, k), k))
+
+    scores: dict[str, float] = defaultdict(float)
+    for _, changes, picked, k in ranked:
+        for rank, i in enumerate(picked, start=1):
+            scores[keys[int(changes.group[i])][0]] += k + 1 - rank
+    best = heapq.nlargest(top_sites or len(scores), scores.items(), key=lambda kv: kv[1])
+    site_rank = {site: rank for rank, (site, _) in enumerate(best, start=1)}
+
+    rows: list[dict[str, object]] = []
+    for event_type, changes, picked, _ in ranked:
+        for rank, i in enumerate(picked, start=1):
+            g = int(changes.group[i])
+            site_name, buffer_m, metric = keys[g]
+            if site_name not in site_rank:
+                continue
+            pts = series[g]
+            p0, p1 = pts[int(changes.start[i])], pts[int(changes.end[i])]
+            delta = float(changes.delta[i])
+            per_year = float(changes.per_year[i])
+            rows.append(
+                {
+                    "event_type": event_type,
+                    "global_rank": rank,
+                    "site_name": site_name,
+                    "site_anomaly_rank": site_rank[site_name],
+                    "site_anomaly_score": scores[site_name],
+                    "buffer_m": buffer_m,
+                    "metric": metric,
+                    "start_year": p0.year,
+                    "end_year": p1.year,
+                    "n_points": len(pts),
+                    "value_start": p0.value,
+                    "value_end": p1.value,
+                    "delta": delta,
+                    "abs_delta": abs(delta),
+                    "delta_per_year": per_year,
+                    # only spikes are ranked per year; long-run rows leave it blank
+                    "abs_delta_per_year": abs(per_year) if event_type == SPIKE else "",
+                    "notes": notes,
+                }
+            )
+    event_order = {LONG_RUN: 0, SPIKE: 1}
+    rows.sort(
+        key=lambda r: (r["site_anomaly_rank"], event_order[str(r["event_type"])], r["global_rank"])
+    )
+    return rows
+
+
+def add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--min-valid-px",
+        type=float,
+        default=70.0,
+        help="Drop site-years whose valid_px_pct is below this (default: 70.0).",
+    )
+    parser.add_argument(
+        "--top-long-run", type=int, default=40, help="Long-run changes kept (default: 40)."
+    )
+    parser.add_argument(
+        "--top-spikes", type=int, default=60, help="Year-over-year spikes kept (default: 60)."
+    )
+    parser.add_argument(
+        "--top-sites",
+        type=int,
+        default=None,
+        help="Only report events of the N highest-scoring sites (default: all).",
+    )
+
+
+def flag_series(
+    keys: list[tuple[str, str, str]], series: list[list[Point]], args: argparse.Namespace
+) -> list[dict[str, object]]:
+    """``flag_anomalies`` with the ``add_scan_arguments`` options."""
+    return flag_anomalies(
+        keys,
+        series,
+        args.top_long_run,
+        args.top_spikes,
+        args.top_sites,
+        notes=f"min_valid_px>={args.min_valid_px}",
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco anomalies", description="Flag anomalies in MRDS clean CSV."
+    )
+    parser.add_argument("--input-clean", required=True, help="Clean CSV from dig-eco trends")
+    parser.add_argument(
+        "--out",
+        default=None,
+        help="Output CSV path. Default: <input base>_anomaly_flags.csv",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=",".join(ANOMALY_METRICS),
+        help="Comma-separated metric columns to scan.",
+    )
+    add_scan_arguments(parser)
+    args = parser.parse_args(argv)
+
+    input_path = Path(args.input_clean)
+    out_path = Path(args.out) if args.out else derived_path(input_path, "anomaly_flags")
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+
+    try:
+        keys, series = read_clean_series(input_path, metrics, args.min_valid_px)
+    except ValueError as e:
+        parser.error(str(e))
+    rows = flag_series(keys, series, args)
+    write_csv(out_path, rows, ANOMALY_FIELDS)
+
+    print(f"Series scanned: {len(series)}")
+    print(f"Anomaly rows written: {len(rows)} -> {out_path}")
+
+
+if __name__ == "__main__":
+    main()
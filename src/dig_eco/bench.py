@@ -0,0 +1,416 @@
+"""
+Stage benchmarks on synthetic GEE exports.
+
+A generated export has the raw GEE schema (every export column, including the quoted ``.geo``
+geometry) for sites x buffers x years, with as many metric columns as asked for, split into
+``_part_<i>_of_<n>`` partitions like a sharded export. Each stage of the trend and plot
+pipelines is timed on its own (best of ``--repeat`` runs):
+
+  parse    raw partitions -> clean table         (io.read_partitions)
+  group    sorted table -> per-series points     (CleanTable.sorted, trends.group_series)
+  fit      per-series trend summaries            (trends.summarize_all)
+  write    clean CSV, its column cache, summary  (io.write_table_csv, io.write_csv)
+  render   chart canvases for --charts series    (render.render_series)
+  encode   PNG encoding of those canvases        (Canvas.save_png)
+
+Results can be saved as a JSON baseline; later runs with the same parameters fail when a stage
+is more than ``--max-slowdown`` times slower than its baseline. A baseline records the git
+revision it was measured on (``-dirty`` with uncommitted changes), so a stale one shows.
+
+Usage:
+  dig-eco bench --baseline benchmarks/baseline.json
+  dig-eco bench --sites 200 --partitions 8 --baseline benchmarks/baseline.json --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .io import (
+    DEFAULT_METRICS,
+    CleanTable,
+    Point,
+    read_partitions,
+    write_csv,
+    write_table_cache,
+    write_table_csv,
+)
+from .render import Canvas, PngOptions, render_series
+from .trends import SUMMARY_FIELDS, group_series, summarize_all, theil_sen_slope
+
+# Column order of a raw GEE export; metric columns beyond DEFAULT_METRICS go before ``.geo``.
+EXPORT_COLUMNS = [
+    "system:index",
+    "area_bare_ha",
+    "area_sparse_ha",
+    "area_total_ha",
+    "area_veg_ha",
+    "bare_pct",
+    "buffer_m",
+    "commodities",
+    "end_date",
+    "image_count",
+    "mean_bsi",
+    "mean_ndbi",
+    "mean_ndmi",
+    "mean_ndti",
+    "mean_ndvi",
+    "mean_savi",
+    "median_ndvi",
+    "mining_soil_pct",
+    "ndvi_sd",
+    "non_mining_soil_pct",
+    "prod_stage",
+    "qa_flag",
+    "site_buffer_key",
+    "site_id",
+    "site_name",
+    "site_year_key",
+    "start_date",
+    "topo_correction_applied",
+    "valid_px_pct",
+    "year",
+]
+
+STAGES = ["parse", "group", "fit", "write", "render", "encode"]
+
+BASELINE_VERSION = 1
+
+# Stages faster than this are too noisy to compare against a baseline.
+NOISE_FLOOR_S = 0.005
+
+
+def synthetic_metrics(n_metrics: int) -> list[str]:
+    """The first ``n_metrics`` of DEFAULT_METRICS, then ``synthetic_metric_<i>`` columns."""
+    extra = [f"synthetic_metric_{i}" for i in range(max(0, n_metrics - len(DEFAULT_METRICS)))]
+    return [*DEFAULT_METRICS[:n_metrics], *extra]
+
+
+def _metric_value(metric: str, base: float, t: float, stepped: bool, rng: random.Random) -> float:
+    """Trend plus noise on the scale of the metric (index, percent, or generic)."""
+    if metric.endswith("_pct"):
+        return min(100.0, max(0.0, base * 100 + 20 * t + (15 if stepped else 0) + rng.gauss(0, 3)))
+    return base + 0.2 * t - (0.15 if stepped else 0) + rng.gauss(0, 0.03)
+
+
+def write_synthetic_export(
+    outdir: Path,
+    sites: int,
+    years: tuple[int, int],
+    n_metrics: int,
+    partitions: int = 1,
+    buffers: tuple[str, ...] = ("1000", "5000"),
+    seed: int = 0,
+) -> list[Path]:
+    """
+    Write a synthetic raw export and return its partition paths.
+
+    Sites are dealt round-robin to partitions. Each series is a linear trend with noise, a step
+    (disturbance onset) in about a third of the series, and ~3% blank values.
+    """
+    rng = random.Random(seed)
+    metrics = synthetic_metrics(n_metrics)
+    columns = [*EXPORT_COLUMNS, *metrics[len(DEFAULT_METRICS) :], ".geo"]
+    y0, y1 = years
+    if partitions > 1:
+        names = [f"synthetic_part_{k}_of_{partitions}_{y0}_{y1}.csv" for k in range(partitions)]
+    else:
+        names = [f"synthetic_{y0}_{y1}.csv"]
+    paths = [outdir / name for name in names]
+    outdir.mkdir(parents=True, exist_ok=True)
+    files = [p.open("w", newline="", encoding="utf-8") for p in paths]
+    try:
+        writers = [csv.writer(f, lineterminator="\n") for f in files]
+        for w in writers:
+            w.writerow(columns)
+        for s in range(sites):
+            site_id = f"{s:020x}"
+            site_name = f"Synthetic Mine {s:04d}"
+            lon, lat = rng.uniform(-90, -83), rng.uniform(12, 16)
+            coords = ",".join(
+                f"[{lon + rng.uniform(-0.05, 0.05)},{lat + rng.uniform(-0.05, 0.05)}]"
+                for _ in range(12)
+            )
+            geo = f'{{"type":"MultiPoint","coordinates":[{coords}]}}'
+            w = writers[s % len(writers)]
+            for buffer_m in buffers:
+                area_total = math.pi * float(buffer_m) ** 2 / 1e4
+                shape = {m: (rng.uniform(0.1, 0.6), rng.uniform(-1, 1)) for m in metrics}
+                onset = rng.randint(y0, y1) if rng.random() < 1 / 3 else None
+                for year in range(y0, y1 + 1):
+                    stepped = onset is not None and year >= onset
+                    values = {}
+                    for m, (base, slope) in shape.items():
+                        t = slope * (year - y0) / max(1, y1 - y0)
+                        v = _metric_value(m, base, t, stepped, rng)
+                        values[m] = "" if rng.random() < 0.03 else repr(v)
+                    bare = float(values.get("bare_pct") or 0.0)
+                    row = {
+                        "system:index": f"{s}_{buffer_m}_{year}_{site_id}",
+                        "area_bare_ha": repr(area_total * bare / 100),
+                        "area_sparse_ha": repr(area_total * rng.uniform(0, 0.1)),
+                        "area_total_ha": repr(area_total),
+                        "area_veg_ha": repr(area_total * (1 - bare / 100) * 0.95),
+                        "buffer_m": buffer_m,
+                        "commodities": "unknown",
+                        "end_date": f"{year + 1}-05-01",
+                        "image_count": rng.randint(1, 12),
+                        "median_ndvi": repr(rng.uniform(0.1, 0.7)),
+                        "ndvi_sd": repr(rng.uniform(0.02, 0.1)),
+                        "prod_stage": "unknown",
+                        "qa_flag": "ok",
+                        "site_buffer_key": f"{site_name}_{site_id}_{buffer_m}",
+                        "site_id": f"{site_name}_{site_id}",
+                        "site_name": site_name,
+                        "site_year_key": f"{site_name}_{site_id}_{year}.0",
+                        "start_date": f"{year}-11-01",
+                        "topo_correction_applied": "false",
+                        "year": f"{year}.0",
+                        ".geo": geo,
+                        **values,
+                    }
+                    w.writerow([row.get(c, "") for c in columns])
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> tuple[float, object]:
+    """Fastest of ``repeat`` runs in seconds, and the result of the last run."""
+    best, result = math.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_stages(
+    paths: list[Path],
+    metrics: list[str],
+    workdir: Path,
+    repeat: int = 3,
+    charts: int = 20,
+    engine: str = "auto",
+    workers: int = 1,
+) -> dict[str, float]:
+    """Seconds per stage (best of ``repeat``), each stage fed the previous stage's output."""
+    timings: dict[str, float] = {}
+    timings["parse"], (_, table) = best_time(
+        lambda: read_partitions(paths, metrics, workers), repeat
+    )
+
+    def group() -> tuple[CleanTable, tuple[list[tuple[str, str, str]], list[list[Point]]]]:
+        ordered = table.sorted()
+        return ordered, group_series(ordered, metrics)
+
+    timings["group"], (table, (keys, series)) = best_time(group, repeat)
+    timings["fit"], summary_rows = best_time(
+        lambda: summarize_all(keys, series, 8, theil_sen_slope, engine), repeat
+    )
+
+    def write() -> None:
+        write_table_csv(workdir / "bench_clean.csv", table)
+        write_table_cache(workdir / "bench_clean.csv", table)
+        write_csv(workdir / "bench_trend_summary.csv", summary_rows, SUMMARY_FIELDS)
+
+    timings["write"], _ = best_time(write, repeat)
+
+    chosen = [(key, pts) for key, pts in zip(keys, series, strict=True) if len(pts) >= 2]
+    chosen = chosen[:charts]
+
+    def render() -> list[Canvas | None]:
+        return [
+            render_series(pts, " | ".join(key), "Year", f"Value ({key[2]})") for key, pts in chosen
+        ]
+
+    timings["render"], canvases = best_time(render, repeat)
+    canvases = [c for c in canvases if c is not None]
+
+    def encode() -> None:
+        for i, canvas in enumerate(canvases):
+            canvas.save_png(workdir / f"bench_{i}.png", PngOptions())
+
+    timings["encode"], _ = best_time(encode, repeat)
+    return timings
+
+
+def load_baseline(path: Path) -> dict[str, object] | None:
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    return data if data.get("version") == BASELINE_VERSION else None
+
+
+def source_revision() -> str | None:
+    """``git describe`` of the checkout this package runs from, or None outside one."""
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def save_baseline(path: Path, params: dict[str, object], timings: dict[str, float]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": BASELINE_VERSION,
+        "params": params,
+        "python": sys.version.split()[0],
+        "revision": source_revision(),
+        "stages": timings,
+    }
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def regressions(
+    timings: dict[str, float], baseline: dict[str, float], max_slowdown: float
+) -> list[str]:
+    """Stages slower than ``max_slowdown`` x their baseline (ignoring sub-noise-floor times)."""
+    slow = []
+    for stage, seconds in timings.items():
+        base = baseline.get(stage)
+        if base is None or max(seconds, base) < NOISE_FLOOR_S:
+            continue
+        if seconds > max_slowdown * base:
+            slow.append(stage)
+    return slow
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco bench",
+        description="Time each trend and plot stage on a synthetic GEE export.",
+    )
+    parser.add_argument("--sites", type=int, default=50, help="Synthetic sites (default: 50).")
+    parser.add_argument(
+        "--buffers", default="1000,5000", help="Comma-separated buffer radii in metres."
+    )
+    parser.add_argument(
+        "--years", default="1984-2025", help="Year span as START-END (default: 1984-2025)."
+    )
+    parser.add_argument(
+        "--metrics",
+        type=int,
+        default=len(DEFAULT_METRICS),
+        help=f"Metric columns to generate and fit (default: {len(DEFAULT_METRICS)}).",
+    )
+    parser.add_argument(
+        "--partitions", type=int, default=4, help="Export partition files (default: 4)."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed (default: 0).")
+    parser.add_argument(
+        "--charts", type=int, default=20, help="Series rendered and encoded (default: 20)."
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "batch", "python"],
+        default="auto",
+        help="Trend engine for the fit stage (default: auto).",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per stage; the fastest counts (default: 3)."
+    )
+    parser.add_argument(
+        "--baseline", default=None, help="Baseline JSON to compare against (or to save)."
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write this run's timings to --baseline instead of comparing.",
+    )
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=1.5,
+        help="Fail when a stage takes more than this multiple of its baseline (default: 1.5).",
+    )
+    parser.add_argument(
+        "--keep",
+        default=None,
+        help="Directory to write the synthetic export and outputs to, kept after the run.",
+    )
+    args = parser.parse_args(argv)
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline needs --baseline.")
+
+    start, end = (int(y) for y in args.years.split("-"))
+    buffers = tuple(b.strip() for b in args.buffers.split(",") if b.strip())
+    metrics = synthetic_metrics(args.metrics)
+    params: dict[str, object] = {
+        "sites": args.sites,
+        "buffers": list(buffers),
+        "years": [start, end],
+        "metrics": args.metrics,
+        "partitions": args.partitions,
+        "seed": args.seed,
+        "charts": args.charts,
+        "engine": args.engine,
+    }
+
+    baseline_path = Path(args.baseline) if args.baseline else None
+    baseline = None
+    if baseline_path is not None and not args.save_baseline:
+        baseline = load_baseline(baseline_path)
+        if baseline is not None and baseline["params"] != params:
+            parser.error(
+                f"{baseline_path} was recorded with other parameters; "
+                "rerun them or pass --save-baseline."
+            )
+
+    with tempfile.TemporaryDirectory(prefix="dig-eco-bench-") as tmp:
+        workdir = Path(args.keep) if args.keep else Path(tmp)
+        paths = write_synthetic_export(
+            workdir, args.sites, (start, end), args.metrics, args.partitions, buffers, args.seed
+        )
+        timings = run_stages(paths, metrics, workdir, args.repeat, args.charts, args.engine)
+
+    n_rows = args.sites * len(buffers) * (end - start + 1)
+    print(f"Synthetic export: {n_rows} rows, {len(metrics)} metrics, {len(paths)} file(s)")
+    if baseline is not None:
+        revision = baseline.get("revision") or "unknown revision"
+        print(f"Baseline: {baseline_path} ({revision}, Python {baseline['python']})")
+    print(f"{'stage':<8}{'seconds':>10}{'baseline':>10}{'ratio':>8}")
+    base_stages: dict[str, float] = baseline["stages"] if baseline else {}
+    for stage in STAGES:
+        seconds = timings[stage]
+        base = base_stages.get(stage)
+        if base:
+            print(f"{stage:<8}{seconds:>10.4f}{base:>10.4f}{seconds / base:>8.2f}")
+        else:
+            print(f"{stage:<8}{seconds:>10.4f}{'-':>10}{'-':>8}")
+
+    if args.save_baseline:
+        save_baseline(baseline_path, params, timings)
+        print(f"Baseline saved: {baseline_path}")
+    elif baseline is not None:
+        slow = regressions(timings, base_stages, args.max_slowdown)
+        if slow:
+            parser.exit(
+                1,
+                f"Slower than {args.max_slowdown}x baseline: {', '.join(slow)}\n",
+            )
+
+
+if __name__ == "__main__":
+    main()
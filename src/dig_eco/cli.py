@@ -0,0 +1,42 @@
+"""
+``dig-eco`` command line: one subcommand per pipeline stage.
+
+Stage modules are imported only once their subcommand is chosen, and numpy only when a
+stage vectorizes, so ``dig-eco --help`` and small runs start quickly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+
+# subcommand -> (module with main(argv), one-line help)
+COMMANDS = {
+    "trends": ("dig_eco.trends", "Clean GEE exports and summarize per-series trends."),
+    "dedup": ("dig_eco.dedup", "Report and resolve duplicate site-years across exports."),
+    "plot": ("dig_eco.render", "Render PNG trend charts from a clean CSV."),
+    "anomalies": ("dig_eco.anomaly", "Flag long-run changes and year-over-year spikes."),
+    "changepoints": ("dig_eco.changepoints", "Detect step changes (disturbance onsets)."),
+    "pipeline": ("dig_eco.pipeline", "Run trends, anomalies and plots in one process."),
+    "index": ("dig_eco.siteindex", "Build per-site byte-offset indexes of exports."),
+    "db": ("dig_eco.store", "Ingest exports into SQLite and fit trends over subsets."),
+    "bench": ("dig_eco.bench", "Time each stage on a synthetic export against a baseline."),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    listing = "\n".join(f"  {name:<14}{text}" for name, (_, text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="dig-eco",
+        usage="dig-eco [-h] COMMAND [ARGS ...]",
+        description="Remote-sensing analysis of mining disturbance around MRDS sites.",
+        epilog=f"commands:\n{listing}\n\nRun 'dig-eco COMMAND --help' for its options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="COMMAND", help="stage to run")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    module, _ = COMMANDS[args.command]
+    importlib.import_module(module).main(args.args)
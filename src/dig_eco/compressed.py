@@ -0,0 +1,158 @@
+"""
+Transparent gzip, bz2, xz and zstd CSV input and output.
+
+Inputs are recognized by their magic bytes, whatever their names, and decompressed by a
+background thread a few chunks ahead of the parser; the codecs release the GIL, so
+decompression overlaps parsing. Outputs are compressed by suffix (``.gz``, ``.bz2``, ``.xz``,
+``.zst``). zstd needs the optional ``zstandard`` package (or Python 3.14's
+``compression.zstd``); the other codecs are in the standard library.
+"""
+
+from __future__ import annotations
+
+import io
+import queue
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import BinaryIO, TextIO
+
+from ._compat import optional_import
+
+# format -> leading bytes of a file in that format
+MAGIC = {
+    "gz": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zst": b"\x28\xb5\x2f\xfd",
+}
+
+FORMATS = list(MAGIC)
+
+# Decompressed bytes per queued chunk, and chunks decompressed ahead of the parser.
+CHUNK_BYTES = 1 << 20
+READ_AHEAD_CHUNKS = 8
+
+
+def detect(path: Path) -> str | None:
+    """Compression format of a file from its first bytes, or None for plain text."""
+    with path.open("rb") as f:
+        head = f.read(6)
+    return next((fmt for fmt, magic in MAGIC.items() if head.startswith(magic)), None)
+
+
+def suffix_format(path: Path) -> str | None:
+    """Compression format named by a path's last suffix, or None."""
+    fmt = path.suffix.lstrip(".")
+    return fmt if fmt in MAGIC else None
+
+
+def strip_suffix(path: Path) -> Path:
+    """``x.csv.gz`` -> ``x.csv``; paths without a compression suffix are returned as is."""
+    return path.with_suffix("") if suffix_format(path) else path
+
+
+def with_format(path: Path, fmt: str | None) -> Path:
+    """``path`` with a ``.<fmt>`` suffix added, unless it has a compression suffix already."""
+    if fmt is None or suffix_format(path):
+        return path
+    return path.with_name(f"{path.name}.{fmt}")
+
+
+def codec(fmt: str) -> ModuleType:
+    """Module whose ``open`` reads and writes ``fmt`` files."""
+    name = {"gz": "gzip", "bz2": "bz2", "xz": "lzma"}.get(fmt)
+    if name is not None:
+        return optional_import(name)
+    module = optional_import("compression.zstd") or optional_import("zstandard")
+    if module is None:
+        raise RuntimeError("zstd files require zstandard (pip install zstandard).")
+    return module
+
+
+def check_codecs(paths: list[Path | None]) -> None:
+    """Import the codec of every compressed output up front; RuntimeError if one is missing."""
+    for path in paths:
+        fmt = path and suffix_format(path)
+        if fmt:
+            codec(fmt)
+
+
+class ReadAhead(io.RawIOBase):
+    """Binary stream over ``source`` whose reads are served by a background reader thread."""
+
+    def __init__(self, source: BinaryIO) -> None:
+        super().__init__()
+        self._source = source
+        self._chunks: queue.Queue[bytes | BaseException] = queue.Queue(READ_AHEAD_CHUNKS)
+        self._stop = threading.Event()
+        self._view = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, name="dig-eco-read-ahead", daemon=True)
+        self._thread.start()
+
+    def _fill(self) -> None:
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(CHUNK_BYTES)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except BaseException as e:  # raised again in the reading thread
+            self._put(e)
+
+    def _put(self, item: bytes | BaseException) -> None:
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        while not self._view:
+            if self._eof:
+                return 0
+            item = self._chunks.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._view = memoryview(item)
+        n = min(len(buffer), len(self._view))
+        buffer[:n] = self._view[:n]
+        self._view = self._view[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._source.close()
+        super().close()
+
+
+def open_text(path: Path) -> TextIO:
+    """Open a CSV for reading as text, decompressing it ahead of the reader if compressed."""
+    fmt = detect(path)
+    if fmt is None:
+        return path.open(newline="", encoding="utf-8")
+    raw = ReadAhead(codec(fmt).open(path, "rb"))
+    return io.TextIOWrapper(io.BufferedReader(raw, 1 << 16), encoding="utf-8", newline="")
+
+
+def open_text_out(path: Path) -> TextIO:
+    """Open a CSV for writing as text, compressed in the format its suffix names."""
+    fmt = suffix_format(path)
+    if fmt is None:
+        return path.open("w", newline="", encoding="utf-8")
+    if fmt == "gz":
+        # level 6 and a zero timestamp: quick, and the same rows give the same bytes
+        raw = codec(fmt).GzipFile(path, "wb", compresslevel=6, mtime=0)
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return codec(fmt).open(path, "wt", encoding="utf-8", newline="")
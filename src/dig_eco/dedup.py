@@ -0,0 +1,196 @@
+"""
+Resolve duplicate site-years across overlapping GEE exports.
+
+Partition reruns, ``exportPerYear`` exports and the fast and slow script variants can export
+the same (site_year_key, buffer_m) more than once, and every copy would otherwise enter the
+fits. ``resolve`` streams the key columns of the exports once and keeps one row per key:
+
+  latest        the row from the most recently modified file
+  image_count   the row with the most images in its composite
+  valid_px_pct  the row with the largest share of valid pixels
+
+Ties, and blanks on both sides, go to the later file, then the later row. Memory grows with the
+distinct keys and the dropped rows, not with the rows read: each key holds only where its current
+winner is, and only the positions of dropped rows are kept, for the skip sets and the report.
+Keys fall back to ``<site_id>_<year>`` (or the site name) when an export has no
+``site_year_key`` column, as in the store.
+
+Usage:
+  dig-eco dedup "gee/groundwork/MRDSoutputs/*.csv" --prefer image_count
+  dig-eco trends --input "gee/groundwork/MRDSoutputs/*.csv" --dedup latest
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .instrument import add_profile_argument, enable, stage
+from .io import (
+    add_subset_arguments,
+    comma_list,
+    expand_inputs,
+    export_records,
+    merged_base,
+    parse_float,
+    parse_year,
+    write_csv,
+)
+
+POLICIES = ["latest", "image_count", "valid_px_pct"]
+
+DEDUP_COLUMNS = ["site_year_key", "site_id", "site_name", "buffer_m", "year"]
+
+CONFLICT_FIELDS = [
+    "site_year_key",
+    "buffer_m",
+    "source",
+    "row",
+    "image_count",
+    "valid_px_pct",
+    "kept",
+]
+
+
+# (key, file index, row, image_count, valid_px_pct) of one candidate row
+Candidate = tuple[tuple[str, str], int, int, int | None, float | None]
+
+
+@dataclass
+class Resolution:
+    """Outcome of ``resolve``: per input file, the row positions to skip, plus the conflicts."""
+
+    paths: list[Path]
+    rows: int = 0
+    keys: int = 0
+    skips: list[set[int]] = field(default_factory=list)
+    kept: list[Candidate] = field(default_factory=list)
+    dropped: list[Candidate] = field(default_factory=list)
+
+    def report_rows(self) -> list[dict[str, object]]:
+        """Every row of a duplicated key, grouped by key, with whether it was kept."""
+        candidates = [(c, True) for c in self.kept] + [(c, False) for c in self.dropped]
+        candidates.sort(key=lambda item: (item[0][0], item[0][1], item[0][2]))
+        return [
+            {
+                "site_year_key": key[0],
+                "buffer_m": key[1],
+                "source": str(self.paths[file]),
+                "row": row,
+                "image_count": "" if count is None else count,
+                "valid_px_pct": "" if valid is None else valid,
+                "kept": "yes" if kept else "no",
+            }
+            for (key, file, row, count, valid), kept in candidates
+        ]
+
+
+def _score(value: float | None) -> float:
+    return -math.inf if value is None else value
+
+
+def resolve(
+    paths: list[Path],
+    prefer: str = "latest",
+    sites: list[str] | None = None,
+    buffers: list[str] | None = None,
+) -> Resolution:
+    """
+    Pick one row per (site_year_key, buffer_m) across ``paths``, read in input order.
+
+    Row positions count every record of a read, as ``read_clean_table`` does, so
+    ``Resolution.skips`` can be passed straight to ``read_partitions``; ``sites`` and
+    ``buffers`` must match that read's.
+    """
+    if prefer not in POLICIES:
+        raise ValueError(f"Unknown dedup policy: {prefer} (expected one of {', '.join(POLICIES)})")
+    result = Resolution(list(paths), skips=[set() for _ in paths])
+    # key -> (rank, candidate) of the row currently kept for it
+    best: dict[tuple[str, str], tuple[tuple, Candidate]] = {}
+    duplicated: set[tuple[str, str]] = set()
+    with stage("dedup", policy=prefer) as record:
+        for file, path in enumerate(paths):
+            mtime = path.stat().st_mtime_ns
+            columns = [*DEDUP_COLUMNS, "image_count", "valid_px_pct"]
+            for row, values in enumerate(export_records(path, columns, sites, buffers)):
+                result.rows += 1
+                year_key, site_id, site_name, buffer_m, year, count, valid = values
+                site_name, buffer_m = (site_name or "").strip(), (buffer_m or "").strip()
+                year = parse_year(year)
+                if year is None or site_name == "" or buffer_m == "":
+                    continue  # dropped by cleaning anyway
+                site = (site_id or "").strip() or site_name
+                key = ((year_key or "").strip() or f"{site}_{year}", buffer_m)
+                count, valid = parse_year(count), parse_float(valid)
+                if prefer == "image_count":
+                    primary = _score(count)
+                elif prefer == "valid_px_pct":
+                    primary = _score(valid)
+                else:
+                    primary = mtime
+                entry = ((primary, mtime, file, row), (key, file, row, count, valid))
+                old = best.setdefault(key, entry)
+                if old is entry:
+                    continue
+                duplicated.add(key)
+                if entry[0] > old[0]:
+                    best[key], entry = entry, old
+                loser = entry[1]
+                result.dropped.append(loser)
+                result.skips[loser[1]].add(loser[2])
+        result.keys = len(best)
+        result.kept = [best[key][1] for key in duplicated]
+        record.items = result.rows
+        record.fields["dropped"] = len(result.dropped)
+    return result
+
+
+def add_dedup_arguments(
+    parser: argparse.ArgumentParser, flag: str = "--dedup", default: str | None = None
+) -> None:
+    parser.add_argument(
+        flag,
+        dest="dedup",
+        choices=POLICIES,
+        default=default,
+        help="Keep one row per (site_year_key, buffer_m): from the latest file, or with the "
+        "highest image_count or valid_px_pct"
+        + (f" (default: {default})." if default else "; off by default."),
+    )
+    parser.add_argument(
+        "--conflicts-out",
+        default=None,
+        help="Conflict report CSV listing every row of a duplicated site-year.",
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco dedup",
+        description="Report duplicate site-years across overlapping exports and how they resolve.",
+    )
+    parser.add_argument("input", nargs="+", help="Export CSVs or glob patterns.")
+    add_dedup_arguments(parser, "--prefer", default="latest")
+    add_subset_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(args.profile)
+
+    paths = expand_inputs(args.input)
+    result = resolve(paths, args.dedup, comma_list(args.site), comma_list(args.buffer))
+    try:
+        report = Path(args.conflicts_out or f"{merged_base(paths)}_conflicts.csv")
+    except ValueError:
+        parser.error("Inputs do not share a partition base name; pass --conflicts-out.")
+    write_csv(report, result.report_rows(), CONFLICT_FIELDS)
+    print(f"Input rows: {result.rows} in {len(paths)} files")
+    print(f"Distinct site-years: {result.keys} ({len(result.kept)} duplicated)")
+    print(f"Rows dropped ({args.dedup}): {len(result.dropped)}")
+    print(f"Conflict report: {report}")
+
+
+if __name__ == "__main__":
+    main()
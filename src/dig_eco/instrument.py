@@ -0,0 +1,129 @@
+"""
+Per-stage timing records, written as JSON lines when profiling is on.
+
+Profiling is enabled by a stage's ``--profile PATH`` option or the ``DIG_ECO_PROFILE=PATH``
+environment variable. Each finished stage appends one line::
+
+  {"run": ..., "pid": ..., "stage": "fit", "wall_s": ..., "cpu_s": ..., "peak_rss_mb": ...,
+   "items": ..., ...}
+
+``cpu_s`` is CPU time of the recording process and ``peak_rss_mb`` its high-water RSS so far.
+Pool workers inherit the environment and append to the same file under the same ``run`` id.
+When profiling is off, ``stage`` costs one flag check.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ._compat import optional_import
+
+PROFILE_ENV = "DIG_ECO_PROFILE"
+RUN_ENV = "DIG_ECO_PROFILE_RUN"
+
+
+def enable(path: str | Path) -> None:
+    """Profile this process, and pool workers started after this call, into ``path``."""
+    os.environ[PROFILE_ENV] = str(path)
+    os.environ.setdefault(RUN_ENV, uuid.uuid4().hex[:12])
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="PATH",
+        help=f"Append per-stage timing records to PATH as JSON lines (or set {PROFILE_ENV}).",
+    )
+
+
+def enabled() -> bool:
+    return bool(os.environ.get(PROFILE_ENV))
+
+
+def peak_rss_mb() -> float | None:
+    """High-water resident set size of this process, or None without the resource module."""
+    resource = optional_import("resource")
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class Lap:
+    """Time accumulated over repeated ``with lap:`` blocks inside a stage."""
+
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    _start: tuple[float, float] = (0.0, 0.0)
+
+    def __enter__(self) -> Lap:
+        self._start = (time.perf_counter(), time.process_time())
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.wall_s += time.perf_counter() - self._start[0]
+        self.cpu_s += time.process_time() - self._start[1]
+
+
+@dataclass
+class StageRecord:
+    """Fields of a running stage; set ``items`` (and any extra fields) before it ends."""
+
+    name: str
+    fields: dict[str, object]
+    items: int | None = None
+    excluded: list[Lap] = field(default_factory=list)
+
+    def exclude(self, lap: Lap) -> None:
+        """Leave time spent in ``lap`` out of this stage (it is reported as its own stage)."""
+        self.excluded.append(lap)
+
+
+def write_record(
+    name: str, wall_s: float, cpu_s: float, items: int | None, **fields: object
+) -> None:
+    path = os.environ.get(PROFILE_ENV)
+    if not path:
+        return
+    if RUN_ENV not in os.environ:
+        os.environ[RUN_ENV] = uuid.uuid4().hex[:12]
+    rss = peak_rss_mb()
+    record = {
+        "run": os.environ[RUN_ENV],
+        "pid": os.getpid(),
+        "stage": name,
+        "wall_s": round(wall_s, 6),
+        "cpu_s": round(cpu_s, 6),
+        "peak_rss_mb": None if rss is None else round(rss, 1),
+        "items": items,
+        **fields,
+    }
+    # one short append per record, so concurrent workers do not interleave lines
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+@contextmanager
+def stage(name: str, items: int | None = None, **fields: object) -> Iterator[StageRecord]:
+    """Time the block as stage ``name``; a no-op record is yielded when profiling is off."""
+    record = StageRecord(name, fields, items)
+    if not enabled():
+        yield record
+        return
+    wall, cpu = time.perf_counter(), time.process_time()
+    yield record
+    wall = time.perf_counter() - wall - sum(lap.wall_s for lap in record.excluded)
+    cpu = time.process_time() - cpu - sum(lap.cpu_s for lap in record.excluded)
+    write_record(name, wall, cpu, record.items, **record.fields)
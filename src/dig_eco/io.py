@@ -0,0 +1,664 @@
+"""
+Shared CSV input/output for the dig-eco stages.
+
+Raw GEE exports are streamed column-projected into a columnar ``CleanTable``; clean tables are
+read back as year-sorted series per (site, buffer, metric).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import json
+import math
+import os
+import re
+import struct
+import sys
+from array import array
+from collections.abc import Iterator, Set
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+
+from .compressed import detect, open_text, open_text_out, strip_suffix
+from .instrument import Lap, enabled, stage, write_record
+
+if TYPE_CHECKING:
+    from .siteindex import RangeReader
+
+DEFAULT_METRICS = [
+    "mean_ndvi",
+    "mean_ndmi",
+    "mean_ndbi",
+    "mean_ndti",
+    "mean_savi",
+    "mean_bsi",
+    "bare_pct",
+    "mining_soil_pct",
+    "non_mining_soil_pct",
+    "valid_px_pct",
+]
+
+
+@dataclass(slots=True)
+class Point:
+    year: int
+    value: float
+
+
+def parse_float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    s = str(value).strip()
+    if s == "":
+        return None
+    try:
+        out = float(s)
+    except ValueError:
+        return None
+    if math.isnan(out):
+        return None
+    return out
+
+
+def parse_year(value: str | None) -> int | None:
+    v = parse_float(value)
+    if v is None:
+        return None
+    return int(round(v))
+
+
+# Raw export columns every clean row is built from, besides the requested metrics.
+KEY_COLUMNS = ["site_name", "site_id", "buffer_m", "year", "image_count", "qa_flag"]
+
+
+def iter_export_records(f: TextIO, columns: list[str]) -> Iterator[list[str | None]]:
+    """
+    Stream the requested columns of a GEE export as raw strings, one list per data row.
+
+    The header is resolved once. Rows are split only up to the last wanted column, so the
+    trailing ``.geo`` GeoJSON and other unused columns are never unquoted or kept; rows with
+    a quote before that point go through the csv module. Absent columns read as None.
+    """
+    header_line = f.readline()
+    if not header_line:
+        return
+    header = next(csv.reader([header_line]))
+    index = {name: i for i, name in enumerate(header)}
+    wanted = [index.get(c) for c in columns]
+    stop = max((i for i in wanted if i is not None), default=-1) + 1
+
+    for line in f:
+        if line in ("\n", "\r\n", "\r"):
+            continue
+        quote = line.find('"')
+        if quote == -1 or line.count(",", 0, quote) >= stop:
+            fields = line.split(",", stop)
+            if len(fields) <= stop:
+                fields[-1] = fields[-1].rstrip("\r\n")
+        else:
+            while line.count('"') % 2:
+                more = f.readline()
+                if not more:
+                    break
+                line += more
+            fields = next(csv.reader([line]))
+        yield [fields[i] if i is not None and i < len(fields) else None for i in wanted]
+
+
+# Key columns held as codes into a per-table list of distinct strings.
+CODED_COLUMNS = ["site_name", "site_id", "buffer_m", "qa_flag"]
+
+# image_count of rows where it is blank; metric blanks are NaN (parse_float never returns NaN).
+MISSING_INT = -(1 << 63)
+
+
+class CleanTable:
+    """
+    Clean rows as typed columns.
+
+    Site names, site ids, buffers and QA flags are interned: each row stores an int code into
+    ``labels[column]``. Years and image counts are integer arrays and each metric is a float
+    array, so a value costs 8 bytes instead of a dict entry and a boxed float.
+    """
+
+    __slots__ = ("metrics", "labels", "codes", "year", "image_count", "values", "_lookup")
+
+    def __init__(self, metrics: list[str]) -> None:
+        self.metrics = list(metrics)
+        self.labels: dict[str, list[str]] = {c: [] for c in CODED_COLUMNS}
+        self.codes: dict[str, array] = {c: array("i") for c in CODED_COLUMNS}
+        self.year = array("i")
+        self.image_count = array("q")
+        self.values: dict[str, array] = {m: array("d") for m in self.metrics}
+        self._lookup: dict[str, dict[str, int]] = {c: {} for c in CODED_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.year)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CleanTable):
+            return NotImplemented
+        return self._content() == other._content()
+
+    def __getstate__(self) -> tuple:
+        return (self.metrics, self.labels, self.codes, self.year, self.image_count, self.values)
+
+    def __setstate__(self, state: tuple) -> None:
+        self.metrics, self.labels, self.codes, self.year, self.image_count, self.values = state
+        self._lookup = {c: {s: i for i, s in enumerate(self.labels[c])} for c in CODED_COLUMNS}
+
+    def _content(self) -> tuple:
+        decoded = [self.column(c) for c in CODED_COLUMNS]
+        # compare float bits, so NaN blanks compare equal
+        values = [self.values[m].tobytes() for m in self.metrics]
+        return (self.metrics, decoded, self.year, self.image_count, values)
+
+    def _code(self, column: str, label: str) -> int:
+        lookup = self._lookup[column]
+        code = lookup.get(label)
+        if code is None:
+            code = lookup[label] = len(self.labels[column])
+            self.labels[column].append(label)
+        return code
+
+    def column(self, name: str) -> list[str]:
+        """Decoded values of a coded column."""
+        labels = self.labels[name]
+        return [labels[k] for k in self.codes[name]]
+
+    def append(self, values: list[str | None]) -> bool:
+        """
+        Add a row from ``iter_export_records`` values (KEY_COLUMNS, then metrics).
+
+        Rows without a site name, buffer or year are dropped; returns whether the row was kept.
+        """
+        site_name, site_id, buffer_m, year, image_count, qa_flag = values[: len(KEY_COLUMNS)]
+        site_name = (site_name or "").strip()
+        buffer_m = (buffer_m or "").strip()
+        year = parse_year(year)
+        if year is None or site_name == "" or buffer_m == "":
+            return False
+        codes = self.codes
+        codes["site_name"].append(self._code("site_name", site_name))
+        codes["site_id"].append(self._code("site_id", (site_id or "").strip()))
+        codes["buffer_m"].append(self._code("buffer_m", buffer_m))
+        codes["qa_flag"].append(self._code("qa_flag", qa_flag or ""))
+        self.year.append(year)
+        count = parse_year(image_count)
+        self.image_count.append(MISSING_INT if count is None else count)
+        for m, v in zip(self.metrics, values[len(KEY_COLUMNS) :], strict=True):
+            value = parse_float(v)
+            self.values[m].append(math.nan if value is None else value)
+        return True
+
+    def extend(self, other: CleanTable) -> None:
+        """Append the rows of ``other`` (same metrics), re-coding its labels into this table."""
+        for c in CODED_COLUMNS:
+            remap = [self._code(c, label) for label in other.labels[c]]
+            self.codes[c].extend(remap[k] for k in other.codes[c])
+        self.year.extend(other.year)
+        self.image_count.extend(other.image_count)
+        for m in self.metrics:
+            self.values[m].extend(other.values[m])
+
+    def take(self, order: list[int]) -> CleanTable:
+        """New table holding the rows at ``order``, sharing this table's labels."""
+        out = CleanTable(self.metrics)
+        out.labels = {c: list(v) for c, v in self.labels.items()}
+        out._lookup = {c: dict(v) for c, v in self._lookup.items()}
+        for c in CODED_COLUMNS:
+            codes = self.codes[c]
+            out.codes[c] = array("i", [codes[i] for i in order])
+        out.year = array("i", [self.year[i] for i in order])
+        out.image_count = array("q", [self.image_count[i] for i in order])
+        for m in self.metrics:
+            column = self.values[m]
+            out.values[m] = array("d", [column[i] for i in order])
+        return out
+
+    def sorted(self) -> CleanTable:
+        """Rows stably sorted by (site name, buffer, year), the clean CSV order."""
+        site_rank = _label_ranks(self.labels["site_name"])
+        buffer_rank = _label_ranks(self.labels["buffer_m"])
+        sites, buffers, years = self.codes["site_name"], self.codes["buffer_m"], self.year
+        order = sorted(
+            range(len(self)), key=lambda i: (site_rank[sites[i]], buffer_rank[buffers[i]], years[i])
+        )
+        return self.take(order)
+
+    def group_ranges(self) -> Iterator[tuple[str, str, int, int]]:
+        """(site name, buffer, start, stop) for each run of equal site and buffer codes."""
+        sites, buffers = self.codes["site_name"], self.codes["buffer_m"]
+        start = 0
+        for i in range(1, len(self) + 1):
+            if i == len(self) or sites[i] != sites[start] or buffers[i] != buffers[start]:
+                yield (
+                    self.labels["site_name"][sites[start]],
+                    self.labels["buffer_m"][buffers[start]],
+                    start,
+                    i,
+                )
+                start = i
+
+    def points(self, metric: str, start: int, stop: int) -> list[Point]:
+        """Non-blank values of ``metric`` in rows ``start:stop``, in row order."""
+        column, years = self.values[metric], self.year
+        return [Point(years[i], column[i]) for i in range(start, stop) if column[i] == column[i]]
+
+    def iter_csv_rows(self) -> Iterator[list[object]]:
+        """Rows as CSV cells in KEY_COLUMNS + metrics order, blanks as empty strings."""
+        names, ids = self.labels["site_name"], self.labels["site_id"]
+        buffers, flags = self.labels["buffer_m"], self.labels["qa_flag"]
+        codes = self.codes
+        columns = [self.values[m] for m in self.metrics]
+        for i, (s, d, b, year, count, q) in enumerate(
+            zip(
+                codes["site_name"],
+                codes["site_id"],
+                codes["buffer_m"],
+                self.year,
+                self.image_count,
+                codes["qa_flag"],
+                strict=True,
+            )
+        ):
+            row: list[object] = [
+                names[s],
+                ids[d],
+                buffers[b],
+                year,
+                "" if count == MISSING_INT else count,
+                flags[q],
+            ]
+            for column in columns:
+                v = column[i]
+                row.append(v if v == v else "")
+            yield row
+
+
+def _label_ranks(labels: list[str]) -> list[int]:
+    """Sort rank of each label, indexed by code."""
+    ranks = [0] * len(labels)
+    for rank, code in enumerate(sorted(range(len(labels)), key=labels.__getitem__)):
+        ranks[code] = rank
+    return ranks
+
+
+def open_export(
+    path: Path, sites: list[str] | None = None, buffers: list[str] | None = None
+) -> TextIO | RangeReader | None:
+    """
+    An export as CSV text: the whole file, or only the rows of ``sites`` and ``buffers``.
+
+    Filtered reads seek through the export's per-site byte-range index (``siteindex``, built on
+    first use), so their cost depends on the selected rows rather than the file size. They return
+    None for compressed exports, which cannot be seeked, and where the index cannot be written.
+    Compressed exports are decompressed as they are read (``compressed.open_text``).
+    """
+    if sites or buffers:
+        if detect(path) is not None:
+            return None
+        from .siteindex import select_text  # siteindex builds on this module
+
+        return select_text(path, sites, buffers)
+    return open_text(path)
+
+
+def export_records(
+    path: Path,
+    columns: list[str],
+    sites: list[str] | None = None,
+    buffers: list[str] | None = None,
+) -> Iterator[list[str | None]]:
+    """
+    ``iter_export_records`` over an export, restricted to ``sites`` and ``buffers``.
+
+    Filtered reads go through the site index (``open_export``) where there is one, and
+    otherwise stream the whole export and filter it row by row.
+    """
+    f = open_export(path, sites, buffers)
+    if f is not None:
+        with f:
+            yield from iter_export_records(f, columns)
+        return
+    n = len(columns)
+    with open_text(path) as f:
+        for values in iter_export_records(f, [*columns, "site_id", "site_name", "buffer_m"]):
+            site_id, site_name, buffer_m = ((v or "").strip() for v in values[n:])
+            if sites and (site_id or site_name) not in sites and site_name not in sites:
+                continue
+            if buffers and buffer_m not in buffers:
+                continue
+            yield values[:n]
+
+
+def read_clean_table(
+    path: Path,
+    metrics: list[str],
+    sites: list[str] | None = None,
+    buffers: list[str] | None = None,
+    skip: Set[int] = frozenset(),
+) -> tuple[int, CleanTable]:
+    """
+    Stream one export into a clean table; returns (input row count, table in file order).
+
+    ``sites`` (ids or names) and ``buffers`` restrict the read to those rows (``export_records``).
+    Records whose 0-based position in the read is in ``skip`` (see ``dedup.resolve``) are
+    counted as input but left out of the table.
+    """
+    n_rows = 0
+    table = CleanTable(metrics)
+    append = table.append
+    with stage("read", file=str(path)) as record:
+        if enabled():
+            # cleaning is interleaved with reading; time it apart and report it as "clean"
+            lap = Lap()
+            record.exclude(lap)
+
+            def append(values: list[str | None]) -> bool:
+                with lap:
+                    return table.append(values)
+
+        for values in export_records(path, [*KEY_COLUMNS, *metrics], sites, buffers):
+            if n_rows not in skip:
+                append(values)
+            n_rows += 1
+        record.items = n_rows
+    if record.excluded:
+        write_record("clean", lap.wall_s, lap.cpu_s, len(table), file=str(path))
+    return n_rows, table
+
+
+def expand_inputs(specs: list[str]) -> list[Path]:
+    """Resolve --input paths and glob patterns (each pattern expanded in sorted order)."""
+    paths: list[Path] = []
+    for spec in specs:
+        if glob.has_magic(spec):
+            matches = sorted(glob.glob(spec))
+            if not matches:
+                raise FileNotFoundError(f"No input CSVs match: {spec}")
+            paths.extend(Path(m) for m in matches)
+        else:
+            path = Path(spec)
+            if not path.exists():
+                raise FileNotFoundError(f"Input CSV not found: {path}")
+            paths.append(path)
+    return paths
+
+
+def merged_base(paths: list[Path]) -> Path:
+    """
+    Output base shared by the inputs, dropping the ``_part_<i>_of_<n>`` partition tag.
+
+    ``..._part_0_of_4_1984_2025.csv`` .. ``..._part_3_of_4_1984_2025.csv`` -> ``..._1984_2025``.
+    """
+    plain = [strip_suffix(p) for p in paths]
+    bases = {p.with_name(re.sub(r"_part_\d+_of_\d+", "", p.stem)) for p in plain}
+    if len(paths) > 1 and len(bases) > 1:
+        raise ValueError(
+            "Inputs do not share a partition base name; pass --summary-out and --clean-out."
+        )
+    return plain[0].with_suffix("") if len(paths) == 1 else bases.pop()
+
+
+def read_partitions(
+    paths: list[Path],
+    metrics: list[str],
+    workers: int,
+    sites: list[str] | None = None,
+    buffers: list[str] | None = None,
+    skips: list[Set[int]] | None = None,
+) -> tuple[int, CleanTable]:
+    """
+    Parse partition files (in parallel when workers > 1) and concatenate them in input order.
+
+    The merged table has the rows of a single run over the concatenated files, in that order.
+    ``skips`` gives each file's ``skip`` records for ``read_clean_table``.
+    """
+    read = partial(read_clean_table, metrics=metrics, sites=sites, buffers=buffers)
+    skips = skips or [frozenset()] * len(paths)
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            futures = [
+                pool.submit(read, p, skip=skip) for p, skip in zip(paths, skips, strict=True)
+            ]
+            parts = [future.result() for future in futures]
+    else:
+        parts = [read(p, skip=skip) for p, skip in zip(paths, skips, strict=True)]
+    table = CleanTable(metrics)
+    for _, part in parts:
+        table.extend(part)
+    return sum(n for n, _ in parts), table
+
+
+def write_csv(path: Path, rows: list[dict[str, object]], fieldnames: list[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        stage("write", file=str(path), items=len(rows)),
+        open_text_out(path) as f,
+    ):
+        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w.writeheader()
+        for row in rows:
+            w.writerow(row)
+
+
+def write_table_csv(path: Path, table: CleanTable) -> None:
+    """Write a clean table with the KEY_COLUMNS + metrics header."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        stage("write", file=str(path), items=len(table)),
+        open_text_out(path) as f,
+    ):
+        w = csv.writer(f)
+        w.writerow([*KEY_COLUMNS, *table.metrics])
+        w.writerows(table.iter_csv_rows())
+
+
+# Binary column cache of a clean CSV: MAGIC, a little-endian u32 header length, a JSON header,
+# then each column's raw array bytes at an 8-byte-aligned offset listed in the header.
+TABLE_CACHE_MAGIC = b"DIGECOT\x01"
+TABLE_CACHE_VERSION = 1
+
+
+def table_cache_path(csv_path: Path) -> Path:
+    """``<base>_clean.csv`` (or ``<base>_clean.csv.gz`` etc.) -> ``<base>_clean.cols``."""
+    return strip_suffix(csv_path).with_suffix(".cols")
+
+
+def _source_stamp(csv_path: Path) -> dict[str, int]:
+    st = csv_path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def write_table_cache(csv_path: Path, table: CleanTable) -> Path:
+    """Write the column cache for ``table``, stamped with the size and mtime of ``csv_path``."""
+    columns: list[tuple[str, array]] = [
+        *((f"codes:{c}", table.codes[c]) for c in CODED_COLUMNS),
+        ("year", table.year),
+        ("image_count", table.image_count),
+        *((f"values:{m}", table.values[m]) for m in table.metrics),
+    ]
+    layout, offset = [], 0
+    for name, column in columns:
+        nbytes = len(column) * column.itemsize
+        layout.append({"name": name, "typecode": column.typecode, "offset": offset})
+        offset += -(-nbytes // 8) * 8
+    header = json.dumps(
+        {
+            "version": TABLE_CACHE_VERSION,
+            "byteorder": sys.byteorder,
+            "source": _source_stamp(csv_path),
+            "rows": len(table),
+            "metrics": table.metrics,
+            "labels": table.labels,
+            "columns": layout,
+        }
+    ).encode()
+    header += b" " * (-(len(TABLE_CACHE_MAGIC) + 4 + len(header)) % 8)
+    path = table_cache_path(csv_path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(TABLE_CACHE_MAGIC + struct.pack("<I", len(header)) + header)
+        for _, column in columns:
+            f.write(column.tobytes())
+            f.write(b"\0" * (-len(column) * column.itemsize % 8))
+    tmp.replace(path)
+    return path
+
+
+def load_table_cache(csv_path: Path) -> CleanTable | None:
+    """The cached table of ``csv_path``, or None if absent, unreadable or stale."""
+    path = table_cache_path(csv_path)
+    try:
+        data = path.read_bytes()
+        if not data.startswith(TABLE_CACHE_MAGIC):
+            return None
+        start = len(TABLE_CACHE_MAGIC) + 4
+        (header_len,) = struct.unpack_from("<I", data, len(TABLE_CACHE_MAGIC))
+        header = json.loads(data[start : start + header_len])
+        if header["version"] != TABLE_CACHE_VERSION:
+            return None
+        if header["source"] != _source_stamp(csv_path):
+            return None
+
+        body = memoryview(data)[start + header_len :]
+        n = header["rows"]
+        columns: dict[str, array] = {}
+        for spec in header["columns"]:
+            column = array(spec["typecode"])
+            column.frombytes(body[spec["offset"] : spec["offset"] + n * column.itemsize])
+            # a truncated or partly written cache is a miss, not a ragged table
+            if len(column) != n:
+                return None
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+            columns[spec["name"]] = column
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None
+    table = CleanTable(header["metrics"])
+    table.__setstate__(
+        (
+            header["metrics"],
+            header["labels"],
+            {c: columns[f"codes:{c}"] for c in CODED_COLUMNS},
+            columns["year"],
+            columns["image_count"],
+            {m: columns[f"values:{m}"] for m in header["metrics"]},
+        )
+    )
+    return table
+
+
+def read_clean_csv(path: Path) -> CleanTable:
+    """
+    Every column of a clean CSV as a table, from its column cache when that is current.
+
+    A missing or stale cache (the CSV's size or mtime changed) is rebuilt from the CSV.
+    """
+    with stage("load_cache", file=str(path)) as record:
+        table = load_table_cache(path)
+        record.fields["hit"] = table is not None
+        record.items = 0 if table is None else len(table)
+    if table is None:
+        with open_text(path) as f:
+            header = next(csv.reader([f.readline()]), [])
+        metrics = [c for c in header if c not in KEY_COLUMNS]
+        _, table = read_clean_table(path, metrics)
+        try:
+            write_table_cache(path, table)
+        except OSError:
+            pass  # read-only input directory: parse the CSV again next time
+    return table
+
+
+def read_clean_series(
+    path: Path, metrics: list[str], min_valid_px: float
+) -> tuple[list[tuple[str, str, str]], list[list[Point]]]:
+    """Year-sorted series per (site, buffer, metric), skipping rows below ``min_valid_px``."""
+    return table_series(read_clean_csv(path).sorted(), metrics, min_valid_px)
+
+
+def table_series(
+    table: CleanTable, metrics: list[str], min_valid_px: float
+) -> tuple[list[tuple[str, str, str]], list[list[Point]]]:
+    """
+    ``read_clean_series`` of a table already in clean CSV (sorted) order.
+
+    Tables without a valid_px_pct column are not filtered when ``min_valid_px`` is 0 or less;
+    any other threshold would drop every row, so it raises ValueError instead.
+    """
+    valid_px = table.values.get("valid_px_pct")
+    if valid_px is None:
+        if min_valid_px > 0:
+            raise ValueError(
+                f"No valid_px_pct column to filter on (--min-valid-px {min_valid_px:g}); "
+                "include it in the cleaned metrics or pass --min-valid-px 0."
+            )
+        valid_px = array("d", [math.inf]) * len(table)
+    keys: list[tuple[str, str, str]] = []
+    series: list[list[Point]] = []
+    for site_name, buffer_m, start, stop in table.group_ranges():
+        kept = [i for i in range(start, stop) if valid_px[i] >= min_valid_px]
+        for metric in metrics:
+            column = table.values.get(metric)
+            if column is None:
+                continue
+            pts = [Point(table.year[i], column[i]) for i in kept if column[i] == column[i]]
+            if len(pts) >= 2:
+                keys.append((site_name, buffer_m, metric))
+                series.append(pts)
+    return keys, series
+
+
+def derived_path(input_path: Path, suffix: str) -> Path:
+    """Sibling output of a clean CSV: ``<base>_clean.csv[.gz]`` -> ``<base>_<suffix>.csv``."""
+    base = strip_suffix(input_path).with_suffix("")
+    base = base.with_name(base.name.removesuffix("_clean"))
+    return Path(f"{base}_{suffix}.csv")
+
+
+def comma_list(text: str | None) -> list[str] | None:
+    """Values of a comma-separated option, or None when it is unset or empty."""
+    values = [v.strip() for v in text.split(",") if v.strip()] if text else []
+    return values or None
+
+
+def subset_tag(sites: list[str] | None, buffers: list[str] | None) -> str:
+    """Output name suffix for a --site/--buffer subset, e.g. ``_Divisadero_Mine_2000m``."""
+    parts = [*(sites or []), *(f"{b}m" for b in buffers or [])]
+    return "".join("_" + re.sub(r"[^A-Za-z0-9]+", "_", p).strip("_") for p in parts)
+
+
+def add_subset_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--site",
+        default=None,
+        help="Comma-separated site ids or names to read; other rows are skipped via the "
+        "export's site index.",
+    )
+    parser.add_argument(
+        "--buffer", default=None, help="Comma-separated buffer radii to read (e.g. 2000)."
+    )
+
+
+def worker_count(text: str) -> int:
+    """``--workers`` value: a process count, with 0 meaning one per CPU."""
+    n = int(text)
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"expected 0 or more processes, got {n}")
+    return n or os.cpu_count() or 1
+
+
+def add_workers_argument(parser: argparse.ArgumentParser, use: str) -> None:
+    parser.add_argument(
+        "--workers",
+        type=worker_count,
+        default=1,
+        help=f"Processes used to {use} (default: 1; 0 for one per CPU).",
+    )
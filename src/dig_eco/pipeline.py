@@ -0,0 +1,164 @@
+"""
+Run clean -> trends -> anomalies -> plots in one process on one in-memory table.
+
+``dig-eco trends`` followed by ``dig-eco plot`` writes the clean CSV only for the plot step to
+parse it again. Here the cleaned table is handed from stage to stage; the clean CSV is an
+optional output (``--clean-out``). The table holds the ``--metrics`` columns only, so the
+anomaly scan sees the ``--anomaly-metrics`` that are among them, as ``dig-eco anomalies`` does
+on the clean CSV: the clean CSV, trend summary, anomaly flags and charts match those of the
+separate commands run with the same options.
+
+Usage:
+  dig-eco pipeline \
+    --input "gee/groundwork/MRDSoutputs/*.csv" --outdir analysis/figures --anomalies
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from .anomaly import ANOMALY_FIELDS, ANOMALY_METRICS, add_scan_arguments, flag_series
+from .compressed import FORMATS, check_codecs, with_format
+from .dedup import add_dedup_arguments
+from .instrument import add_profile_argument, enable
+from .io import (
+    DEFAULT_METRICS,
+    add_subset_arguments,
+    add_workers_argument,
+    comma_list,
+    expand_inputs,
+    merged_base,
+    subset_tag,
+    table_series,
+    write_csv,
+    write_table_cache,
+    write_table_csv,
+)
+from .render import add_render_arguments, render_table
+from .trends import SUMMARY_FIELDS, add_fit_arguments, fit_table, read_inputs
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco pipeline",
+        description="Clean GEE exports, fit trends, flag anomalies and plot, in one process.",
+    )
+    parser.add_argument(
+        "--input",
+        required=True,
+        nargs="+",
+        help="Input long-form CSV(s) exported from GEE, plain or compressed; partition files or "
+        "glob patterns.",
+    )
+    parser.add_argument("--outdir", required=True, help="Output directory for PNGs.")
+    parser.add_argument(
+        "--metrics",
+        default=",".join(DEFAULT_METRICS),
+        help="Comma-separated metric columns to summarize and plot.",
+    )
+    parser.add_argument(
+        "--summary-out",
+        default=None,
+        help="Output summary CSV path. Default: <input base>_trend_summary.csv",
+    )
+    parser.add_argument(
+        "--clean-out",
+        default=None,
+        help="Also write the cleaned CSV (and its column cache) here; no stage needs it.",
+    )
+    parser.add_argument(
+        "--anomalies", action="store_true", help="Flag anomalies between trends and plots."
+    )
+    parser.add_argument(
+        "--anomaly-metrics",
+        default=",".join(ANOMALY_METRICS),
+        help="Comma-separated metric columns to scan for anomalies; only those also in "
+        "--metrics are read (include valid_px_pct there for the --min-valid-px filter).",
+    )
+    parser.add_argument(
+        "--anomalies-out",
+        default=None,
+        help="Output anomaly flags CSV path. Default: <input base>_anomaly_flags.csv",
+    )
+    add_workers_argument(parser, "parse input files and render charts")
+    parser.add_argument(
+        "--compress",
+        choices=FORMATS,
+        default=None,
+        help="Compress the clean and summary CSVs, adding .gz/.bz2/.xz/.zst to their names "
+        "(zst needs zstandard).",
+    )
+    add_fit_arguments(parser)
+    add_scan_arguments(parser)
+    add_render_arguments(parser)
+    add_subset_arguments(parser)
+    add_dedup_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(args.profile)
+
+    input_paths = expand_inputs(args.input)
+    sites, buffers = comma_list(args.site), comma_list(args.buffer)
+    summary_out = Path(args.summary_out) if args.summary_out else None
+    anomalies_out = Path(args.anomalies_out) if args.anomalies_out else None
+    conflicts_out = Path(args.conflicts_out) if args.conflicts_out else None
+    if (
+        summary_out is None
+        or (args.anomalies and anomalies_out is None)
+        or (args.dedup and conflicts_out is None)
+    ):
+        try:
+            base = f"{merged_base(input_paths)}{subset_tag(sites, buffers)}"
+        except ValueError:
+            needed = ["--summary-out"] + (["--anomalies-out"] if args.anomalies else [])
+            needed += ["--conflicts-out"] if args.dedup else []
+            parser.error(f"Inputs do not share a partition base name; pass {', '.join(needed)}.")
+        summary_out = summary_out or Path(f"{base}_trend_summary.csv")
+        anomalies_out = anomalies_out or Path(f"{base}_anomaly_flags.csv")
+        conflicts_out = conflicts_out or Path(f"{base}_conflicts.csv")
+    summary_out = with_format(summary_out, args.compress)
+    clean_out = with_format(Path(args.clean_out), args.compress) if args.clean_out else None
+    try:
+        check_codecs([summary_out, clean_out])
+    except RuntimeError as e:
+        parser.error(str(e))
+    metrics = comma_list(args.metrics) or []
+    anomaly_metrics = comma_list(args.anomaly_metrics) or []
+    if args.anomalies and args.min_valid_px > 0 and "valid_px_pct" not in metrics:
+        parser.error(
+            f"--anomalies filters on valid_px_pct (--min-valid-px {args.min_valid_px:g}); "
+            "add it to --metrics or pass --min-valid-px 0."
+        )
+
+    try:
+        n_rows, table, resolution = read_inputs(input_paths, metrics, args, conflicts_out)
+        trend = fit_table(table, metrics, args)
+    except ValueError as e:
+        parser.error(str(e))
+    write_csv(summary_out, trend.rows, SUMMARY_FIELDS)
+
+    print(f"Input rows: {n_rows}")
+    if resolution:
+        print(
+            f"Duplicate rows dropped ({args.dedup}): {len(resolution.dropped)} -> {conflicts_out}"
+        )
+    if clean_out:
+        write_table_csv(clean_out, trend.table)
+        write_table_cache(clean_out, trend.table)
+        print(f"Clean rows written: {len(trend.table)} -> {clean_out}")
+    print(f"Trend summary rows written: {len(trend.rows)} -> {summary_out}")
+
+    if args.anomalies:
+        keys, series = table_series(trend.table, anomaly_metrics, args.min_valid_px)
+        rows = flag_series(keys, series, args)
+        write_csv(anomalies_out, rows, ANOMALY_FIELDS)
+        print(f"Series scanned: {len(series)}")
+        print(f"Anomaly rows written: {len(rows)} -> {anomalies_out}")
+
+    render_table(trend.table, metrics, Path(args.outdir), args, presorted=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,925 @@
+"""
+Generate dependency-free PNG trend charts from MRDS clean CSV output.
+
+Designed for offline environments where matplotlib is unavailable.
+Every chart includes:
+- title
+- x-axis label
+- y-axis label
+- numeric tick labels
+
+Usage:
+  dig-eco plot \
+    --input-clean gee/groundwork/MRDSoutputs/Divisadero_Mine_2013_2025_clean.csv \
+    --outdir analysis/figures/mrds_trends
+
+Add ``--layout sheet`` to write one contact sheet per site and buffer instead of one PNG
+per metric; manifest.csv then records each panel's pixel offsets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import re
+import struct
+import zlib
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cache, partial
+from pathlib import Path
+
+from .instrument import add_profile_argument, enable, stage
+from .io import (
+    DEFAULT_METRICS,
+    CleanTable,
+    Point,
+    add_subset_arguments,
+    add_workers_argument,
+    comma_list,
+    read_clean_csv,
+    read_clean_table,
+)
+from .trends import ols_fit
+
+FONT_5X7: dict[str, list[str]] = {
+    " ": ["00000"] * 7,
+    "-": ["00000", "00000", "00000", "11111", "00000", "00000", "00000"],
+    "_": ["00000", "00000", "00000", "00000", "00000", "00000", "11111"],
+    ".": ["00000", "00000", "00000", "00000", "00000", "00110", "00110"],
+    ":": ["00000", "00110", "00110", "00000", "00110", "00110", "00000"],
+    "(": ["00010", "00100", "01000", "01000", "01000", "00100", "00010"],
+    ")": ["01000", "00100", "00010", "00010", "00010", "00100", "01000"],
+    "%": ["11001", "11010", "00100", "01000", "10110", "00110", "00000"],
+    "0": ["01110", "10001", "10011", "10101", "11001", "10001", "01110"],
+    "1": ["00100", "01100", "00100", "00100", "00100", "00100", "01110"],
+    "2": ["01110", "10001", "00001", "00010", "00100", "01000", "11111"],
+    "3": ["11110", "00001", "00001", "01110", "00001", "00001", "11110"],
+    "4": ["00010", "00110", "01010", "10010", "11111", "00010", "00010"],
+    "5": ["11111", "10000", "11110", "00001", "00001", "10001", "01110"],
+    "6": ["00110", "01000", "10000", "11110", "10001", "10001", "01110"],
+    "7": ["11111", "00001", "00010", "00100", "01000", "01000", "01000"],
+    "8": ["01110", "10001", "10001", "01110", "10001", "10001", "01110"],
+    "9": ["01110", "10001", "10001", "01111", "00001", "00010", "11100"],
+    "A": ["01110", "10001", "10001", "11111", "10001", "10001", "10001"],
+    "B": ["11110", "10001", "10001", "11110", "10001", "10001", "11110"],
+    "C": ["01110", "10001", "10000", "10000", "10000", "10001", "01110"],
+    "D": ["11110", "10001", "10001", "10001", "10001", "10001", "11110"],
+    "E": ["11111", "10000", "10000", "11110", "10000", "10000", "11111"],
+    "F": ["11111", "10000", "10000", "11110", "10000", "10000", "10000"],
+    "G": ["01110", "10001", "10000", "10111", "10001", "10001", "01110"],
+    "H": ["10001", "10001", "10001", "11111", "10001", "10001", "10001"],
+    "I": ["01110", "00100", "00100", "00100", "00100", "00100", "01110"],
+    "J": ["00001", "00001", "00001", "00001", "10001", "10001", "01110"],
+    "K": ["10001", "10010", "10100", "11000", "10100", "10010", "10001"],
+    "L": ["10000", "10000", "10000", "10000", "10000", "10000", "11111"],
+    "M": ["10001", "11011", "10101", "10001", "10001", "10001", "10001"],
+    "N": ["10001", "11001", "10101", "10011", "10001", "10001", "10001"],
+    "O": ["01110", "10001", "10001", "10001", "10001", "10001", "01110"],
+    "P": ["11110", "10001", "10001", "11110", "10000", "10000", "10000"],
+    "Q": ["01110", "10001", "10001", "10001", "10101", "10010", "01101"],
+    "R": ["11110", "10001", "10001", "11110", "10100", "10010", "10001"],
+    "S": ["01111", "10000", "10000", "01110", "00001", "00001", "11110"],
+    "T": ["11111", "00100", "00100", "00100", "00100", "00100", "00100"],
+    "U": ["10001", "10001", "10001", "10001", "10001", "10001", "01110"],
+    "V": ["10001", "10001", "10001", "10001", "10001", "01010", "00100"],
+    "W": ["10001", "10001", "10001", "10001", "10101", "11011", "10001"],
+    "X": ["10001", "10001", "01010", "00100", "01010", "10001", "10001"],
+    "Y": ["10001", "10001", "01010", "00100", "00100", "00100", "00100"],
+    "Z": ["11111", "00001", "00010", "00100", "01000", "10000", "11111"],
+}
+
+
+def clean_slug(s: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", s).strip("_")
+
+
+PNG_FILTERS = {"none": 0, "sub": 1, "up": 2}
+PNG_STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "rle": zlib.Z_RLE,
+    "huffman": zlib.Z_HUFFMAN_ONLY,
+}
+
+
+@dataclass(frozen=True)
+class PngOptions:
+    level: int = 9
+    strategy: str = "default"
+    filter: str = "none"
+    idat_size: int = 1 << 16
+    palette: bool = False
+
+
+def filtered_scanlines(
+    rows: Iterable[bytes | memoryview], row_bytes: int, bpp: int, png_filter: str
+) -> Iterator[bytearray]:
+    """
+    Yield each PNG scanline (filter byte + filtered row) in one reused buffer.
+
+    Sub/Up are applied a whole row at a time with SWAR arithmetic on Python ints: setting bit 7
+    of every minuend byte and clearing it in the subtrahend keeps borrows inside each byte.
+    """
+    filter_type = PNG_FILTERS[png_filter]
+    line = bytearray(row_bytes + 1)
+    line[0] = filter_type
+    high = int.from_bytes(b"\x80" * row_bytes, "big")
+    mask = (1 << (8 * row_bytes)) - 1
+    prev = 0
+    for row in rows:
+        if filter_type == 0:
+            line[1:] = row
+        else:
+            cur = int.from_bytes(row, "big")
+            base = cur >> (8 * bpp) if filter_type == 1 else prev
+            diff = ((cur | high) - (base & ~high)) ^ ((cur ^ ~base) & high)
+            line[1:] = (diff & mask).to_bytes(row_bytes, "big")
+            prev = cur
+        yield line
+
+
+def pixel_rows(px: bytearray, row_bytes: int, height: int) -> Iterator[memoryview]:
+    rows = memoryview(px)
+    for y in range(height):
+        yield rows[y * row_bytes : (y + 1) * row_bytes]
+
+
+# Index i -> i << 4, for packing two 4-bit palette indices into one byte.
+_HIGH_NIBBLE = bytes((i << 4) & 0xFF for i in range(256))
+
+
+def nibble_rows(indices: bytearray, width: int, height: int) -> Iterator[bytes]:
+    """Pack rows of palette indices (< 16) two per byte, left pixel in the high nibble."""
+    row_bytes = (width + 1) // 2
+    for row in pixel_rows(indices, width, height):
+        high = int.from_bytes(bytes(row[0::2]).translate(_HIGH_NIBBLE), "big")
+        low = bytes(row[1::2]).ljust(row_bytes, b"\x00")
+        yield (high | int.from_bytes(low, "big")).to_bytes(row_bytes, "big")
+
+
+def write_png(
+    path: Path,
+    width: int,
+    height: int,
+    rows: Iterable[bytes | memoryview],
+    color_type: int,
+    row_bytes: int,
+    bpp: int,
+    options: PngOptions | None = None,
+    bit_depth: int = 8,
+    palette: list[tuple[int, int, int]] | None = None,
+) -> None:
+    """Stream a PNG: scanlines are compressed as produced and written as IDAT chunks."""
+    options = options or PngOptions()
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + tag
+            + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    comp = zlib.compressobj(
+        options.level,
+        zlib.DEFLATED,
+        zlib.MAX_WBITS,
+        zlib.DEF_MEM_LEVEL,
+        PNG_STRATEGIES[options.strategy],
+    )
+    ihdr = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", ihdr))
+        if palette is not None:
+            f.write(chunk(b"PLTE", b"".join(bytes(c) for c in palette)))
+        pending = bytearray()
+        for line in filtered_scanlines(rows, row_bytes, bpp, options.filter):
+            pending.extend(comp.compress(line))
+            while len(pending) >= options.idat_size:
+                f.write(chunk(b"IDAT", bytes(pending[: options.idat_size])))
+                del pending[: options.idat_size]
+        pending.extend(comp.flush())
+        f.write(chunk(b"IDAT", bytes(pending)))
+        f.write(chunk(b"IEND", b""))
+
+
+def write_png_rgb(
+    path: Path, width: int, height: int, rgb: bytearray, options: PngOptions | None = None
+) -> None:
+    rows = pixel_rows(rgb, width * 3, height)
+    write_png(path, width, height, rows, 2, width * 3, 3, options)
+
+
+def write_png_indexed(
+    path: Path,
+    width: int,
+    height: int,
+    indices: bytearray,
+    palette: list[tuple[int, int, int]],
+    options: PngOptions | None = None,
+) -> None:
+    """Palette PNG (color type 3): 4-bit when the palette has at most 16 colors, else 8-bit."""
+    if len(palette) <= 16:
+        rows: Iterator[bytes | memoryview] = nibble_rows(indices, width, height)
+        row_bytes, bit_depth = (width + 1) // 2, 4
+    else:
+        rows, row_bytes, bit_depth = pixel_rows(indices, width, height), width, 8
+    write_png(path, width, height, rows, 3, row_bytes, 1, options, bit_depth, palette)
+
+
+@cache
+def glyph_runs(ch: str, scale: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    """Pre-scaled glyph bitmap as (x offset, width) pixel runs for each of 7 * scale rows."""
+    glyph = FONT_5X7.get(ch, FONT_5X7[" "])
+    rows = []
+    for bits in glyph:
+        runs = tuple(
+            (m.start() * scale, (m.end() - m.start()) * scale) for m in re.finditer("1+", bits)
+        )
+        rows.extend([runs] * scale)
+    return tuple(rows)
+
+
+class Canvas:
+    """
+    RGB raster, or with ``palette=True`` one palette index per pixel (3x less memory).
+
+    Palette entries are assigned in first-use order; at most 256 colors.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        bg: tuple[int, int, int] = (255, 255, 255),
+        palette: bool = False,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.palette: list[tuple[int, int, int]] | None = [] if palette else None
+        self.bpp = 1 if palette else 3
+        self._inks: dict[tuple[int, int, int], bytes] = {}
+        self.px = bytearray(width * height * self.bpp)
+        self.fill(bg)
+
+    def ink(self, color: tuple[int, int, int]) -> bytes:
+        """Pixel bytes for a color: RGB triple, or its palette index."""
+        ink = self._inks.get(color)
+        if ink is None:
+            if self.palette is None:
+                ink = bytes(color)
+            else:
+                if len(self.palette) == 256:
+                    raise ValueError("Palette canvas is limited to 256 colors.")
+                ink = bytes((len(self.palette),))
+                self.palette.append(color)
+            self._inks[color] = ink
+        return ink
+
+    def fill(self, color: tuple[int, int, int]) -> None:
+        self.px[:] = self.ink(color) * (self.width * self.height)
+
+    def set(self, x: int, y: int, color: tuple[int, int, int]) -> None:
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return
+        i = (y * self.width + x) * self.bpp
+        self.px[i : i + self.bpp] = self.ink(color)
+
+    def hspan(self, x0: int, x1: int, y: int, color: tuple[int, int, int]) -> None:
+        """Fill pixels x0..x1 (inclusive, either order) of row y with one slice assignment."""
+        if x0 > x1:
+            x0, x1 = x1, x0
+        if y < 0 or y >= self.height:
+            return
+        x0 = max(x0, 0)
+        x1 = min(x1, self.width - 1)
+        if x0 > x1:
+            return
+        i = (y * self.width + x0) * self.bpp
+        self.px[i : i + (x1 - x0 + 1) * self.bpp] = self.ink(color) * (x1 - x0 + 1)
+
+    def vspan(self, x: int, y0: int, y1: int, color: tuple[int, int, int]) -> None:
+        """Fill pixels y0..y1 (inclusive, either order) of column x with strided assignments."""
+        if y0 > y1:
+            y0, y1 = y1, y0
+        if x < 0 or x >= self.width:
+            return
+        y0 = max(y0, 0)
+        y1 = min(y1, self.height - 1)
+        if y0 > y1:
+            return
+        stride = self.width * self.bpp
+        i = (y0 * self.width + x) * self.bpp
+        end = (y1 * self.width + x) * self.bpp + 1
+        n = y1 - y0 + 1
+        for c, value in enumerate(self.ink(color)):
+            self.px[i + c : end + c : stride] = bytes((value,)) * n
+
+    def copy(self) -> Canvas:
+        out = Canvas.__new__(Canvas)
+        out.width = self.width
+        out.height = self.height
+        out.palette = None if self.palette is None else list(self.palette)
+        out.bpp = self.bpp
+        out._inks = dict(self._inks)
+        out.px = bytearray(self.px)
+        return out
+
+    def blit(self, src: Canvas, x: int, y: int) -> None:
+        """Copy ``src`` (same color mode) with its top-left corner at (x, y); it must fit."""
+        row = src.width * self.bpp
+        if self.palette is None:
+            table = None
+        else:
+            table = bytearray(range(256))
+            for i, color in enumerate(src.palette or []):
+                table[i] = self.ink(color)[0]
+        for sy in range(src.height):
+            line = src.px[sy * row : (sy + 1) * row]
+            if table is not None:
+                line = line.translate(table)
+            i = ((y + sy) * self.width + x) * self.bpp
+            self.px[i : i + row] = line
+
+    def save_png(self, path: Path, options: PngOptions | None = None) -> None:
+        if self.palette is None:
+            write_png_rgb(path, self.width, self.height, self.px, options)
+        else:
+            write_png_indexed(path, self.width, self.height, self.px, self.palette, options)
+
+    def line(self, x0: int, y0: int, x1: int, y1: int, color: tuple[int, int, int]) -> None:
+        if y0 == y1:
+            self.hspan(x0, x1, y0, color)
+            return
+        if x0 == x1:
+            self.vspan(x0, y0, y1, color)
+            return
+        dx = abs(x1 - x0)
+        sx = 1 if x0 < x1 else -1
+        dy = -abs(y1 - y0)
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            self.set(x0, y0, color)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def rect_outline(self, x0: int, y0: int, x1: int, y1: int, color: tuple[int, int, int]) -> None:
+        self.line(x0, y0, x1, y0, color)
+        self.line(x1, y0, x1, y1, color)
+        self.line(x1, y1, x0, y1, color)
+        self.line(x0, y1, x0, y0, color)
+
+    def circle(self, cx: int, cy: int, r: int, color: tuple[int, int, int]) -> None:
+        x = r
+        y = 0
+        err = 1 - x
+        while x >= y:
+            for px, py in ((x, y), (y, x), (-y, x), (-x, y), (-x, -y), (-y, -x), (y, -x), (x, -y)):
+                self.set(cx + px, cy + py, color)
+            y += 1
+            if err < 0:
+                err += 2 * y + 1
+            else:
+                x -= 1
+                err += 2 * (y - x) + 1
+
+    def draw_char(
+        self, x: int, y: int, ch: str, color: tuple[int, int, int], scale: int = 1
+    ) -> None:
+        for gy, runs in enumerate(glyph_runs(ch, scale)):
+            for dx, w in runs:
+                self.hspan(x + dx, x + dx + w - 1, y + gy, color)
+
+    def draw_text(
+        self, x: int, y: int, text: str, color: tuple[int, int, int], scale: int = 1
+    ) -> None:
+        cursor_x = x
+        for ch in text:
+            self.draw_char(cursor_x, y, ch, color, scale=scale)
+            cursor_x += (5 * scale) + scale
+
+
+def text_width(text: str, scale: int = 1) -> int:
+    if not text:
+        return 0
+    return len(text) * (5 * scale + scale) - scale
+
+
+def safe_label_text(text: str) -> str:
+    t = text.upper().replace("|", " ").replace("/", " ")
+    return "".join(ch if ch in FONT_5X7 else " " for ch in t)
+
+
+def plottable(points: list[Point]) -> bool:
+    """Whether a series spans more than one year and value; flat series produce no PNG."""
+    if len(points) < 2:
+        return False
+    years = [p.year for p in points]
+    values = [p.value for p in points]
+    return min(years) != max(years) and min(values) != max(values)
+
+
+MARGIN_L, MARGIN_R, MARGIN_T, MARGIN_B = 130, 40, 95, 120
+GRID_C = (232, 232, 232)
+AXIS_C = (60, 60, 60)
+TEXT_C = (35, 35, 35)
+TREND_C = (216, 27, 96)
+
+
+def frame_overlays(
+    width: int, height: int, x_label: str
+) -> list[tuple[int, int, str, tuple[int, int, int], int]]:
+    """(x, y, text, color, scale) of the x-axis label and legend, which every chart shares."""
+    x_txt = safe_label_text(x_label)
+    return [
+        ((width - text_width(x_txt, 2)) // 2, height - 48, x_txt, TEXT_C, 2),
+        (10, 30, safe_label_text("TREND LINE = OLS"), TREND_C, 1),
+    ]
+
+
+@cache
+def chart_frame(width: int, height: int, x_ticks: int, x_label: str, palette: bool) -> Canvas:
+    """
+    Pre-rendered chart background: grid, axis box, x-axis label and legend.
+
+    Cached per layout; charts draw on a copy. The vertical grid depends on the year span
+    only through ``x_ticks``.
+    """
+    canvas = Canvas(width, height, palette=palette)
+    plot_x0, plot_y0 = MARGIN_L, MARGIN_T
+    plot_x1, plot_y1 = width - MARGIN_R, height - MARGIN_B
+    plot_w = plot_x1 - plot_x0
+    plot_h = plot_y1 - plot_y0
+
+    for i in range(1, 6):
+        y = plot_y0 + int(i * plot_h / 6)
+        canvas.line(plot_x0, y, plot_x1, y, GRID_C)
+    for i in range(1, x_ticks):
+        x = plot_x0 + int(i * plot_w / x_ticks)
+        canvas.line(x, plot_y0, x, plot_y1, GRID_C)
+
+    canvas.rect_outline(plot_x0, plot_y0, plot_x1, plot_y1, AXIS_C)
+
+    for x, y, text, color, scale in frame_overlays(width, height, x_label):
+        canvas.draw_text(x, y, text, color, scale=scale)
+    return canvas
+
+
+def _boxes_overlap(a: tuple[int, int, int, int], b: tuple[int, int, int, int]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def render_series(
+    points: list[Point],
+    title: str,
+    x_label: str,
+    y_label: str,
+    width: int = 1100,
+    height: int = 700,
+    palette: bool = False,
+    x_range: tuple[int, int] | None = None,
+) -> Canvas | None:
+    """
+    Draw one series chart and return its canvas, or None if the series is not plottable.
+
+    ``x_range`` overrides the year axis so panels of a contact sheet share their x ticks.
+    """
+    if not plottable(points):
+        return None
+
+    plot_x0 = MARGIN_L
+    plot_y0 = MARGIN_T
+    plot_x1 = width - MARGIN_R
+    plot_y1 = height - MARGIN_B
+    plot_w = plot_x1 - plot_x0
+    plot_h = plot_y1 - plot_y0
+
+    years = [p.year for p in points]
+    values = [p.value for p in points]
+    first_x, last_x = min(years), max(years)
+    min_x, max_x = x_range or (first_x, last_x)
+    min_y, max_y = min(values), max(values)
+
+    y_pad = (max_y - min_y) * 0.08
+    min_y -= y_pad
+    max_y += y_pad
+
+    # grid, axis, x label and legend come from the cached frame
+    year_span = max_x - min_x
+    x_ticks = min(max(year_span, 2), 6)
+    canvas = chart_frame(width, height, x_ticks, x_label, palette).copy()
+
+    def xpix(x: int) -> int:
+        return plot_x0 + int((x - min_x) / (max_x - min_x) * plot_w)
+
+    def ypix(y: float) -> int:
+        return plot_y1 - int((y - min_y) / (max_y - min_y) * plot_h)
+
+    # axis ticks + labels
+    tick_c = (80, 80, 80)
+    for i in range(int(x_ticks) + 1):
+        t = i / int(x_ticks)
+        xv = int(round(min_x + t * (max_x - min_x)))
+        xp = xpix(xv)
+        canvas.line(xp, plot_y1, xp, plot_y1 + 8, tick_c)
+        lbl = safe_label_text(str(xv))
+        canvas.draw_text(xp - text_width(lbl) // 2, plot_y1 + 16, lbl, tick_c, scale=1)
+
+    y_ticks = 6
+    for i in range(y_ticks + 1):
+        t = i / y_ticks
+        yv = max_y - t * (max_y - min_y)
+        yp = plot_y0 + int(t * plot_h)
+        canvas.line(plot_x0 - 8, yp, plot_x0, yp, tick_c)
+        lbl = safe_label_text(f"{yv:.2f}")
+        canvas.draw_text(plot_x0 - 10 - text_width(lbl), yp - 4, lbl, tick_c, scale=1)
+
+    # series
+    line_c = (36, 99, 235)
+    pt_c = (18, 52, 120)
+    pix = [(xpix(p.year), ypix(p.value)) for p in points]
+    for i in range(1, len(pix)):
+        canvas.line(pix[i - 1][0], pix[i - 1][1], pix[i][0], pix[i][1], line_c)
+    for x, y in pix:
+        canvas.circle(x, y, 2, pt_c)
+
+    # trend line
+    touched: list[tuple[int, int, int, int]] = []
+    fit = ols_fit(points)
+    if fit is not None:
+        slope, intercept = fit
+        ty0 = ypix(slope * first_x + intercept)
+        ty1 = ypix(slope * last_x + intercept)
+        canvas.line(xpix(first_x), ty0, xpix(last_x), ty1, TREND_C)
+        touched.append((xpix(first_x), min(ty0, ty1), xpix(last_x), max(ty0, ty1)))
+
+    # labels
+    title_txt = safe_label_text(title)
+    y_txt = safe_label_text(y_label)
+    title_x = (width - text_width(title_txt, 2)) // 2
+    canvas.draw_text(title_x, 20, title_txt, TEXT_C, scale=2)
+    touched.append((title_x, 20, title_x + text_width(title_txt, 2) - 1, 33))
+    canvas.draw_text(10, 16, y_txt, TEXT_C, scale=1)
+
+    # The frame's x label and legend used to be drawn last; repaint any that a long title or
+    # a steep trend line ran into so they still end up on top.
+    for x, y, text, color, scale in frame_overlays(width, height, x_label):
+        box = (x, y, x + text_width(text, scale) - 1, y + 7 * scale - 1)
+        if any(_boxes_overlap(box, t) for t in touched):
+            canvas.draw_text(x, y, text, color, scale=scale)
+    return canvas
+
+
+def draw_series_png(
+    output_png: Path,
+    points: list[Point],
+    title: str,
+    x_label: str,
+    y_label: str,
+    width: int = 1100,
+    height: int = 700,
+    png: PngOptions | None = None,
+) -> None:
+    palette = png is not None and png.palette
+    with stage("render", items=len(points), chart=output_png.name):
+        canvas = render_series(points, title, x_label, y_label, width, height, palette)
+    if canvas is not None:
+        with stage("compress", items=canvas.width * canvas.height, chart=output_png.name):
+            canvas.save_png(output_png, png)
+
+
+# Bump when drawing code changes so content hashes stop matching previously rendered charts.
+RENDER_VERSION = 2
+
+
+@dataclass
+class ChartJob:
+    site_name: str
+    buffer_m: str
+    metric: str
+    points: list[Point]
+    out_png: Path
+    width: int = 1100
+    height: int = 700
+
+    def labels(self) -> tuple[str, str, str]:
+        """(title, x label, y label)."""
+        metric_label = self.metric.replace("_", " ")
+        return (
+            f"{self.site_name} | {metric_label} | {self.buffer_m} m buffer",
+            "Year",
+            f"Value ({metric_label})",
+        )
+
+    def content_hash(self, png: PngOptions | None = None) -> str:
+        """Hash of everything that determines the PNG bytes: points, labels, size, encoding."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((RENDER_VERSION, self.labels(), self.width, self.height)).encode())
+        h.update(repr(png or PngOptions()).encode())
+        h.update(array("q", [p.year for p in self.points]).tobytes())
+        h.update(array("d", [p.value for p in self.points]).tobytes())
+        return h.hexdigest()
+
+
+def render_chart(job: ChartJob, png: PngOptions | None = None) -> None:
+    title, x_label, y_label = job.labels()
+    draw_series_png(
+        job.out_png,
+        job.points,
+        title=title,
+        x_label=x_label,
+        y_label=y_label,
+        width=job.width,
+        height=job.height,
+        png=png,
+    )
+
+
+@dataclass
+class SheetJob:
+    """All metric panels of one (site, buffer), tiled into a single contact-sheet PNG."""
+
+    site_name: str
+    buffer_m: str
+    panels: list[ChartJob]
+    out_png: Path
+    cols: int = 4
+
+    def x_range(self) -> tuple[int, int]:
+        years = [p.year for panel in self.panels for p in panel.points]
+        return min(years), max(years)
+
+    def size(self) -> tuple[int, int]:
+        rows = -(-len(self.panels) // self.cols)
+        return self.cols * self.panels[0].width, rows * self.panels[0].height
+
+    def offsets(self) -> list[tuple[int, int]]:
+        """Top-left pixel of each panel, in ``panels`` order (row-major)."""
+        return [
+            ((i % self.cols) * panel.width, (i // self.cols) * panel.height)
+            for i, panel in enumerate(self.panels)
+        ]
+
+    def content_hash(self, png: PngOptions | None = None) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((RENDER_VERSION, "sheet", self.cols)).encode())
+        for panel in self.panels:
+            h.update(panel.content_hash(png).encode())
+        return h.hexdigest()
+
+
+def render_sheet(job: SheetJob, png: PngOptions | None = None) -> None:
+    palette = png is not None and png.palette
+    n_points = sum(len(panel.points) for panel in job.panels)
+    with stage("render", items=n_points, chart=job.out_png.name):
+        sheet = Canvas(*job.size(), palette=palette)
+        x_range = job.x_range()
+        for panel, (x, y) in zip(job.panels, job.offsets(), strict=True):
+            # the sheet is one site and buffer, so panel titles only name the metric
+            _, x_label, y_label = panel.labels()
+            title = panel.metric.replace("_", " ")
+            canvas = render_series(
+                panel.points, title, x_label, y_label, panel.width, panel.height, palette, x_range
+            )
+            if canvas is not None:
+                sheet.blit(canvas, x, y)
+    with stage("compress", items=sheet.width * sheet.height, chart=job.out_png.name):
+        sheet.save_png(job.out_png, png)
+
+
+def render_job(job: ChartJob | SheetJob, png: PngOptions | None = None) -> None:
+    if isinstance(job, SheetJob):
+        render_sheet(job, png)
+    else:
+        render_chart(job, png)
+
+
+def needs_file(job: ChartJob | SheetJob) -> bool:
+    """Whether rendering the job writes a PNG (flat single series do not)."""
+    return bool(job.panels) if isinstance(job, SheetJob) else plottable(job.points)
+
+
+def chart_jobs(table: CleanTable, metrics: list[str], outdir: Path) -> list[ChartJob]:
+    """One chart per (site, buffer, metric) of a sorted clean table with at least two points."""
+    jobs: list[ChartJob] = []
+    for site_name, buffer_m, start, stop in table.group_ranges():
+        for metric in sorted(m for m in set(metrics) if m in table.values):
+            points = table.points(metric, start, stop)
+            if len(points) < 2:
+                continue
+            slug = f"{clean_slug(site_name)}__{clean_slug(buffer_m)}m__{clean_slug(metric)}"
+            jobs.append(ChartJob(site_name, buffer_m, metric, points, outdir / f"{slug}.png"))
+    return jobs
+
+
+def read_manifest_hashes(path: Path) -> dict[str, str]:
+    """png_file -> content_hash from an existing manifest (empty if absent or pre-hash)."""
+    if not path.exists():
+        return {}
+    with path.open(newline="", encoding="utf-8") as f:
+        return {
+            row["png_file"]: row["content_hash"]
+            for row in csv.DictReader(f)
+            if row.get("content_hash")
+        }
+
+
+def render_charts(
+    jobs: list[ChartJob] | list[SheetJob], workers: int, png: PngOptions | None = None
+) -> None:
+    """Render and encode charts, spreading them over a process pool when workers > 1."""
+    if workers > 1 and len(jobs) > 1:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(partial(render_job, png=png), jobs, chunksize=chunksize):
+                pass
+    else:
+        for job in jobs:
+            render_job(job, png)
+
+
+def add_render_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--png-level", type=int, default=9, help="zlib compression level 0-9 (default: 9)."
+    )
+    parser.add_argument(
+        "--png-strategy",
+        choices=sorted(PNG_STRATEGIES),
+        default="default",
+        help="zlib compression strategy (default: default).",
+    )
+    parser.add_argument(
+        "--png-filter",
+        choices=sorted(PNG_FILTERS),
+        default="none",
+        help="PNG row filter. 'up' suits flat chart backgrounds: with --png-level 6 it "
+        "encodes ~2.5x faster and ~20%% smaller than the defaults.",
+    )
+    parser.add_argument(
+        "--palette",
+        action="store_true",
+        help="Render palette-indexed PNGs (4-bit for <= 16 colors) instead of truecolor.",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=["single", "sheet"],
+        default="single",
+        help="'single' writes one PNG per metric; 'sheet' tiles every metric of a site and "
+        "buffer into one contact sheet with shared x ticks (panel offsets go to the manifest).",
+    )
+    parser.add_argument(
+        "--sheet-cols", type=int, default=4, help="Panels per contact-sheet row (default: 4)."
+    )
+    parser.add_argument(
+        "--panel-size",
+        default="550x350",
+        help="Contact-sheet panel size as WIDTHxHEIGHT (default: 550x350).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render every chart, even when the manifest hash shows it is unchanged.",
+    )
+
+
+def render_table(
+    table: CleanTable,
+    metrics: list[str],
+    outdir: Path,
+    args: argparse.Namespace,
+    presorted: bool = False,
+) -> None:
+    """
+    Render a clean table's charts into ``outdir``, skipping unchanged ones, and write the manifest.
+
+    Takes the ``add_render_arguments`` options and ``args.workers`` from ``args``; ``presorted``
+    skips sorting a table already in clean CSV order.
+    """
+    with stage("group", items=len(table)):
+        jobs = chart_jobs(table if presorted else table.sorted(), metrics, outdir)
+
+    render_jobs: list[ChartJob] | list[SheetJob] = jobs
+    if args.layout == "sheet":
+        panel_w, panel_h = (int(v) for v in args.panel_size.lower().split("x"))
+        order = {metric: i for i, metric in enumerate(metrics)}
+        by_site: dict[tuple[str, str], list[ChartJob]] = defaultdict(list)
+        for job in jobs:
+            if plottable(job.points):
+                by_site[(job.site_name, job.buffer_m)].append(job)
+        render_jobs = []
+        for (site_name, buffer_m), panels in by_site.items():
+            out_png = outdir / f"{clean_slug(site_name)}__{clean_slug(buffer_m)}m__sheet.png"
+            panels.sort(key=lambda job: order[job.metric])
+            for panel in panels:
+                panel.out_png, panel.width, panel.height = out_png, panel_w, panel_h
+            render_jobs.append(SheetJob(site_name, buffer_m, panels, out_png, args.sheet_cols))
+
+    png = PngOptions(
+        level=args.png_level,
+        strategy=args.png_strategy,
+        filter=args.png_filter,
+        palette=args.palette,
+    )
+    manifest_path = outdir / "manifest.csv"
+    previous = {} if args.force else read_manifest_hashes(manifest_path)
+    hashes = [job.content_hash(png) for job in render_jobs]
+    stale = [
+        job
+        for job, digest in zip(render_jobs, hashes, strict=True)
+        if previous.get(str(job.out_png)) != digest
+        or (needs_file(job) and not job.out_png.exists())
+    ]
+    render_charts(stale, args.workers, png)
+
+    # Built from the job list, so the manifest order does not depend on worker scheduling.
+    fieldnames = ["site_name", "buffer_m", "metric", "n_points", "png_file", "content_hash"]
+    manifest_rows: list[dict[str, str | int]] = []
+    for job, digest in zip(render_jobs, hashes, strict=True):
+        if isinstance(job, ChartJob):
+            panels = [(job, None)]
+        else:
+            panels = list(zip(job.panels, job.offsets(), strict=True))
+        for panel, offset in panels:
+            row: dict[str, str | int] = {
+                "site_name": panel.site_name,
+                "buffer_m": panel.buffer_m,
+                "metric": panel.metric,
+                "n_points": len(panel.points),
+                "png_file": str(job.out_png),
+                "content_hash": digest,
+            }
+            if offset is not None:
+                row.update(
+                    panel_x=offset[0],
+                    panel_y=offset[1],
+                    panel_width=panel.width,
+                    panel_height=panel.height,
+                )
+            manifest_rows.append(row)
+    if args.layout == "sheet":
+        fieldnames += ["panel_x", "panel_y", "panel_width", "panel_height"]
+
+    outdir.mkdir(parents=True, exist_ok=True)
+    with (
+        stage("write", items=len(manifest_rows), file=str(manifest_path)),
+        manifest_path.open("w", newline="", encoding="utf-8") as f,
+    ):
+        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w.writeheader()
+        for row in manifest_rows:
+            w.writerow(row)
+
+    print(f"Generated PNG files: {len(manifest_rows)}")
+    print(f"Rendered: {len(stale)}, unchanged: {len(render_jobs) - len(stale)}")
+    print(f"Manifest: {manifest_path}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco plot", description="Generate PNG trends from MRDS clean CSV."
+    )
+    parser.add_argument("--input-clean", required=True, help="Clean CSV from dig-eco trends")
+    parser.add_argument("--outdir", required=True, help="Output directory for PNGs")
+    parser.add_argument(
+        "--metrics",
+        default=",".join(DEFAULT_METRICS),
+        help="Comma-separated metric list to plot",
+    )
+    add_workers_argument(parser, "render charts")
+    add_render_arguments(parser)
+    add_subset_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(args.profile)
+
+    input_path = Path(args.input_clean)
+    outdir = Path(args.outdir)
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+
+    sites, buffers = comma_list(args.site), comma_list(args.buffer)
+    if sites or buffers:
+        _, table = read_clean_table(input_path, metrics, sites, buffers)
+    else:
+        table = read_clean_csv(input_path)
+
+    render_table(table, metrics, outdir, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Per-site byte-range index of an export, for reading one site without a full scan.
+
+``build_index`` scans an export once and writes ``<export>.sites.sqlite``: one row per
+(site, buffer) with the byte ranges of its rows in the export (consecutive rows merged into one
+range), its row count and year range, indexed on (site, buffer), (site name, buffer) and
+buffer, plus the header and file-level row count and year range. A filtered read probes the
+lookup table and seeks to the matching ranges of the export itself, so its cost depends on the
+selected rows, not on the file size. A site is its ``site_id``, or its name where an export has
+no ids. The index is stamped with the export's size and mtime and rebuilt when they change.
+Compressed exports cannot be seeked and are not indexed.
+
+GEE exports interleave sites row by row, so a site's rows are many short ranges. ``dig-eco
+index --cluster`` also writes ``<export>.sites.rows``, a copy of the rows regrouped so each
+(site, buffer) is one contiguous range, which filtered reads then use instead. The copy doubles
+the export's disk use, so it is only written on request (and kept up to date once it exists).
+
+Usage:
+  dig-eco index gee/groundwork/MRDSoutputs/*.csv
+  dig-eco index --cluster gee/groundwork/MRDSoutputs/*.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import sys
+from array import array
+from collections.abc import Iterator
+from contextlib import closing
+from pathlib import Path
+
+from .compressed import detect
+from .instrument import stage
+from .io import expand_inputs, parse_year
+
+INDEX_VERSION = 3
+
+INDEX_COLUMNS = ["site_id", "site_name", "buffer_m", "year"]
+
+# Bytes of a range decoded at a time.
+READ_BLOCK = 1 << 20
+
+SCHEMA = """
+CREATE TABLE info (
+    version INTEGER NOT NULL,
+    source_size INTEGER NOT NULL,
+    source_mtime_ns INTEGER NOT NULL,
+    clustered INTEGER NOT NULL,
+    rows_size INTEGER NOT NULL,
+    header TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    first_year INTEGER,
+    last_year INTEGER
+);
+CREATE TABLE spans (
+    site TEXT NOT NULL,
+    site_name TEXT NOT NULL,
+    buffer_m TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    first_year INTEGER,
+    last_year INTEGER,
+    ranges BLOB NOT NULL
+);
+CREATE INDEX spans_site_buffer ON spans (site, buffer_m);
+CREATE INDEX spans_name_buffer ON spans (site_name, buffer_m);
+CREATE INDEX spans_buffer ON spans (buffer_m);
+"""
+
+
+def index_path(export: Path) -> Path:
+    return export.with_name(export.name + ".sites.sqlite")
+
+
+def rows_path(export: Path) -> Path:
+    return export.with_name(export.name + ".sites.rows")
+
+
+def _pack(ranges: array) -> bytes:
+    """Flat [start, stop, ...] byte ranges as little-endian int64s."""
+    if sys.byteorder != "little":
+        ranges = array("q", ranges)
+        ranges.byteswap()
+    return ranges.tobytes()
+
+
+def _unpack(blob: bytes) -> list[tuple[int, int]]:
+    ranges = array("q")
+    ranges.frombytes(blob)
+    if sys.byteorder != "little":
+        ranges.byteswap()
+    return list(zip(ranges[::2], ranges[1::2], strict=True))
+
+
+def _years(years: list[int], year: int | None) -> None:
+    """Widen a [first, last] year range in place."""
+    if year is not None:
+        years[:] = [min(years[0], year), max(years[1], year)] if years else [year, year]
+
+
+def build_index(export: Path, cluster: bool = False) -> None:
+    """
+    Scan an export once and write its lookup table (see module docstring).
+
+    With ``cluster``, also write the regrouped copy of its rows that the ranges then point into.
+    """
+    with stage("index", file=str(export)) as record, export.open("rb") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8")]), [])
+        position = {name: i for i, name in enumerate(header)}
+        wanted = [position.get(c) for c in INDEX_COLUMNS]
+        stop = max((i for i in wanted if i is not None), default=-1) + 1
+
+        # (site, buffer) -> [site name, rows, years, flat [start, stop, ...] export ranges]
+        entries: dict[tuple[str, str], list] = {}
+        file_years: list[int] = []
+        n_rows, offset, last = 0, len(header_line), None
+        for line in f:
+            start = offset
+            # a quoted field may span lines; read until the quotes balance
+            while line.count(b'"') % 2:
+                more = f.readline()
+                if not more:
+                    break
+                line += more
+            offset += len(line)
+            if line in (b"\n", b"\r\n"):
+                continue
+            n_rows += 1
+            text = line.decode("utf-8")
+            quote = text.find('"')
+            if quote == -1 or text.count(",", 0, quote) >= stop:
+                fields = text.rstrip("\r\n").split(",", stop)
+            else:
+                fields = next(csv.reader([text]))
+            site_id, site_name, buffer_m, year = (
+                fields[i].strip() if i is not None and i < len(fields) else "" for i in wanted
+            )
+            key = (site_id or site_name, buffer_m)
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = [site_name, 0, [], array("q")]
+            entry[1] += 1
+            year_value = parse_year(year)
+            _years(entry[2], year_value)
+            _years(file_years, year_value)
+            ranges = entry[3]
+            if key == last:
+                ranges[-1] = offset
+            else:
+                ranges.extend((start, offset))
+            last = key
+        record.items = n_rows
+
+        rows_size = 0
+        if cluster:
+            # regroup the rows, one contiguous range per (site, buffer) in first-appearance order
+            rows_tmp = rows_path(export).with_name(rows_path(export).name + ".tmp")
+            with rows_tmp.open("wb") as out:
+                for entry in entries.values():
+                    ranges = entry[3]
+                    span_start = out.tell()
+                    for start, stop_at in zip(ranges[::2], ranges[1::2], strict=True):
+                        f.seek(start)
+                        chunk = f.read(stop_at - start)
+                        out.write(chunk if chunk.endswith(b"\n") else chunk + b"\n")
+                    entry[3] = array("q", (span_start, out.tell()))
+                rows_size = out.tell()
+
+    spans = [
+        (site, site_name, buffer_m, rows, *(years or [None] * 2), _pack(ranges))
+        for (site, buffer_m), (site_name, rows, years, ranges) in entries.items()
+    ]
+    st = export.stat()
+    index_tmp = index_path(export).with_name(index_path(export).name + ".tmp")
+    index_tmp.unlink(missing_ok=True)
+    with closing(sqlite3.connect(index_tmp)) as con, con:
+        con.executescript(SCHEMA)
+        con.execute(
+            "INSERT INTO info VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                INDEX_VERSION,
+                st.st_size,
+                st.st_mtime_ns,
+                int(cluster),
+                rows_size,
+                header_line.decode("utf-8"),
+                n_rows,
+                *(file_years or [None] * 2),
+            ),
+        )
+        con.executemany("INSERT INTO spans VALUES (?, ?, ?, ?, ?, ?, ?)", spans)
+    # the lookup table goes last: it vouches for the rows file it describes
+    if cluster:
+        os.replace(rows_tmp, rows_path(export))
+    else:
+        rows_path(export).unlink(missing_ok=True)
+    os.replace(index_tmp, index_path(export))
+
+
+def _state(export: Path) -> tuple[bool, bool]:
+    """(whether the export's index is current, whether it is clustered)."""
+    path = index_path(export)
+    if not path.exists():
+        return False, False
+    try:
+        with closing(sqlite3.connect(path)) as con:
+            version, size, mtime_ns, clustered, rows_size = con.execute(
+                "SELECT version, source_size, source_mtime_ns, clustered, rows_size FROM info"
+            ).fetchone()
+    except (sqlite3.Error, TypeError, ValueError):
+        return False, False
+    st = export.stat()
+    current = (version, size, mtime_ns) == (INDEX_VERSION, st.st_size, st.st_mtime_ns)
+    if clustered:
+        try:
+            current = current and rows_path(export).stat().st_size == rows_size
+        except OSError:
+            current = False
+    return current, bool(clustered)
+
+
+def load_index(export: Path, cluster: bool | None = None) -> sqlite3.Connection | None:
+    """
+    The export's lookup table, rebuilding it when missing or stale.
+
+    ``cluster`` asks for the regrouped rows copy (True) or for none (False); None keeps what the
+    export has, so filtered reads never write a copy that was not asked for. Returns None when
+    the index cannot be written (a read-only directory); the caller then streams and filters
+    the export itself.
+    """
+    current, clustered = _state(export)
+    if cluster is None:
+        cluster = clustered
+    if not current or cluster != clustered:
+        try:
+            build_index(export, cluster)
+        except (OSError, sqlite3.Error):
+            return None
+    return sqlite3.connect(index_path(export))
+
+
+def index_info(con: sqlite3.Connection) -> dict[str, object]:
+    """Header, row count, year range and clustering of the indexed export."""
+    header, n_rows, first, last, clustered = con.execute(
+        "SELECT header, n_rows, first_year, last_year, clustered FROM info"
+    ).fetchone()
+    return {
+        "header": header,
+        "rows": n_rows,
+        "years": [] if first is None else [first, last],
+        "clustered": bool(clustered),
+    }
+
+
+def find_spans(
+    con: sqlite3.Connection, sites: list[str] | None, buffers: list[str] | None
+) -> list[tuple[int, int]]:
+    """
+    Byte ranges of the selected sites (ids or names) and buffers, in file order.
+
+    Ranges are in the export, or in the clustered copy where there is one; adjacent ranges
+    are merged.
+    """
+    where, params = [], []
+    if sites:
+        marks = ", ".join("?" * len(sites))
+        where.append(f"(site IN ({marks}) OR site_name IN ({marks}))")
+        params += [*sites, *sites]
+    if buffers:
+        where.append(f"buffer_m IN ({', '.join('?' * len(buffers))})")
+        params += buffers
+    sql = "SELECT ranges FROM spans" + (f" WHERE {' AND '.join(where)}" if where else "")
+    merged: list[tuple[int, int]] = []
+    for start, stop in sorted(r for (blob,) in con.execute(sql, params) for r in _unpack(blob)):
+        if merged and merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], stop)
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+class RangeReader:
+    """
+    Read-only text stream of a header plus byte ranges of a file, read lazily in order.
+
+    Supports what ``iter_export_records`` needs: ``readline``, line iteration, ``with``.
+    """
+
+    def __init__(self, path: Path, header: str, spans: list[tuple[int, int]]) -> None:
+        self._file = path.open("rb")
+        self._lines = self._iter_lines(header, spans)
+
+    def _iter_lines(self, header: str, spans: list[tuple[int, int]]) -> Iterator[str]:
+        yield header
+        for start, end in spans:
+            self._file.seek(start)
+            remaining, tail = end - start, b""
+            while remaining:
+                block = self._file.read(min(READ_BLOCK, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                block = tail + block
+                # cut after the last newline so no line is split between blocks
+                cut = block.rfind(b"\n") + 1 if remaining else len(block)
+                tail = block[cut:]
+                yield from io.StringIO(block[:cut].decode("utf-8"), newline="")
+
+    def readline(self) -> str:
+        return next(self._lines, "")
+
+    def __iter__(self) -> Iterator[str]:
+        return self._lines
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> RangeReader:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def select_text(
+    export: Path, sites: list[str] | None, buffers: list[str] | None
+) -> RangeReader | None:
+    """
+    The export's header and the rows of the selected sites and buffers, read by seeking.
+
+    Rows come in file order, or grouped by (site, buffer) from a clustered copy. None when the
+    export cannot be indexed (see ``load_index``).
+    """
+    con = load_index(export)
+    if con is None:
+        return None
+    with closing(con):
+        info = index_info(con)
+        spans = find_spans(con, sites, buffers)
+    return RangeReader(rows_path(export) if info["clustered"] else export, info["header"], spans)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco index",
+        description="Build the per-site byte-range index of exports and list what they hold.",
+    )
+    parser.add_argument("input", nargs="+", help="Export CSVs or glob patterns.")
+    parser.add_argument(
+        "--sites", action="store_true", help="Also list every site and buffer of each file."
+    )
+    parser.add_argument(
+        "--cluster",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Also write <export>.sites.rows, the rows regrouped by site and buffer, so a "
+        "filtered read is one contiguous read per site (doubles the export's disk use); "
+        "--no-cluster removes it. Default: keep what each export has.",
+    )
+    args = parser.parse_args(argv)
+
+    for export in expand_inputs(args.input):
+        if detect(export):
+            print(f"{export}: compressed, not indexed (filtered reads stream it)")
+            continue
+        con = load_index(export, args.cluster)
+        if con is None:
+            print(f"{export}: not indexed (cannot write next to it)")
+            continue
+        with closing(con):
+            info = index_info(con)
+            n_spans = con.execute("SELECT count(*) FROM spans").fetchone()[0]
+            years = "-".join(map(str, info["years"])) or "none"
+            copy = ", clustered copy" if info["clustered"] else ""
+            print(f"{export}: {info['rows']} rows, years {years}, {n_spans} site buffers{copy}")
+            if args.sites:
+                for site_name, buffer_m, n_rows, first, last in con.execute(
+                    "SELECT site_name, buffer_m, n_rows, first_year, last_year FROM spans "
+                    "ORDER BY rowid"
+                ):
+                    span = "none" if first is None else f"{first}-{last}"
+                    print(f"  {site_name} | {buffer_m} m: {n_rows} rows, years {span}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Local SQLite store of GEE exports, with trend fits over filtered subsets.
+
+``ingest`` upserts cleaned export rows into one ``observations`` table keyed on
+(site_buffer_key, site_year_key), so re-ingesting an export, or a newer export covering the
+same site-years, updates rows in place. Files whose size and mtime match an earlier ingest are
+skipped, unless that ingest stored fewer metrics than are asked for now. ``trends`` selects a
+subset through the (site_id, buffer_m, year) index, or the (buffer_m, year) index when no site
+is given, and fits it with the same summaries as ``dig-eco trends``, without reading any CSV.
+
+Usage:
+  dig-eco db ingest mrds.sqlite "gee/groundwork/MRDSoutputs/*.csv"
+  dig-eco db trends mrds.sqlite --metrics mean_ndvi --buffer 2000 --since 2013
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sqlite3
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from .compressed import open_text
+from .instrument import add_profile_argument, enable, stage
+from .io import (
+    DEFAULT_METRICS,
+    KEY_COLUMNS,
+    Point,
+    comma_list,
+    expand_inputs,
+    export_records,
+    parse_float,
+    parse_year,
+    write_csv,
+)
+from .trends import SUMMARY_FIELDS, auto_engine, summarize_all, theil_sen_slope
+
+STORE_KEYS = ["site_buffer_key", "site_year_key"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    site_buffer_key TEXT NOT NULL,
+    site_year_key TEXT NOT NULL,
+    site_name TEXT NOT NULL,
+    site_id TEXT NOT NULL,
+    buffer_m TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    image_count INTEGER,
+    qa_flag TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (site_buffer_key, site_year_key)
+);
+CREATE INDEX IF NOT EXISTS observations_site_buffer_year
+    ON observations (site_id, buffer_m, year);
+CREATE INDEX IF NOT EXISTS observations_name_buffer_year
+    ON observations (site_name, buffer_m, year);
+CREATE INDEX IF NOT EXISTS observations_buffer_year
+    ON observations (buffer_m, year);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    n_rows INTEGER NOT NULL,
+    metrics TEXT NOT NULL DEFAULT ''
+);
+"""
+
+INGEST_BATCH_ROWS = 5000
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) a store database."""
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(SCHEMA)
+    # stores created before the ingested metrics were recorded re-ingest on their next run
+    if "metrics" not in {row[1] for row in con.execute("PRAGMA table_info(sources)")}:
+        con.execute("ALTER TABLE sources ADD COLUMN metrics TEXT NOT NULL DEFAULT ''")
+    return con
+
+
+def metric_columns(con: sqlite3.Connection) -> list[str]:
+    """Metric columns of the observations table, in column order."""
+    fixed = {*STORE_KEYS, *KEY_COLUMNS, "source"}
+    return [row[1] for row in con.execute("PRAGMA table_info(observations)") if row[1] not in fixed]
+
+
+def ensure_metrics(con: sqlite3.Connection, metrics: list[str]) -> None:
+    """Add REAL columns for metrics the table does not have yet."""
+    present = set(metric_columns(con))
+    for metric in metrics:
+        if metric not in present:
+            con.execute(f"ALTER TABLE observations ADD COLUMN {_quote(metric)} REAL")
+
+
+def store_rows(path: Path, metrics: list[str]) -> Iterator[tuple[object, ...]]:
+    """
+    Cleaned rows of one export, as (*STORE_KEYS, *KEY_COLUMNS, source, *metrics) tuples.
+
+    Rows are dropped by the same rules as the clean CSV. Exports without the GEE key columns
+    (such as clean CSVs) get keys built the GEE way: ``<site_id>_<buffer>``, ``<site_id>_<year>``.
+    """
+    source = str(path)
+    for values in export_records(path, [*STORE_KEYS, *KEY_COLUMNS, *metrics]):
+        buffer_key, year_key, site_name, site_id, buffer_m, year, image_count, qa_flag = values[
+            : len(STORE_KEYS) + len(KEY_COLUMNS)
+        ]
+        site_name = (site_name or "").strip()
+        buffer_m = (buffer_m or "").strip()
+        year = parse_year(year)
+        if year is None or site_name == "" or buffer_m == "":
+            continue
+        site_id = (site_id or "").strip()
+        site = site_id or site_name
+        yield (
+            (buffer_key or "").strip() or f"{site}_{buffer_m}",
+            (year_key or "").strip() or f"{site}_{year}",
+            site_name,
+            site_id,
+            buffer_m,
+            year,
+            parse_year(image_count),
+            qa_flag or "",
+            source,
+            *(parse_float(v) for v in values[len(STORE_KEYS) + len(KEY_COLUMNS) :]),
+        )
+
+
+def _upsert_sql(metrics: list[str]) -> str:
+    """Upsert of one store row that sets only the given metric columns on conflict."""
+    columns = [*STORE_KEYS, *KEY_COLUMNS, "source", *metrics]
+    updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in columns[2:])
+    return (
+        f"INSERT INTO observations ({', '.join(map(_quote, columns))}) "
+        f"VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT (site_buffer_key, site_year_key) DO UPDATE SET {updates}"
+    )
+
+
+def export_header(path: Path) -> list[str]:
+    """Column names of an export, plain or compressed."""
+    with open_text(path) as f:
+        return next(csv.reader([f.readline()]), [])
+
+
+def ingest(
+    con: sqlite3.Connection, paths: list[Path], metrics: list[str], force: bool = False
+) -> tuple[int, int]:
+    """
+    Upsert exports into the store; returns (files ingested, rows upserted).
+
+    Only the metrics a file has columns for are written, so an export lacking a metric keeps
+    the values stored for it by other exports.
+    """
+    ensure_metrics(con, metrics)
+    n_files = n_rows = 0
+    for path in paths:
+        st = path.stat()
+        stamp = (st.st_size, st.st_mtime_ns)
+        known = con.execute(
+            "SELECT size, mtime_ns, metrics FROM sources WHERE path = ?", (str(path.resolve()),)
+        ).fetchone()
+        stored = set()
+        if known is not None and known[:2] == stamp:
+            # the file is unchanged, so the metrics it was ingested with still hold its values
+            stored = {m for m in known[2].split(",") if m}
+            if set(metrics) <= stored and not force:
+                continue
+        header = set(export_header(path))
+        present = [m for m in metrics if m in header]
+        sql = _upsert_sql(present)
+        with stage("ingest", file=str(path)) as record, con:
+            rows = store_rows(path, present)
+            n_file = 0
+            while batch := [row for _, row in zip(range(INGEST_BATCH_ROWS), rows, strict=False)]:
+                con.executemany(sql, batch)
+                n_file += len(batch)
+            con.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                (str(path.resolve()), *stamp, n_file, ",".join(sorted(stored | set(metrics)))),
+            )
+            record.items = n_file
+        n_files += 1
+        n_rows += n_file
+    return n_files, n_rows
+
+
+def series_query(
+    metrics: list[str],
+    sites: list[str] | None = None,
+    buffers: list[str] | None = None,
+    since: int | None = None,
+    until: int | None = None,
+) -> tuple[str, list[object]]:
+    """SQL and parameters selecting the rows of ``query_series``, in series order."""
+    where, params = [], []
+    if sites:
+        marks = ", ".join("?" * len(sites))
+        where.append(f"(site_id IN ({marks}) OR site_name IN ({marks}))")
+        params += [*sites, *sites]
+    if buffers:
+        where.append(f"buffer_m IN ({', '.join('?' * len(buffers))})")
+        params += buffers
+    if since is not None:
+        where.append("year >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("year <= ?")
+        params.append(until)
+    sql = (
+        f"SELECT site_name, buffer_m, year, {', '.join(map(_quote, metrics))} FROM observations"
+        + (f" WHERE {' AND '.join(where)}" if where else "")
+        + " ORDER BY site_name, buffer_m, year, site_year_key"
+    )
+    return sql, params
+
+
+def query_series(
+    con: sqlite3.Connection,
+    metrics: list[str],
+    sites: list[str] | None = None,
+    buffers: list[str] | None = None,
+    since: int | None = None,
+    until: int | None = None,
+) -> tuple[list[tuple[str, str, str]], list[list[Point]]]:
+    """
+    Year-sorted series per (site, buffer, metric) of the matching rows.
+
+    ``sites`` match site names or site ids. Every metric gets a series for every matching
+    site and buffer, as in ``trends.group_series``.
+    """
+    missing = [m for m in metrics if m not in metric_columns(con)]
+    if missing:
+        raise ValueError(f"Metrics not in the store: {', '.join(missing)}")
+    sql, params = series_query(metrics, sites, buffers, since, until)
+    keys: list[tuple[str, str, str]] = []
+    series: list[list[Point]] = []
+    group: tuple[str, str] | None = None
+    for site_name, buffer_m, year, *values in con.execute(sql, params):
+        if (site_name, buffer_m) != group:
+            group = (site_name, buffer_m)
+            keys += [(site_name, buffer_m, m) for m in metrics]
+            series += [[] for _ in metrics]
+        for pts, value in zip(series[-len(metrics) :], values, strict=True):
+            if value is not None:
+                pts.append(Point(year, value))
+    return keys, series
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco db", description="Ingest GEE exports into SQLite and query trends."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = commands.add_parser("ingest", help="Upsert exports into the store.")
+    ingest_cmd.add_argument("db", help="SQLite database path (created if missing).")
+    ingest_cmd.add_argument("input", nargs="+", help="Export CSVs or glob patterns.")
+    ingest_cmd.add_argument(
+        "--metrics",
+        default=",".join(DEFAULT_METRICS),
+        help="Comma-separated metric columns to store.",
+    )
+    ingest_cmd.add_argument(
+        "--force", action="store_true", help="Re-ingest files even if unchanged."
+    )
+    add_profile_argument(ingest_cmd)
+
+    trends_cmd = commands.add_parser("trends", help="Fit trends over a filtered subset.")
+    trends_cmd.add_argument("db", help="SQLite database path.")
+    trends_cmd.add_argument(
+        "--metrics", default="mean_ndvi", help="Comma-separated metrics (default: mean_ndvi)."
+    )
+    trends_cmd.add_argument("--site", default=None, help="Comma-separated site names or ids.")
+    trends_cmd.add_argument("--buffer", default=None, help="Comma-separated buffer radii.")
+    trends_cmd.add_argument("--since", type=int, default=None, help="First year to include.")
+    trends_cmd.add_argument("--until", type=int, default=None, help="Last year to include.")
+    trends_cmd.add_argument(
+        "--min-years",
+        type=int,
+        default=8,
+        help="Minimum data points required before reporting slopes (default: 8).",
+    )
+    trends_cmd.add_argument(
+        "--out", default=None, help="Summary CSV path (default: write CSV to stdout)."
+    )
+    add_profile_argument(trends_cmd)
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(args.profile)
+
+    con = connect(Path(args.db))
+    try:
+        if args.command == "ingest":
+            paths = expand_inputs(args.input)
+            n_files, n_rows = ingest(con, paths, comma_list(args.metrics) or [], args.force)
+            print(f"Files ingested: {n_files} of {len(paths)} (others unchanged)")
+            print(f"Rows upserted: {n_rows} -> {args.db}")
+            return
+
+        metrics = comma_list(args.metrics) or []
+        try:
+            with stage("query") as record:
+                keys, series = query_series(
+                    con,
+                    metrics,
+                    comma_list(args.site),
+                    comma_list(args.buffer),
+                    args.since,
+                    args.until,
+                )
+                record.items = len(keys)
+        except ValueError as e:
+            parser.error(str(e))
+        with stage("fit", items=len(keys)):
+            rows = summarize_all(
+                keys, series, args.min_years, theil_sen_slope, auto_engine(len(keys))
+            )
+        if args.out:
+            write_csv(Path(args.out), rows, SUMMARY_FIELDS)
+            print(f"Trend summary rows written: {len(rows)} -> {args.out}")
+        else:
+            w = csv.DictWriter(sys.stdout, fieldnames=SUMMARY_FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1050 @@
+"""
+Post-process GEE MRDS disturbance CSV exports into trend summaries.
+
+Usage:
+  dig-eco trends \
+    --input gee/groundwork/MRDSoutputs/mrds_mine_disturbance_long_all_sites_1984_2025.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from statistics import median
+from typing import TYPE_CHECKING
+
+from ._compat import VECTORIZE_MIN_SERIES, has_numpy, numpy
+from .compressed import FORMATS, check_codecs, with_format
+from .dedup import CONFLICT_FIELDS, Resolution, add_dedup_arguments, resolve
+from .instrument import add_profile_argument, enable, stage
+from .io import (
+    DEFAULT_METRICS,
+    CleanTable,
+    Point,
+    add_subset_arguments,
+    add_workers_argument,
+    comma_list,
+    expand_inputs,
+    merged_base,
+    read_partitions,
+    subset_tag,
+    write_csv,
+    write_table_cache,
+    write_table_csv,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def ols_fit(points: list[Point]) -> tuple[float, float] | None:
+    """(slope, intercept) of the least-squares line, or None without x spread."""
+    if len(points) < 2:
+        return None
+    xs = [p.year for p in points]
+    ys = [p.value for p in points]
+    xbar = sum(xs) / len(xs)
+    ybar = sum(ys) / len(ys)
+    den = sum((x - xbar) ** 2 for x in xs)
+    if den == 0:
+        return None
+    slope = sum((x - xbar) * (y - ybar) for x, y in zip(xs, ys, strict=False)) / den
+    return slope, ybar - slope * xbar
+
+
+def ols_slope(points: list[Point]) -> float | None:
+    fit = ols_fit(points)
+    return None if fit is None else fit[0]
+
+
+# Above this size theil_sen_slope switches from enumerating all n^2 pairwise slopes to
+# randomized slope selection, which returns the same median in O(n log n) expected time.
+THEIL_SEN_SELECT_MIN_POINTS = 256
+
+# Exact selection on n points costs about as much as drawing this many times n*log2(n) sampled
+# slopes (measured in CPython), so theil_sen_slope_approx only samples when its sample is
+# smaller. At the default eps of 0.005 that is from about 4500 points on.
+THEIL_SEN_APPROX_COST_RATIO = 2
+
+
+def theil_sen_slope(points: list[Point]) -> float | None:
+    if len(points) < 2:
+        return None
+    if len(points) >= THEIL_SEN_SELECT_MIN_POINTS:
+        pts = sorted(points, key=lambda p: (p.year, p.value))
+        xs = [p.year for p in pts]
+        ys = [p.value for p in pts]
+        total = _pair_count(xs)
+        if total == 0:
+            return None
+        lo, hi = (total - 1) // 2, total // 2
+        picked = _select_pair_slopes(xs, ys, total, lo, hi, random.Random(len(xs)))
+        if picked is not None:
+            # Mirror statistics.median: middle element, or the mean of the two middle ones.
+            a, b = picked
+            return float(a if lo == hi else (a + b) / 2)
+    slopes: list[float] = []
+    for i in range(len(points)):
+        for j in range(i + 1, len(points)):
+            dx = points[j].year - points[i].year
+            if dx != 0:
+                slopes.append((points[j].value - points[i].value) / dx)
+    if not slopes:
+        return None
+    return float(median(slopes))
+
+
+def theil_sen_slope_approx(
+    points: list[Point], eps: float = 0.005, confidence: float = 0.99, seed: int = 0
+) -> float | None:
+    """
+    Theil-Sen slope from a random sample of pairwise slopes.
+
+    With probability >= ``confidence`` the returned slope's rank among all pairwise slopes is
+    within ``eps * n_pairs`` of the true median (DKW bound), at a cost independent of series
+    length. Falls back to the exact estimator where that is cheaper than the sample
+    (``THEIL_SEN_APPROX_COST_RATIO``), which is every series shorter than a few thousand points.
+    """
+    if len(points) < 2:
+        return None
+    xs = [p.year for p in points]
+    ys = [p.value for p in points]
+    total = _pair_count(xs)
+    if total == 0:
+        return None
+    m = math.ceil(math.log(2 / (1 - confidence)) / (2 * eps * eps))
+    n = len(xs)
+    if m >= min(total, THEIL_SEN_APPROX_COST_RATIO * n * math.log2(n)):
+        return theil_sen_slope(points)
+    rng = random.Random(seed)
+    sample: list[float] = []
+    while len(sample) < m:
+        i = rng.randrange(n)
+        j = rng.randrange(n)
+        if xs[i] != xs[j]:
+            sample.append(_pair_slope(xs, ys, i, j))
+    return float(median(sample))
+
+
+def _pair_count(xs: list[int]) -> int:
+    """Number of pairs with distinct x, i.e. the pairs that contribute a Theil-Sen slope."""
+    n = len(xs)
+    return n * (n - 1) // 2 - sum(c * (c - 1) // 2 for c in Counter(xs).values())
+
+
+def _pair_slope(xs: list[int], ys: list[float], i: int, j: int) -> float:
+    # Orient like the brute-force loop (x ascending) so zero slopes keep the same sign.
+    if xs[i] > xs[j]:
+        i, j = j, i
+    return (ys[j] - ys[i]) / (xs[j] - xs[i])
+
+
+class _Fenwick:
+    """Counting Fenwick tree over ranks 0..n-1."""
+
+    __slots__ = ("tree",)
+
+    def __init__(self, n: int) -> None:
+        self.tree = [0] * (n + 1)
+
+    def add(self, i: int) -> None:
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += 1
+            i += i & -i
+
+    def count_below(self, i: int) -> int:
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def kth(self, k: int) -> int:
+        """Smallest rank r such that k inserted ranks are <= r (k is 1-based)."""
+        pos = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+def _bound_order(
+    xs: list[int], ys: list[float], bound: float, upper: bool, pad: float
+) -> list[int] | None:
+    """
+    Point indices ordered by ``y - t * x`` for t just below (or above, if ``upper``) ``bound``.
+
+    Walking t up from -inf (plain x-order), a pair swaps places exactly when t passes its
+    slope, so the pairs inverted relative to x-order are those with slope below t. At t = 0
+    the keys are the raw y values, which splits off exactly-zero slopes without rounding;
+    elsewhere t is moved ``pad`` outward to absorb rounding in the keys.
+    """
+    n = len(xs)
+    if bound == -math.inf:
+        return list(range(n))
+    if bound == math.inf:
+        return sorted(range(n), key=lambda i: (-xs[i], ys[i], i))
+    if bound == 0:
+        if upper:
+            return sorted(range(n), key=lambda i: (ys[i], -xs[i], i))
+        return sorted(range(n), key=lambda i: (ys[i], i))
+    t = bound + pad if upper else bound - pad
+    keys = [y - t * x for x, y in zip(xs, ys, strict=True)]
+    if not all(math.isfinite(k) for k in keys):
+        return None
+    return sorted(range(n), key=lambda i: (keys[i], i))
+
+
+def _inversions(first: list[int], second: list[int]) -> tuple[list[int], list[int]]:
+    """
+    Compare two orders of the same points.
+
+    Returns (rank, counts): rank[p] is the position in ``second`` of ``first[p]`` and
+    counts[p] is how many earlier elements of ``first`` come after it in ``second``.
+    """
+    pos = [0] * len(second)
+    for k, i in enumerate(second):
+        pos[i] = k
+    rank = [pos[i] for i in first]
+    tree = _Fenwick(len(first))
+    counts = []
+    for p, r in enumerate(rank):
+        counts.append(p - tree.count_below(r + 1))
+        tree.add(r)
+    return rank, counts
+
+
+def _inverted_pairs(
+    first: list[int], rank: list[int], counts: list[int], picks: dict[int, list[int]]
+) -> list[tuple[int, int]]:
+    """Resolve picks {p: [k-th inverted partner of first[p], ...]} into point-index pairs."""
+    owner = [0] * len(rank)
+    for p, r in enumerate(rank):
+        owner[r] = p
+    tree = _Fenwick(len(rank))
+    out: list[tuple[int, int]] = []
+    for p, r in enumerate(rank):
+        for k in picks.get(p, ()):
+            # Partners are the earlier ranks above r; skip the p - counts[p] at or below it.
+            partner = owner[tree.kth(p - counts[p] + k + 1)]
+            out.append((first[partner], first[p]))
+        tree.add(r)
+    return out
+
+
+def _select_pair_slopes(
+    xs: list[int], ys: list[float], total: int, lo: int, hi: int, rng: random.Random
+) -> tuple[float, float] | None:
+    """
+    Exact lo-th and hi-th smallest pairwise slopes of x-sorted points, or None to fall back.
+
+    Randomized slope selection: sample slopes from the current bracket, shrink it around the
+    target ranks, and verify each bracket by inversion counting (O(n log n) per round). Once
+    few pairs remain they are enumerated and computed exactly as in the brute-force loop.
+    Bracket thresholds sit a rounding margin outside the sampled slopes, and the answer is
+    only accepted if it lies inside the sampled bounds, so float error cannot change it.
+    """
+    n = len(xs)
+    if not all(math.isfinite(x) for x in xs) or not all(math.isfinite(y) for y in ys):
+        return None
+    xmax = max(abs(x) for x in xs)
+    ymax = max(abs(y) for y in ys)
+    distinct = sorted(set(xs))
+    dmin = min(b - a for a, b in zip(distinct, distinct[1:], strict=False))
+    eps = sys.float_info.epsilon
+
+    def margin(t: float) -> float:
+        return 4 * eps * ((2 * abs(t) * xmax + ymax) / dmin + 2 * abs(t)) + sys.float_info.min
+
+    def count_below(order: list[int]) -> int:
+        return sum(_inversions(list(range(n)), order)[1])
+
+    cap = max(4 * n, 1024)
+    low_bound, high_bound = -math.inf, math.inf
+    low_order = list(range(n))
+    high_order = _bound_order(xs, ys, math.inf, True, 0.0)
+    below, inside = 0, total
+    spread = 3.0
+    for _ in range(12):
+        if inside <= cap or low_bound == high_bound == 0:
+            break
+        rank, counts = _inversions(low_order, high_order)
+        m = min(inside, max(n, 256))
+        cumulative = []
+        acc = 0
+        for c in counts:
+            acc += c
+            cumulative.append(acc)
+        picks: dict[int, list[int]] = defaultdict(list)
+        for _ in range(m):
+            r = rng.randrange(inside)
+            p = bisect_right(cumulative, r)
+            picks[p].append(r - (cumulative[p] - counts[p]))
+        sample = sorted(
+            _pair_slope(xs, ys, a, b) for a, b in _inverted_pairs(low_order, rank, counts, picks)
+        )
+        width = spread * math.sqrt(m)
+        i0 = math.floor((lo - below) / inside * m - width)
+        i1 = math.ceil((hi - below) / inside * m + width)
+        new_low = sample[i0] if i0 >= 0 else low_bound
+        new_high = sample[i1] if i1 < m else high_bound
+        if (new_low, new_high) == (low_bound, high_bound):
+            break  # the sample is one tied value the bracket cannot split any further
+        new_low_order, new_below = low_order, below
+        if new_low != low_bound:
+            new_low_order = _bound_order(xs, ys, new_low, False, margin(new_low))
+            if new_low_order is None:
+                return None
+            new_below = count_below(new_low_order)
+        new_high_order, new_upto = high_order, below + inside
+        if new_high != high_bound:
+            new_high_order = _bound_order(xs, ys, new_high, True, margin(new_high))
+            if new_high_order is None:
+                return None
+            new_upto = count_below(new_high_order)
+        if new_below <= lo and hi < new_upto:
+            low_bound, high_bound = new_low, new_high
+            low_order, high_order = new_low_order, new_high_order
+            below, inside = new_below, new_upto - new_below
+        else:
+            spread *= 2
+
+    if low_bound == high_bound == 0:
+        return 0.0, 0.0  # the bracket holds exactly the zero slopes
+    if inside > max(cap, total // 8):
+        return None
+    rank, counts = _inversions(low_order, high_order)
+    if sum(counts) != inside:
+        return None
+    picks = {p: list(range(c)) for p, c in enumerate(counts) if c}
+    slopes = sorted(
+        _pair_slope(xs, ys, a, b) for a, b in _inverted_pairs(low_order, rank, counts, picks)
+    )
+    a, b = slopes[lo - below], slopes[hi - below]
+    if not (low_bound <= a and b <= high_bound):
+        return None
+    return a, b
+
+
+def pack_series(series: list[list[Point]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pack year-sorted series into zero-padded (groups x max_len) year/value arrays + counts."""
+    np = numpy()
+    width = max((len(pts) for pts in series), default=0)
+    years = np.zeros((len(series), width), dtype=np.int64)
+    values = np.zeros((len(series), width), dtype=np.float64)
+    counts = np.zeros(len(series), dtype=np.int64)
+    for g, pts in enumerate(series):
+        counts[g] = len(pts)
+        years[g, : len(pts)] = [p.year for p in pts]
+        values[g, : len(pts)] = [p.value for p in pts]
+    return years, values, counts
+
+
+def batch_ols_fit(
+    years: np.ndarray, values: np.ndarray, counts: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    OLS slope/intercept for every packed series at once.
+
+    Sums are accumulated column by column (vectorized across groups) so each group sees the
+    same left-to-right float additions as ``ols_slope``; results are bit-identical to it.
+    Returns (slope, intercept, ok) where ``ok`` marks groups with n >= 2 and non-zero x spread.
+    """
+    np = numpy()
+    mask = np.arange(years.shape[1]) < counts[:, None]
+    n = np.maximum(counts, 1)
+    xbar = years.sum(axis=1) / n
+    ysum = np.zeros(len(counts))
+    for j in range(years.shape[1]):
+        ysum += np.where(mask[:, j], values[:, j], 0.0)
+    ybar = ysum / n
+
+    den = np.zeros(len(counts))
+    num = np.zeros(len(counts))
+    for j in range(years.shape[1]):
+        dx = years[:, j] - xbar
+        den += np.where(mask[:, j], dx**2, 0.0)
+        num += np.where(mask[:, j], dx * (values[:, j] - ybar), 0.0)
+
+    ok = (counts >= 2) & (den != 0)
+    slope = np.divide(num, den, out=np.zeros_like(num), where=ok)
+    intercept = ybar - slope * xbar
+    return slope, intercept, ok
+
+
+def trend_direction(slope: float | None, eps: float = 1e-4) -> str:
+    if slope is None:
+        return "insufficient_data"
+    if slope > eps:
+        return "increasing"
+    if slope < -eps:
+        return "decreasing"
+    return "flat"
+
+
+def mann_kendall(points: list[Point]) -> tuple[int, float, float] | None:
+    """
+    Mann-Kendall trend test on a year-sorted series: (S, Z, two-sided p).
+
+    The variance of S is tie-corrected; Z carries the usual continuity correction.
+    """
+    n = len(points)
+    if n < 2:
+        return None
+    ys = [p.value for p in points]
+    s = sum((ys[j] > ys[i]) - (ys[j] < ys[i]) for i in range(n) for j in range(i + 1, n))
+    ties = sum(t * (t - 1) * (2 * t + 5) for t in Counter(ys).values())
+    var = (n * (n - 1) * (2 * n + 5) - ties) / 18
+    z = (s - (s > 0) + (s < 0)) / math.sqrt(var) if var > 0 else 0.0
+    return s, z, math.erfc(abs(z) / math.sqrt(2))
+
+
+# Upper bound on elements of the pairwise (groups x pairs [x resamples]) arrays held at once.
+BATCH_CHUNK_ELEMENTS = 1 << 22
+
+
+def _group_chunks(n_groups: int, per_group: int) -> Iterator[slice]:
+    step = max(1, BATCH_CHUNK_ELEMENTS // max(per_group, 1))
+    for start in range(0, n_groups, step):
+        yield slice(start, min(start + step, n_groups))
+
+
+def batch_mann_kendall(
+    values: np.ndarray, counts: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``mann_kendall`` for every packed series at once; S is 0 and p is 1 below 2 points."""
+    np = numpy()
+    width = values.shape[1]
+    first, second = np.triu_indices(width, 1)
+    s = np.zeros(len(counts), dtype=np.int64)
+    for rows in _group_chunks(len(counts), len(first)):
+        signs = np.sign(values[rows][:, second] - values[rows][:, first]).astype(np.int64)
+        s[rows] = (signs * (second < counts[rows, None])).sum(axis=1)
+
+    # Tie term sum of t(t-1)(2t+5) over runs of equal values: an element k places into its
+    # run adds 6k(k+2), which telescopes to the run's term.
+    pos = np.arange(width)
+    valid = pos < counts[:, None]
+    ranked = np.sort(np.where(valid, values, np.inf), axis=1)
+    starts = np.ones(ranked.shape, dtype=bool)
+    starts[:, 1:] = ranked[:, 1:] != ranked[:, :-1]
+    k = pos - np.maximum.accumulate(np.where(starts, pos, 0), axis=1)
+    ties = (6 * k * (k + 2) * valid).sum(axis=1)
+
+    var = (counts * (counts - 1) * (2 * counts + 5) - ties) / 18
+    ok = var > 0
+    z = np.divide(s - np.sign(s), np.sqrt(np.where(ok, var, 1.0)), out=np.zeros(len(s)), where=ok)
+    p = np.array([math.erfc(abs(v) / math.sqrt(2)) for v in z.tolist()])
+    return s, z, p
+
+
+def bootstrap_draws(key: tuple[str, str, str], n: int, n_boot: int, seed: int) -> np.ndarray:
+    """
+    Resample indices (n_boot x n) for one series.
+
+    The generator is seeded from ``seed`` and the group key, so a series gets the same
+    resamples however groups are batched, filtered or cached.
+    """
+    np = numpy()
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    rng = np.random.default_rng([seed, int.from_bytes(digest, "little")])
+    return rng.integers(0, n, size=(n_boot, n))
+
+
+def batch_bootstrap_theil_sen(
+    keys: list[tuple[str, str, str]],
+    years: np.ndarray,
+    values: np.ndarray,
+    counts: np.ndarray,
+    n_boot: int,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Theil-Sen slope of every bootstrap resample of every packed series (groups x n_boot).
+
+    A resample only reweights the original pairs: a pair (i, j) occurs w_i * w_j times when
+    the points were drawn w_i and w_j times, and copies of one point share a year, so they
+    never pair. Pair slopes are computed and sorted once per series; each resample's
+    estimate is the weighted median, read off the cumulative weights for all resamples at
+    once. NaN where a resample has no pairs.
+    """
+    np = numpy()
+    width = values.shape[1]
+    first, second = np.triu_indices(width, 1)
+    out = np.full((len(counts), n_boot), np.nan)
+    for rows in _group_chunks(len(counts), len(first)):
+        dx = years[rows][:, second] - years[rows][:, first]
+        ok = (second < counts[rows, None]) & (dx != 0)
+        slopes = np.divide(
+            values[rows][:, second] - values[rows][:, first],
+            dx,
+            out=np.full(dx.shape, np.inf),
+            where=ok,
+        )
+        order = np.argsort(slopes, axis=1, kind="stable")
+        n_pairs = ok.sum(axis=1)
+        for i, g in enumerate(range(rows.start, rows.stop)):
+            n, m = int(counts[g]), int(n_pairs[i])
+            if m == 0:
+                continue
+            draws = bootstrap_draws(keys[g], n, n_boot, seed)
+            # (points x resamples) layout keeps the per-pair gathers and cumsum contiguous
+            flat = (draws + np.arange(n_boot)[:, None] * n).ravel()
+            weights = np.bincount(flat, minlength=n_boot * n).reshape(n_boot, n).T
+            # sum of w_i * w_j is at most n^2 / 2, so int32 holds it for any real series
+            weights = weights.astype(np.int32 if n * n < 2**31 else np.int64)
+            picked = order[i, :m]
+            pair_w = np.take(weights, first[picked], axis=0)
+            pair_w *= np.take(weights, second[picked], axis=0)
+            cum = np.cumsum(pair_w, axis=0, dtype=weights.dtype)
+            total = cum[-1]
+            # Mirror statistics.median: middle element, or the mean of the two middle ones.
+            lo = (cum <= (total - 1) // 2).sum(axis=0)
+            hi = (cum <= total // 2).sum(axis=0)
+            ranked = slopes[i, picked]
+            a = ranked[np.minimum(lo, m - 1)]
+            b = ranked[np.minimum(hi, m - 1)]
+            out[g] = np.where(total > 0, np.where(lo == hi, a, (a + b) / 2), np.nan)
+    return out
+
+
+def bootstrap_ci(estimates: np.ndarray, level: float) -> tuple[np.ndarray, np.ndarray]:
+    """Percentile interval per row of bootstrap estimates; NaN for rows with none."""
+    np = numpy()
+    low = np.full(len(estimates), np.nan)
+    high = np.full(len(estimates), np.nan)
+    has = ~np.isnan(estimates).all(axis=1) if estimates.size else np.zeros(0, dtype=bool)
+    if has.any():
+        tails = [(1 - level) / 2, (1 + level) / 2]
+        low[has], high[has] = np.nanquantile(estimates[has], tails, axis=1)
+    return low, high
+
+
+def auto_engine(n_series: int, n_boot: int = 0) -> str:
+    """Engine for ``--engine auto``: batch for bootstraps or many series, if numpy is installed."""
+    # bootstrap intervals need the batch engine; small runs skip importing numpy
+    wants_batch = n_boot > 0 or n_series >= VECTORIZE_MIN_SERIES
+    return "batch" if wants_batch and has_numpy() else "python"
+
+
+def summarize_all(
+    keys: list[tuple[str, str, str]],
+    series: list[list[Point]],
+    min_years: int,
+    theil_sen: Callable[[list[Point]], float | None],
+    engine: str,
+    n_boot: int = 0,
+    ci_level: float = 0.95,
+    seed: int = 0,
+) -> list[dict[str, object]]:
+    if engine == "batch":
+        return summarize_batch(keys, series, min_years, theil_sen, n_boot, ci_level, seed)
+    if n_boot > 0:
+        raise RuntimeError("Bootstrap intervals require the batch engine (numpy).")
+    return [
+        summarize_series(*key, pts, min_years, theil_sen)
+        for key, pts in zip(keys, series, strict=True)
+    ]
+
+
+def group_series(
+    table: CleanTable, metrics: list[str]
+) -> tuple[list[tuple[str, str, str]], list[list[Point]]]:
+    """
+    Year-sorted series per (site, buffer, metric), one per metric for every site and buffer.
+
+    ``table`` must be sorted (``CleanTable.sorted``); each site and buffer is a row range.
+    """
+    series_keys: list[tuple[str, str, str]] = []
+    series_points: list[list[Point]] = []
+    for site_name, buffer_m, start, stop in table.group_ranges():
+        for metric in metrics:
+            series_keys.append((site_name, buffer_m, metric))
+            series_points.append(table.points(metric, start, stop))
+    return series_keys, series_points
+
+
+CACHE_VERSION = 2
+
+TrendCache = dict[tuple[str, str, str], tuple[str, dict[str, object]]]
+
+
+def series_hash(pts: list[Point]) -> str:
+    """Content hash of a year-sorted series (exact year/value bits)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(len(pts).to_bytes(8, "little"))
+    h.update(array("q", [p.year for p in pts]).tobytes())
+    h.update(array("d", [p.value for p in pts]).tobytes())
+    return h.hexdigest()
+
+
+def load_trend_cache(path: Path, params: dict[str, object]) -> TrendCache:
+    """Cached (hash, summary row) per group; empty if missing or fitted with other params."""
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != CACHE_VERSION or data.get("params") != params:
+        return {}
+    return {
+        (site_name, buffer_m, metric): (digest, row)
+        for site_name, buffer_m, metric, digest, row in data["groups"]
+    }
+
+
+def save_trend_cache(path: Path, params: dict[str, object], cache: TrendCache) -> None:
+    data = {
+        "version": CACHE_VERSION,
+        "params": params,
+        "groups": [[*key, digest, row] for key, (digest, row) in cache.items()],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    tmp.replace(path)
+
+
+def summarize_cached(
+    keys: list[tuple[str, str, str]],
+    series: list[list[Point]],
+    cache: TrendCache,
+    summarize: Callable[[list[tuple[str, str, str]], list[list[Point]]], list[dict[str, object]]],
+) -> tuple[list[dict[str, object]], TrendCache, int]:
+    """
+    Refit only the groups whose points changed since the cached run.
+
+    Returns (summary rows in key order, the cache for this run, number of groups refit).
+    Groups absent from this run are dropped from the returned cache.
+    """
+    hashes = [series_hash(pts) for pts in series]
+    rows: list[dict[str, object] | None] = []
+    stale: list[int] = []
+    for i, (key, digest) in enumerate(zip(keys, hashes, strict=True)):
+        hit = cache.get(key)
+        if hit is not None and hit[0] == digest:
+            rows.append(hit[1])
+        else:
+            rows.append(None)
+            stale.append(i)
+    fresh = summarize([keys[i] for i in stale], [series[i] for i in stale])
+    for i, row in zip(stale, fresh, strict=True):
+        rows[i] = row
+    out = [row for row in rows if row is not None]
+    new_cache = {key: (digest, row) for key, digest, row in zip(keys, hashes, out, strict=True)}
+    return out, new_cache, len(stale)
+
+
+SUMMARY_FIELDS = [
+    "site_name",
+    "buffer_m",
+    "metric",
+    "n_years",
+    "start_year",
+    "end_year",
+    "start_value",
+    "end_value",
+    "abs_change",
+    "pct_change",
+    "ols_slope_per_year",
+    "theil_sen_slope_per_year",
+    "direction_ols",
+    "direction_theil_sen",
+    "mk_s",
+    "mk_z",
+    "mk_p",
+    "theil_sen_ci_low",
+    "theil_sen_ci_high",
+]
+
+
+def summarize_series(
+    site_name: str,
+    buffer_m: str,
+    metric: str,
+    pts: list[Point],
+    min_years: int,
+    theil_sen: Callable[[list[Point]], float | None] = theil_sen_slope,
+) -> dict[str, object]:
+    n = len(pts)
+    start_year = pts[0].year if pts else None
+    end_year = pts[-1].year if pts else None
+    start_val = pts[0].value if pts else None
+    end_val = pts[-1].value if pts else None
+    abs_change = (end_val - start_val) if (start_val is not None and end_val is not None) else None
+    pct_change = None
+    if start_val is not None and end_val is not None and start_val != 0:
+        pct_change = ((end_val - start_val) / abs(start_val)) * 100
+
+    slope_ols = ols_slope(pts) if n >= min_years else None
+    slope_theil = theil_sen(pts) if n >= min_years else None
+    mk = mann_kendall(pts) if n >= min_years else None
+    mk_s, mk_z, mk_p = mk if mk is not None else (None, None, None)
+
+    return {
+        "site_name": site_name,
+        "buffer_m": buffer_m,
+        "metric": metric,
+        "n_years": n,
+        "start_year": start_year,
+        "end_year": end_year,
+        "start_value": start_val,
+        "end_value": end_val,
+        "abs_change": abs_change,
+        "pct_change": pct_change,
+        "ols_slope_per_year": slope_ols,
+        "theil_sen_slope_per_year": slope_theil,
+        "direction_ols": trend_direction(slope_ols),
+        "direction_theil_sen": trend_direction(slope_theil),
+        "mk_s": mk_s,
+        "mk_z": mk_z,
+        "mk_p": mk_p,
+        # bootstrap intervals need the batch engine
+        "theil_sen_ci_low": None,
+        "theil_sen_ci_high": None,
+    }
+
+
+def summarize_batch(
+    keys: list[tuple[str, str, str]],
+    series: list[list[Point]],
+    min_years: int,
+    theil_sen: Callable[[list[Point]], float | None] = theil_sen_slope,
+    n_boot: int = 0,
+    ci_level: float = 0.95,
+    seed: int = 0,
+) -> list[dict[str, object]]:
+    """
+    Vectorized equivalent of ``summarize_series`` over every (site, buffer, metric) group.
+
+    With ``n_boot`` > 0 it also fills ``ci_level`` percentile bootstrap intervals for the
+    Theil-Sen slope, from ``n_boot`` seeded resamples per group.
+    """
+    np = numpy()
+    if np is None:
+        raise RuntimeError("The batch engine requires numpy (pip install numpy).")
+    if not series:
+        return []
+
+    years, values, counts = pack_series(series)
+    last = np.maximum(counts - 1, 0)
+    rows_idx = np.arange(len(series))
+    has_pts = counts > 0
+    start_year = years[:, 0]
+    end_year = years[rows_idx, last]
+    start_val = values[:, 0]
+    end_val = values[rows_idx, last]
+    abs_change = end_val - start_val
+    has_pct = has_pts & (start_val != 0)
+    pct_change = np.divide(
+        abs_change, np.abs(start_val), out=np.zeros_like(abs_change), where=has_pct
+    )
+    pct_change *= 100
+    slope, _, ok = batch_ols_fit(years, values, counts)
+    fit = ok & (counts >= min_years)
+    enough = counts >= min_years
+    mk_s, mk_z, mk_p = batch_mann_kendall(values, counts)
+    ci_low = np.full(len(series), np.nan)
+    ci_high = np.full(len(series), np.nan)
+    if n_boot > 0:
+        boot = np.flatnonzero(enough & (counts >= 2))
+        estimates = batch_bootstrap_theil_sen(
+            [keys[g] for g in boot], years[boot], values[boot], counts[boot], n_boot, seed
+        )
+        ci_low[boot], ci_high[boot] = bootstrap_ci(estimates, ci_level)
+
+    # .tolist() hands plain Python scalars to csv, which would otherwise repr numpy floats.
+    columns = zip(
+        counts.tolist(),
+        has_pts.tolist(),
+        start_year.tolist(),
+        end_year.tolist(),
+        start_val.tolist(),
+        end_val.tolist(),
+        abs_change.tolist(),
+        has_pct.tolist(),
+        pct_change.tolist(),
+        slope.tolist(),
+        fit.tolist(),
+        enough.tolist(),
+        mk_s.tolist(),
+        mk_z.tolist(),
+        mk_p.tolist(),
+        ci_low.tolist(),
+        ci_high.tolist(),
+        strict=True,
+    )
+    out: list[dict[str, object]] = []
+    for g, ((site_name, buffer_m, metric), col) in enumerate(zip(keys, columns, strict=True)):
+        n, present, y0, y1, v0, v1, dv, pct_ok, pct, s, s_ok, mk_ok, ms, mz, mp, lo, hi = col
+        slope_ols = s if s_ok else None
+        slope_theil = theil_sen(series[g]) if n >= min_years else None
+        out.append(
+            {
+                "site_name": site_name,
+                "buffer_m": buffer_m,
+                "metric": metric,
+                "n_years": n,
+                "start_year": y0 if present else None,
+                "end_year": y1 if present else None,
+                "start_value": v0 if present else None,
+                "end_value": v1 if present else None,
+                "abs_change": dv if present else None,
+                "pct_change": pct if pct_ok else None,
+                "ols_slope_per_year": slope_ols,
+                "theil_sen_slope_per_year": slope_theil,
+                "direction_ols": trend_direction(slope_ols),
+                "direction_theil_sen": trend_direction(slope_theil),
+                "mk_s": ms if mk_ok and n >= 2 else None,
+                "mk_z": mz if mk_ok and n >= 2 else None,
+                "mk_p": mp if mk_ok and n >= 2 else None,
+                "theil_sen_ci_low": None if math.isnan(lo) else lo,
+                "theil_sen_ci_high": None if math.isnan(hi) else hi,
+            }
+        )
+    return out
+
+
+def add_fit_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--min-years",
+        type=int,
+        default=8,
+        help="Minimum data points required before reporting slopes (default: 8).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "batch", "python"],
+        default="auto",
+        help=(
+            "Trend engine: numpy 'batch', per-group 'python', or 'auto' "
+            "(batch for large or bootstrapped runs when numpy is installed)."
+        ),
+    )
+    parser.add_argument(
+        "--theil-sen",
+        choices=["exact", "approx"],
+        default="exact",
+        help="Theil-Sen estimator: exact median, or sampled 'approx', which only samples series "
+        "long enough for that to be faster (about 4500+ points at the default eps) and is exact "
+        "below that.",
+    )
+    parser.add_argument(
+        "--theil-sen-eps",
+        type=float,
+        default=0.005,
+        help="Approx mode rank error bound, as a fraction of all pairs (default: 0.005).",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        help="Bootstrap resamples for Theil-Sen confidence intervals; 0 skips them (needs numpy).",
+    )
+    parser.add_argument(
+        "--ci-level",
+        type=float,
+        default=0.95,
+        help="Confidence level of the bootstrap intervals (default: 0.95).",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the bootstrap resamples (default: 0)."
+    )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="Per-group trend cache (JSON); only groups whose points changed are refit.",
+    )
+
+
+def read_inputs(
+    paths: list[Path], metrics: list[str], args: argparse.Namespace, conflicts_out: Path | None
+) -> tuple[int, CleanTable, Resolution | None]:
+    """
+    Read and clean the exports for ``args`` (workers, --site/--buffer, --dedup).
+
+    Returns (input row count, table in input order, dedup resolution or None); the conflict
+    report goes to ``conflicts_out`` when deduplicating.
+    """
+    sites, buffers = comma_list(args.site), comma_list(args.buffer)
+    resolution = None
+    if args.dedup:
+        resolution = resolve(paths, args.dedup, sites, buffers)
+        write_csv(conflicts_out, resolution.report_rows(), CONFLICT_FIELDS)
+    n_rows, table = read_partitions(
+        paths, metrics, args.workers, sites, buffers, resolution and resolution.skips
+    )
+    if n_rows == 0:
+        raise ValueError("Input CSV is empty.")
+    return n_rows, table, resolution
+
+
+@dataclass
+class TrendFit:
+    """Output of ``fit_table``: the table in clean CSV order and one summary row per series."""
+
+    table: CleanTable
+    rows: list[dict[str, object]]
+    n_refit: int
+
+
+def fit_table(table: CleanTable, metrics: list[str], args: argparse.Namespace) -> TrendFit:
+    """
+    Sort a clean table and fit every series with the ``add_fit_arguments`` options.
+
+    Raises ValueError when a bootstrap is requested without the batch engine.
+    """
+    with stage("group", items=len(table)):
+        table = table.sorted()
+        series_keys, series_points = group_series(table, metrics)
+
+    theil_sen = theil_sen_slope
+    if args.theil_sen == "approx":
+        theil_sen = partial(theil_sen_slope_approx, eps=args.theil_sen_eps)
+
+    engine = args.engine
+    if engine == "auto":
+        engine = auto_engine(len(series_keys), args.bootstrap)
+    if args.bootstrap > 0 and engine != "batch":
+        raise ValueError("--bootstrap needs the batch engine (install numpy).")
+
+    def summarize(
+        keys: list[tuple[str, str, str]], series: list[list[Point]]
+    ) -> list[dict[str, object]]:
+        return summarize_all(
+            keys,
+            series,
+            args.min_years,
+            theil_sen,
+            engine,
+            args.bootstrap,
+            args.ci_level,
+            args.seed,
+        )
+
+    n_refit = len(series_keys)
+    fit = stage("fit", items=len(series_keys), engine=engine)
+    if args.cache:
+        cache_path = Path(args.cache)
+        params: dict[str, object] = {
+            "min_years": args.min_years,
+            "theil_sen": args.theil_sen,
+            "theil_sen_eps": args.theil_sen_eps,
+            "bootstrap": args.bootstrap,
+            "ci_level": args.ci_level,
+            "seed": args.seed,
+        }
+        with fit as record:
+            summary_rows, cache, n_refit = summarize_cached(
+                series_keys, series_points, load_trend_cache(cache_path, params), summarize
+            )
+            record.fields["refit"] = n_refit
+        save_trend_cache(cache_path, params, cache)
+    else:
+        with fit:
+            summary_rows = summarize(series_keys, series_points)
+    return TrendFit(table, summary_rows, n_refit)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="dig-eco trends",
+        description="Compute site/buffer trend summaries from GEE CSV.",
+    )
+    parser.add_argument(
+        "--input",
+        required=True,
+        nargs="+",
+        help="Input long-form CSV(s) exported from GEE, plain or compressed; partition files or "
+        "glob patterns.",
+    )
+    parser.add_argument(
+        "--summary-out",
+        default=None,
+        help="Output summary CSV path. Default: <input base>_trend_summary.csv",
+    )
+    parser.add_argument(
+        "--clean-out",
+        default=None,
+        help="Output cleaned CSV path. Default: <input base>_clean.csv",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=",".join(DEFAULT_METRICS),
+        help="Comma-separated metric columns to summarize.",
+    )
+    add_workers_argument(parser, "parse multiple input files")
+    parser.add_argument(
+        "--compress",
+        choices=FORMATS,
+        default=None,
+        help="Compress the clean and summary CSVs, adding .gz/.bz2/.xz/.zst to their names "
+        "(zst needs zstandard). Inputs are decompressed whatever this is set to.",
+    )
+    add_fit_arguments(parser)
+    add_subset_arguments(parser)
+    add_dedup_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(args.profile)
+
+    input_paths = expand_inputs(args.input)
+    sites, buffers = comma_list(args.site), comma_list(args.buffer)
+    summary_out = Path(args.summary_out) if args.summary_out else None
+    clean_out = Path(args.clean_out) if args.clean_out else None
+    conflicts_out = Path(args.conflicts_out) if args.conflicts_out else None
+    if summary_out is None or clean_out is None or (args.dedup and conflicts_out is None):
+        try:
+            base = f"{merged_base(input_paths)}{subset_tag(sites, buffers)}"
+        except ValueError:
+            needed = ["--summary-out", "--clean-out"] + (["--conflicts-out"] if args.dedup else [])
+            parser.error(f"Inputs do not share a partition base name; pass {', '.join(needed)}.")
+        summary_out = summary_out or Path(f"{base}_trend_summary.csv")
+        clean_out = clean_out or Path(f"{base}_clean.csv")
+        conflicts_out = conflicts_out or Path(f"{base}_conflicts.csv")
+    summary_out = with_format(summary_out, args.compress)
+    clean_out = with_format(clean_out, args.compress)
+    try:
+        check_codecs([summary_out, clean_out])
+    except RuntimeError as e:
+        parser.error(str(e))
+    metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+
+    try:
+        n_rows, table, resolution = read_inputs(input_paths, metrics, args, conflicts_out)
+        trend = fit_table(table, metrics, args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    write_table_csv(clean_out, trend.table)
+    write_table_cache(clean_out, trend.table)
+    write_csv(summary_out, trend.rows, SUMMARY_FIELDS)
+
+    print(f"Input rows: {n_rows}")
+    if resolution:
+        print(
+            f"Duplicate rows dropped ({args.dedup}): {len(resolution.dropped)} -> {conflicts_out}"
+        )
+    print(f"Clean rows written: {len(trend.table)} -> {clean_out}")
+    print(f"Trend summary rows written: {len(trend.rows)} -> {summary_out}")
+    if args.cache:
+        print(f"Groups refit: {trend.n_refit} of {len(trend.rows)} (cache: {args.cache})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from dig_eco import anomaly as a
+from dig_eco.io import Point
+
+
+def _series(rng: random.Random) -> tuple[list[tuple[str, str, str]], list[list[Point]]]:
+    keys, series = [], []
+    for site in ("Site A", "Site B", "Site C"):
+        for metric in ("mean_ndvi", "bare_pct"):
+            years = sorted(rng.sample(range(1984, 2026), rng.randint(2, 30)))
+            keys.append((site, "1000", metric))
+            # rounded values leave tied magnitudes for the ranking to order
+            series.append([Point(y, round(rng.uniform(-1, 1), 1)) for y in years])
+    return keys, series
+
+
+def test_vectorized_flags_match_pure_python(monkeypatch) -> None:
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(a, "VECTORIZE_MIN_SERIES", 0)
+    keys, series = _series(random.Random(4))
+    fast = a.flag_anomalies(keys, series, top_long_run=4, top_spikes=15)
+    monkeypatch.setattr(a, "numpy", lambda: None)
+    assert a.flag_anomalies(keys, series, top_long_run=4, top_spikes=15) == fast
+
+
+def test_top_spikes_match_stable_full_sort() -> None:
+    keys, series = _series(random.Random(9))
+    rows = a.flag_anomalies(keys, series, top_long_run=0, top_spikes=25)
+    jumps = [
+        (abs((p1.value - p0.value) / (p1.year - p0.year)), key, p0.year)
+        for key, pts in zip(keys, series, strict=True)
+        for p0, p1 in zip(pts, pts[1:], strict=False)
+    ]
+    expected = sorted(jumps, key=lambda j: j[0], reverse=True)[:25]
+    got = sorted(rows, key=lambda r: r["global_rank"])
+    assert [
+        (r["abs_delta_per_year"], r["site_name"], r["metric"], r["start_year"]) for r in got
+    ] == [(mag, key[0], key[2], year) for mag, key, year in expected]
+
+
+def test_low_valid_pixel_years_are_dropped(tmp_path) -> None:
+    path = tmp_path / "clean.csv"
+    path.write_text(
+        "site_name,buffer_m,year,mean_ndvi,valid_px_pct\n"
+        "Site A,1000,2000,0.1,90\n"
+        "Site A,1000,2001,0.9,40\n"
+        "Site A,1000,2002,0.3,75\n"
+    )
+    keys, series = a.read_clean_series(path, ["mean_ndvi"], min_valid_px=70.0)
+    assert keys == [("Site A", "1000", "mean_ndvi")]
+    assert [p.year for p in series[0]] == [2000, 2002]
+    rows = a.flag_anomalies(keys, series, top_long_run=1, top_spikes=1)
+    assert [(r["event_type"], r["delta_per_year"]) for r in rows] == [
+        (a.LONG_RUN, (0.3 - 0.1) / 2),
+        (a.SPIKE, (0.3 - 0.1) / 2),
+    ]
+
+
+def test_clean_csv_without_valid_pixels_needs_the_filter_off(tmp_path, capsys) -> None:
+    path = tmp_path / "clean.csv"
+    path.write_text(
+        "site_name,buffer_m,year,mean_ndvi\nSite A,1000,2000,0.1\nSite A,1000,2001,0.9\n"
+    )
+    with pytest.raises(SystemExit):
+        a.main(["--input-clean", str(path)])
+    assert "No valid_px_pct column" in capsys.readouterr().err
+    keys, series = a.read_clean_series(path, ["mean_ndvi"], min_valid_px=0)
+    assert keys == [("Site A", "1000", "mean_ndvi")]
+    assert [p.year for p in series[0]] == [2000, 2001]
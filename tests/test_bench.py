@@ -0,0 +1,46 @@
+from dig_eco import bench
+from dig_eco import io as dig_io
+
+
+def test_synthetic_export_parses_like_a_gee_export(tmp_path) -> None:
+    paths = bench.write_synthetic_export(
+        tmp_path, sites=5, years=(2000, 2009), n_metrics=12, partitions=2, buffers=("1000",)
+    )
+    assert [p.name for p in paths] == [
+        "synthetic_part_0_of_2_2000_2009.csv",
+        "synthetic_part_1_of_2_2000_2009.csv",
+    ]
+    assert dig_io.merged_base(paths) == tmp_path / "synthetic_2000_2009"
+    header = paths[0].read_text().splitlines()[0].split(",")
+    assert header[0] == "system:index" and header[-1] == ".geo"
+    assert "synthetic_metric_1" in header
+
+    metrics = bench.synthetic_metrics(12)
+    n_rows, table = dig_io.read_partitions(paths, metrics, workers=1)
+    assert n_rows == len(table) == 5 * 10
+    assert set(table.column("site_name")) == {f"Synthetic Mine {s:04d}" for s in range(5)}
+    filled = sum(v == v for m in metrics for v in table.values[m])
+    assert filled > 0.9 * 50 * 12
+
+
+def test_run_stages_times_every_stage(tmp_path) -> None:
+    paths = bench.write_synthetic_export(tmp_path, sites=2, years=(2000, 2011), n_metrics=3)
+    timings = bench.run_stages(paths, bench.synthetic_metrics(3), tmp_path, repeat=1, charts=2)
+    assert list(timings) == bench.STAGES
+    assert all(seconds > 0 for seconds in timings.values())
+    assert len(list(tmp_path.glob("bench_*.png"))) == 2
+
+
+def test_regressions_flag_slow_stages_above_noise_floor() -> None:
+    baseline = {"parse": 0.1, "fit": 0.2, "render": 0.001}
+    timings = {"parse": 0.16, "fit": 0.25, "render": 0.003, "encode": 9.0}
+    assert bench.regressions(timings, baseline, max_slowdown=1.5) == ["parse"]
+
+
+def test_saved_baseline_records_its_revision(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(bench, "source_revision", lambda: "abc1234-dirty")
+    path = tmp_path / "baseline.json"
+    bench.save_baseline(path, {"sites": 1}, {"parse": 0.5})
+    baseline = bench.load_baseline(path)
+    assert baseline["revision"] == "abc1234-dirty"
+    assert baseline["stages"] == {"parse": 0.5}
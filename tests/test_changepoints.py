@@ -0,0 +1,57 @@
+import random
+
+from dig_eco import changepoints as c
+from dig_eco.io import Point
+
+
+def _optimal_partition(values: list[float], penalty: float, min_size: int) -> list[int]:
+    """Unpruned O(n^2) optimal partitioning that PELT must reproduce."""
+    n = len(values)
+
+    def cost(a: int, b: int) -> float:
+        seg = values[a:b]
+        mean = sum(seg) / len(seg)
+        return sum((v - mean) ** 2 for v in seg)
+
+    best = {0: (-penalty, 0)}
+    for end in range(min_size, n + 1):
+        starts = [s for s in best if end - s >= min_size]
+        best[end] = min((best[s][0] + cost(s, end) + penalty, s) for s in starts)
+    changes, end = [], best[n][1]
+    while end > 0:
+        changes.append(end)
+        end = best[end][1]
+    return changes[::-1]
+
+
+def test_pelt_matches_optimal_partitioning() -> None:
+    rng = random.Random(5)
+    for _ in range(100):
+        level, values = 0.0, []
+        for _ in range(rng.randint(6, 50)):
+            if rng.random() < 0.1:
+                level = rng.uniform(-3, 3)
+            values.append(level + rng.gauss(0, 0.5))
+        penalty, min_size = rng.uniform(0.2, 5.0), rng.randint(1, 3)
+        got = c.pelt(values, penalty, min_size)
+        assert got == _optimal_partition(values, penalty, min_size)
+        assert all(b - a >= min_size for a, b in zip([0, *got], [*got, len(values)], strict=True))
+
+
+def test_step_onsets_and_means_are_reported_in_parallel() -> None:
+    rng = random.Random(1)
+    keys, series = [], []
+    for i in range(6):
+        onset = 1995 + 3 * i
+        pts = [
+            Point(y, (0.6 if y >= onset else 0.1) + rng.gauss(0, 0.02)) for y in range(1984, 2026)
+        ]
+        keys.append((f"Site {i}", "1000", "bare_pct"))
+        series.append(pts)
+    serial = c.detect_changepoints(keys, series, workers=1)
+    assert c.detect_changepoints(keys, series, workers=2) == serial
+    assert [row["onset_year"] for row in serial] == [1995 + 3 * i for i in range(6)]
+    for row in serial:
+        assert row["n_changepoints"] == 1
+        assert abs(row["mean_before"] - 0.1) < 0.02
+        assert abs(row["magnitude"] - 0.5) < 0.03
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from dig_eco import cli
+
+
+def test_help_lists_commands_without_loading_stages() -> None:
+    code = (
+        "import sys\n"
+        "from dig_eco.cli import main\n"
+        "try:\n"
+        "    main(['trends', '--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print([m for m in ('numpy', 'dig_eco.render', 'dig_eco.anomaly') if m in sys.modules])"
+    )
+    env = {**os.environ, "PYTHONPATH": str(Path(cli.__file__).resolve().parents[1])}
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+    ).stdout
+    assert "usage: dig-eco trends" in out
+    assert out.strip().endswith("[]")
+
+
+def test_unknown_command_exits(capsys) -> None:
+    with pytest.raises(SystemExit):
+        cli.main(["nope"])
+    assert "invalid choice" in capsys.readouterr().err
+
+
+def test_dispatch_runs_stage(tmp_path) -> None:
+    raw = tmp_path / "export.csv"
+    raw.write_text(
+        "site_name,buffer_m,year,mean_ndvi\n"
+        + "".join(f"Site A,1000,{1984 + i},{0.1 * i}\n" for i in range(10))
+    )
+    cli.main(["trends", "--input", str(raw), "--metrics", "mean_ndvi", "--engine", "python"])
+    summary = (tmp_path / "export_trend_summary.csv").read_text().splitlines()
+    assert summary[1].startswith("Site A,1000,mean_ndvi,10,")
+
+
+@pytest.mark.parametrize("command", ["trends", "pipeline"])
+def test_inputs_without_shared_base_are_a_usage_error(tmp_path, capsys, command) -> None:
+    paths = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    for path in paths:
+        path.write_text("site_name,buffer_m,year,mean_ndvi\nSite A,1000,1984,0.1\n")
+    extra = ["--outdir", str(tmp_path)] if command == "pipeline" else []
+    with pytest.raises(SystemExit):
+        cli.main([command, "--input", *map(str, paths), *extra])
+    err = capsys.readouterr().err
+    assert f"usage: dig-eco {command}" in err
+    assert "pass --summary-out" in err
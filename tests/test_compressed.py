@@ -0,0 +1,81 @@
+import gzip
+
+import pytest
+
+from dig_eco import cli, compressed, trends
+from dig_eco import io as dig_io
+
+EXPORT = (
+    "site_id,site_name,buffer_m,year,mean_ndvi,.geo\n"
+    + "".join(
+        f'a,Alpha,{b},{y},{y / 1e4},"{{""type"":""Point""}}"\n'
+        for y in range(1984, 2000)
+        for b in (1000, 2000)
+    )
+    + 'b,"Beta, North",1000,1990,0.5,"{}"\n'
+)
+
+
+@pytest.mark.parametrize("fmt", ["gz", "bz2", "xz"])
+def test_round_trip_detects_format_by_magic_bytes(tmp_path, fmt) -> None:
+    path = tmp_path / f"export.csv.{fmt}"
+    with compressed.open_text_out(path) as f:
+        f.write(EXPORT)
+    renamed = path.rename(tmp_path / "export.csv")  # the name no longer says it is compressed
+    assert compressed.detect(renamed) == fmt
+    with compressed.open_text(renamed) as f:
+        assert f.read() == EXPORT
+
+
+def test_compressed_export_reads_like_plain(tmp_path, monkeypatch) -> None:
+    plain = tmp_path / "export.csv"
+    plain.write_text(EXPORT)
+    packed = tmp_path / "export.csv.gz"
+    packed.write_bytes(gzip.compress(EXPORT.encode()))
+    monkeypatch.setattr(compressed, "CHUNK_BYTES", 64)  # many chunks through the queue
+
+    for sites, buffers in [(None, None), (["Beta, North"], None), (["a"], ["2000"])]:
+        expected = dig_io.read_clean_table(plain, ["mean_ndvi"], sites, buffers)
+        assert dig_io.read_clean_table(packed, ["mean_ndvi"], sites, buffers) == expected
+
+
+def test_read_errors_surface_in_the_reader(tmp_path) -> None:
+    path = tmp_path / "export.csv.gz"
+    path.write_bytes(gzip.compress(EXPORT.encode())[:-12])  # truncated stream
+    with pytest.raises(EOFError), compressed.open_text(path) as f:
+        f.read()
+
+
+def test_zstd_without_a_codec_is_a_clear_error(monkeypatch) -> None:
+    monkeypatch.setattr(compressed, "optional_import", lambda name: None)
+    with pytest.raises(RuntimeError, match="zstandard"):
+        compressed.codec("zst")
+
+
+@pytest.mark.parametrize("command", ["trends", "pipeline"])
+def test_zst_output_without_a_codec_is_a_usage_error(
+    tmp_path, monkeypatch, capsys, command
+) -> None:
+    monkeypatch.setattr(compressed, "optional_import", lambda name: None)
+    export = tmp_path / "export_1984_1999.csv"
+    export.write_text(EXPORT)
+    extra = ["--outdir", str(tmp_path / "fig")] if command == "pipeline" else []
+    with pytest.raises(SystemExit):
+        cli.main([command, "--input", str(export), "--compress", "zst", *extra])
+    assert "zstandard" in capsys.readouterr().err
+    assert sorted(p.name for p in tmp_path.iterdir()) == [export.name]
+
+
+def test_trends_writes_compressed_outputs(tmp_path) -> None:
+    export = tmp_path / "export_1984_1999.csv.gz"
+    export.write_bytes(gzip.compress(EXPORT.encode()))
+    trends.main(
+        ["--input", str(export), "--metrics", "mean_ndvi", "--engine", "python", "--compress", "gz"]
+    )
+    clean = tmp_path / "export_1984_1999_clean.csv.gz"
+    summary = tmp_path / "export_1984_1999_trend_summary.csv.gz"
+    assert compressed.detect(clean) == compressed.detect(summary) == "gz"
+    assert dig_io.table_cache_path(clean) == tmp_path / "export_1984_1999_clean.cols"
+    clean.with_name("export_1984_1999_clean.cols").unlink()
+    assert len(dig_io.read_clean_csv(clean)) == 33
+    assert dig_io.derived_path(clean, "changepoints").name == "export_1984_1999_changepoints.csv"
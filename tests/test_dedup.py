@@ -0,0 +1,64 @@
+import csv
+import os
+
+from dig_eco import dedup, trends
+from dig_eco import io as dig_io
+
+HEADER = "site_year_key,site_id,site_name,buffer_m,year,image_count,valid_px_pct,mean_ndvi\n"
+
+
+def write_export(path, rows: list[str], mtime_ns: int) -> None:
+    path.write_text(HEADER + "".join(r + "\n" for r in rows))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_policies_pick_one_row_per_site_year_and_buffer(tmp_path) -> None:
+    old = tmp_path / "export_a.csv"
+    new = tmp_path / "export_b.csv"
+    write_export(
+        old,
+        [
+            "a_1990.0,a,Alpha,1000,1990,9,50.0,0.1",
+            "a_1990.0,a,Alpha,2000,1990,1,10.0,0.2",  # other buffer: not a duplicate
+            "a_1991.0,a,Alpha,1000,1991,,99.0,0.3",
+        ],
+        10**18,
+    )
+    write_export(
+        new,
+        ["a_1990.0,a,Alpha,1000,1990,4,80.0,0.4", "a_1991.0,a,Alpha,1000,1991,2,,0.5"],
+        2 * 10**18,
+    )
+    paths = [old, new]
+
+    latest = dedup.resolve(paths, "latest")
+    assert (latest.rows, latest.keys, latest.skips) == (5, 3, [{0, 2}, set()])
+    assert dedup.resolve(paths, "image_count").skips == [{2}, {0}]
+    assert dedup.resolve(paths, "valid_px_pct").skips == [{0}, {1}]
+
+    report = latest.report_rows()
+    assert [(r["source"], r["row"], r["kept"]) for r in report] == [
+        (str(old), 0, "no"),
+        (str(new), 0, "yes"),
+        (str(old), 2, "no"),
+        (str(new), 1, "yes"),
+    ]
+
+    _, table = dig_io.read_partitions(paths, ["mean_ndvi"], workers=2, skips=latest.skips)
+    assert list(table.values["mean_ndvi"]) == [0.2, 0.4, 0.5]
+
+
+def test_trends_dedup_fits_each_site_year_once(tmp_path) -> None:
+    rows = [f"a_{y}.0,a,Alpha,1000,{y},3,90.0,{(y - 1990) / 10}" for y in range(1990, 2000)]
+    once = tmp_path / "once.csv"
+    twice = tmp_path / "twice.csv"
+    write_export(once, rows, 10**18)
+    write_export(twice, rows + rows[::2], 10**18)
+
+    for path, extra in [(once, []), (twice, ["--dedup", "latest"])]:
+        trends.main(["--input", str(path), "--metrics", "mean_ndvi", "--engine", "python", *extra])
+    with (tmp_path / "twice_conflicts.csv").open() as f:
+        assert sum(r["kept"] == "no" for r in csv.DictReader(f)) == 5
+    assert (tmp_path / "twice_trend_summary.csv").read_text() == (
+        tmp_path / "once_trend_summary.csv"
+    ).read_text()
@@ -0,0 +1,44 @@
+import json
+
+from dig_eco import instrument
+from dig_eco import io as dig_io
+
+
+def _records(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_stage_is_silent_without_profile(tmp_path, monkeypatch) -> None:
+    monkeypatch.delenv(instrument.PROFILE_ENV, raising=False)
+    with instrument.stage("fit", items=3) as record:
+        record.items = 4
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stage_writes_json_lines_and_excludes_laps(tmp_path, monkeypatch) -> None:
+    out = tmp_path / "profile.jsonl"
+    monkeypatch.setenv(instrument.PROFILE_ENV, str(out))
+    monkeypatch.setenv(instrument.RUN_ENV, "run1")
+    lap = instrument.Lap()
+    with instrument.stage("outer", items=2, file="x.csv") as record:
+        record.exclude(lap)
+        with lap:
+            sum(range(200_000))
+    (rec,) = _records(out)
+    assert rec["run"] == "run1" and rec["stage"] == "outer" and rec["items"] == 2
+    assert rec["file"] == "x.csv"
+    assert 0 <= rec["wall_s"] < lap.wall_s
+    assert rec["peak_rss_mb"] > 0
+
+
+def test_read_clean_rows_reports_read_and_clean(tmp_path, monkeypatch) -> None:
+    out = tmp_path / "profile.jsonl"
+    monkeypatch.setenv(instrument.PROFILE_ENV, str(out))
+    monkeypatch.setenv(instrument.RUN_ENV, "run2")
+    export = tmp_path / "export.csv"
+    export.write_text(
+        "site_name,buffer_m,year,mean_ndvi\nA,1000,1984,0.1\nA,1000,,0.2\nB,1000,1985,0.3\n"
+    )
+    n_rows, table = dig_io.read_clean_table(export, ["mean_ndvi"])
+    assert (n_rows, len(table)) == (3, 2)
+    assert [(r["stage"], r["items"]) for r in _records(out)] == [("read", 3), ("clean", 2)]
@@ -0,0 +1,125 @@
+import argparse
+import io
+import os
+import pickle
+
+import pytest
+
+from dig_eco import io as dig_io
+
+
+def test_iter_export_records_projects_columns_and_skips_geo() -> None:
+    text = (
+        "system:index,buffer_m,site_name,year,mean_ndvi,.geo\r\n"
+        '0_a,1000,Divisadero Mine,1984.0,0.29,"{""type"":""MultiPoint"",""coordinates"":[]}"\r\n'
+        "\r\n"
+        '0_b,2000,"Mine, North",1985.0,,"{""type"":""Point""}"\r\n'
+        "0_c,1000,Short Row\r\n"
+    )
+    records = list(
+        dig_io.iter_export_records(
+            io.StringIO(text, newline=""), ["site_name", "year", "mean_ndvi", "qa_flag"]
+        )
+    )
+    assert records == [
+        ["Divisadero Mine", "1984.0", "0.29", None],
+        ["Mine, North", "1985.0", "", None],
+        ["Short Row", None, None, None],
+    ]
+
+
+def test_read_partitions_matches_concatenated_single_file(tmp_path) -> None:
+    header = "site_name,buffer_m,year,mean_ndvi,.geo\n"
+    rows = [f'Site {i % 3},1000,{1984 + i},{i / 10},"{{}}"\n' for i in range(12)]
+    parts = []
+    for k in range(3):
+        part = tmp_path / f"export_part_{k}_of_3_1984_2025.csv"
+        part.write_text(header + "".join(rows[k::3]))
+        parts.append(part)
+    single = tmp_path / "export_1984_2025.csv"
+    single.write_text(header + "".join(r for k in range(3) for r in rows[k::3]))
+
+    assert dig_io.merged_base(parts) == tmp_path / "export_1984_2025"
+    assert dig_io.read_partitions(parts, ["mean_ndvi"], workers=2) == dig_io.read_clean_table(
+        single, ["mean_ndvi"]
+    )
+
+
+def test_clean_table_sorts_groups_and_writes_like_rows(tmp_path) -> None:
+    text = (
+        "site_name,site_id,buffer_m,year,image_count,qa_flag,mean_ndvi\n"
+        "B,b1,1000,1986,3,ok,0.3\n"
+        "A,a1,2000,1985,,ok,\n"
+        "A,a1,1000,1985,2,low,0.2\n"
+        " ,x,1000,1985,1,ok,0.9\n"
+        "A,a1,1000,1984.0,1,ok,0.1\n"
+    )
+    first = tmp_path / "part_0.csv"
+    first.write_text(text)
+    n_rows, table = dig_io.read_clean_table(first, ["mean_ndvi"])
+    assert (n_rows, len(table)) == (5, 4)
+
+    merged = dig_io.CleanTable(["mean_ndvi"])
+    merged.extend(pickle.loads(pickle.dumps(table)))
+    merged.extend(table)
+    assert merged.labels["site_name"] == ["B", "A"]
+    assert merged.column("site_name") == ["B", "A", "A", "A"] * 2
+
+    ordered = table.sorted()
+    assert list(ordered.group_ranges()) == [
+        ("A", "1000", 0, 2),
+        ("A", "2000", 2, 3),
+        ("B", "1000", 3, 4),
+    ]
+    assert ordered.points("mean_ndvi", 2, 3) == []
+    assert [(p.year, p.value) for p in ordered.points("mean_ndvi", 0, 2)] == [
+        (1984, 0.1),
+        (1985, 0.2),
+    ]
+
+    out = tmp_path / "clean.csv"
+    dig_io.write_table_csv(out, ordered)
+    assert out.read_text().splitlines() == [
+        "site_name,site_id,buffer_m,year,image_count,qa_flag,mean_ndvi",
+        "A,a1,1000,1984,1,ok,0.1",
+        "A,a1,1000,1985,2,low,0.2",
+        "A,a1,2000,1985,,ok,",
+        "B,b1,1000,1986,3,ok,0.3",
+    ]
+
+
+def test_table_cache_round_trips_and_goes_stale(tmp_path) -> None:
+    raw = tmp_path / "export.csv"
+    raw.write_text(
+        "site_name,buffer_m,year,image_count,mean_ndvi,valid_px_pct\n"
+        "A,1000,1984,2,0.1,90\nA,1000,1985,,,80\nB,2000,1984,1,-0.5,10\n"
+    )
+    _, table = dig_io.read_clean_table(raw, ["mean_ndvi", "valid_px_pct"])
+    clean = tmp_path / "export_clean.csv"
+    dig_io.write_table_csv(clean, table)
+    assert dig_io.load_table_cache(clean) is None
+    assert dig_io.read_clean_csv(clean) == table  # parses the CSV and writes the cache
+    cached = dig_io.load_table_cache(clean)
+    assert cached == table and cached.labels == table.labels
+
+    with clean.open("a") as f:
+        f.write("C,,1000,1990,3,ok,0.7,95\n")
+    assert dig_io.load_table_cache(clean) is None
+    assert dig_io.read_clean_csv(clean).column("site_name") == ["A", "A", "B", "C"]
+    assert len(dig_io.load_table_cache(clean)) == 4
+
+    # a truncated cache falls back to the CSV
+    cache = dig_io.table_cache_path(clean)
+    cache.write_bytes(cache.read_bytes()[:-8])
+    assert dig_io.load_table_cache(clean) is None
+    assert len(dig_io.read_clean_csv(clean)) == 4
+
+
+def test_workers_default_to_one_and_zero_means_every_cpu() -> None:
+    parser = argparse.ArgumentParser()
+    dig_io.add_workers_argument(parser, "test")
+    assert parser.parse_args([]).workers == 1
+    assert parser.parse_args(["--workers", "3"]).workers == 3
+    assert parser.parse_args(["--workers", "0"]).workers == (os.cpu_count() or 1)
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--workers", "-1"])
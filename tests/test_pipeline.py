@@ -0,0 +1,64 @@
+import csv
+import io
+from pathlib import Path
+
+import pytest
+
+from dig_eco import anomaly, pipeline, trends
+from dig_eco import render as plot
+
+FLAGS = "export_1990_2005_anomaly_flags.csv"
+COLUMNS = ["site_id", "site_name", "buffer_m", "year", "mean_ndvi", "mean_bsi", "bare_pct"]
+
+
+def write_export(path) -> None:
+    lines = [",".join([*COLUMNS, "valid_px_pct"])]
+    for s, site in enumerate(["Alpha", "Beta"]):
+        for y in range(1990, 2006):
+            step = 0.3 if y >= 1998 + s else 0.0  # a disturbance onset in every series
+            ndvi = 0.6 - 0.01 * (y - 1990) - step
+            lines.append(
+                f"{site.lower()},{site},1000,{y},{ndvi:.4f},{0.1 + step / 2:.4f},"
+                f"{5 + 40 * step + (y % 3):.2f},{90 + (y % 5)}"
+            )
+    path.write_text("\n".join(lines) + "\n")
+
+
+@pytest.mark.parametrize(
+    "metrics",
+    [
+        "mean_ndvi,mean_bsi,bare_pct,valid_px_pct",
+        "mean_ndvi,bare_pct,valid_px_pct",  # a strict subset of --anomaly-metrics
+    ],
+)
+def test_pipeline_matches_separate_stages(tmp_path, monkeypatch, metrics) -> None:
+    export = tmp_path / "src" / "export_1990_2005.csv"
+    export.parent.mkdir()
+    write_export(export)
+    outputs = {}
+    for mode in ("separate", "pipeline"):
+        workdir = tmp_path / mode
+        workdir.mkdir()
+        (workdir / export.name).write_bytes(export.read_bytes())
+        monkeypatch.chdir(workdir)  # the manifest records PNG paths as given
+        clean = "export_1990_2005_clean.csv"
+        common = ["--metrics", metrics, "--engine", "python"]
+        if mode == "separate":
+            trends.main(["--input", export.name, *common])
+            anomaly.main(["--input-clean", clean])
+            plot.main(["--input-clean", clean, "--outdir", "fig", "--workers", "1"])
+        else:
+            pipeline.main(
+                ["--input", export.name, *common, "--outdir", "fig", "--workers", "1"]
+                + ["--anomalies", "--clean-out", clean]
+            )
+        outputs[mode] = {
+            p.relative_to(workdir): p.read_bytes()
+            for p in workdir.rglob("*")
+            if p.is_file() and p.suffix != ".cols"  # the cache is stamped with the CSV's mtime
+        }
+
+    assert outputs["pipeline"] == outputs["separate"]
+    flags = list(csv.DictReader(io.StringIO(outputs["pipeline"][Path(FLAGS)].decode())))
+    assert flags
+    assert {row["metric"] for row in flags} <= set(metrics.split(","))
@@ -0,0 +1,152 @@
+import struct
+import zlib
+
+import pytest
+
+from dig_eco import render as plot
+
+
+def _jobs(outdir) -> list[plot.ChartJob]:
+    pts = [plot.Point(1984 + i, (i * 7 % 5) / 4) for i in range(12)]
+    return [
+        plot.ChartJob("Site A", "1000", "mean_ndvi", pts, outdir / "a.png"),
+        plot.ChartJob("Site B", "2000", "bare_pct", pts[::-1], outdir / "b.png"),
+    ]
+
+
+def test_parallel_rendering_matches_serial(tmp_path) -> None:
+    plot.render_charts(_jobs(tmp_path / "serial"), workers=1)
+    plot.render_charts(_jobs(tmp_path / "pool"), workers=2)
+    for name in ("a.png", "b.png"):
+        assert (tmp_path / "pool" / name).read_bytes() == (tmp_path / "serial" / name).read_bytes()
+
+
+def test_span_primitives_match_per_pixel_drawing() -> None:
+    fast = plot.Canvas(40, 30)
+    ref = plot.Canvas(40, 30)
+    c = (200, 10, 30)
+    fast.line(-5, 3, 50, 3, c)
+    fast.line(7, 35, 7, -2, c)
+    fast.draw_text(30, 20, "A1%", c, scale=2)
+    for x in range(40):
+        ref.set(x, 3, c)
+    for y in range(30):
+        ref.set(7, y, c)
+    for i, ch in enumerate("A1%"):
+        for gy, bits in enumerate(plot.FONT_5X7[ch]):
+            for gx, bit in enumerate(bits):
+                if bit == "1":
+                    for s in range(4):
+                        ref.set(30 + i * 12 + gx * 2 + s % 2, 20 + gy * 2 + s // 2, c)
+    assert fast.px == ref.px
+
+
+def _decode_png(data: bytes) -> tuple[int, int, bytes]:
+    """Minimal PNG decoder (filters 0-2, RGB or 4/8-bit palette) returning RGB pixels."""
+    pos, idat, ihdr, plte = 8, b"", b"", b""
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos : pos + 4])
+        tag, body = data[pos + 4 : pos + 8], data[pos + 8 : pos + 8 + length]
+        ihdr = body if tag == b"IHDR" else ihdr
+        plte = body if tag == b"PLTE" else plte
+        idat += body if tag == b"IDAT" else b""
+        pos += 12 + length
+    width, height, depth, color_type = struct.unpack(">IIBB", ihdr[:10])
+    bpp = 3 if color_type == 2 else 1
+    row_bytes = (width * bpp * depth + 7) // 8
+    raw = zlib.decompress(idat)
+    out, prev = bytearray(), bytearray(row_bytes)
+    for y in range(height):
+        ftype, row = raw[y * (row_bytes + 1)], bytearray(raw[y * (row_bytes + 1) + 1 :][:row_bytes])
+        for i in range(row_bytes):
+            if ftype == 1:
+                row[i] = (row[i] + (row[i - bpp] if i >= bpp else 0)) & 0xFF
+            elif ftype == 2:
+                row[i] = (row[i] + prev[i]) & 0xFF
+        prev = row
+        if color_type == 2:
+            out += row
+            continue
+        if depth == 4:
+            row = bytearray(b for byte in row for b in (byte >> 4, byte & 0xF))[:width]
+        out += b"".join(plte[3 * i : 3 * i + 3] for i in row)
+    return width, height, bytes(out)
+
+
+@pytest.mark.parametrize("png_filter", ["none", "sub", "up"])
+def test_png_encoder_round_trips(tmp_path, png_filter: str) -> None:
+    canvas = plot.Canvas(37, 23)
+    canvas.line(0, 0, 36, 22, (250, 3, 129))
+    canvas.draw_text(2, 8, "0.5", (0, 0, 0))
+    out = tmp_path / "c.png"
+    plot.write_png_rgb(out, 37, 23, canvas.px, plot.PngOptions(filter=png_filter, idat_size=64))
+    assert _decode_png(out.read_bytes()) == (37, 23, bytes(canvas.px))
+
+
+@pytest.mark.parametrize("colors", [5, 40])
+def test_palette_canvas_encodes_same_image_as_rgb(tmp_path, colors: int) -> None:
+    rgb = plot.Canvas(31, 17)
+    indexed = plot.Canvas(31, 17, palette=True)
+    for canvas in (rgb, indexed):
+        for i in range(colors):
+            canvas.line(i % 31, 0, 30 - i % 31, 16, (i * 6, 255 - i, 90))
+        canvas.draw_text(1, 5, "42", (0, 0, 0))
+    assert len(indexed.px) * 3 == len(rgb.px)
+    out = tmp_path / "p.png"
+    indexed.save_png(out, plot.PngOptions(filter="sub"))
+    assert _decode_png(out.read_bytes()) == (31, 17, bytes(rgb.px))
+
+
+def test_content_hash_tracks_points_labels_and_encoding(tmp_path) -> None:
+    job, other = _jobs(tmp_path)
+    same = plot.ChartJob(job.site_name, job.buffer_m, job.metric, list(job.points), job.out_png)
+    assert same.content_hash() == job.content_hash()
+    assert other.content_hash() != job.content_hash()
+    assert job.content_hash(plot.PngOptions(palette=True)) != job.content_hash()
+    same.points[3] = plot.Point(same.points[3].year, 9.0)
+    assert same.content_hash() != job.content_hash()
+
+
+def test_frame_overlays_stay_on_top_of_long_titles(tmp_path) -> None:
+    pts = [plot.Point(1984 + i, float(i % 3)) for i in range(8)]
+    frame = plot.chart_frame(1100, 700, 6, "Year", False)
+    before = bytes(frame.px)
+    out = tmp_path / "long.png"
+    plot.draw_series_png(out, pts, "W" * 100, "Year", "Value")
+    assert bytes(frame.px) == before
+    w, _, pixels = _decode_png(out.read_bytes())
+    # top-left pixel of the legend's "T", underneath the title row
+    i = (30 * w + 10) * 3
+    assert tuple(pixels[i : i + 3]) == plot.TREND_C
+
+
+@pytest.mark.parametrize("palette", [False, True])
+def test_contact_sheet_panels_crop_to_single_panel_renders(tmp_path, palette: bool) -> None:
+    out = tmp_path / "sheet.png"
+    panels = [
+        plot.ChartJob("Site A", "1000", metric, pts, out, width=300, height=260)
+        for metric, pts in (
+            ("mean_ndvi", [plot.Point(1990 + i, float(i % 4)) for i in range(10)]),
+            ("bare_pct", [plot.Point(1985 + i, float(i * i)) for i in range(6)]),
+            ("mean_bsi", [plot.Point(1995 + i, float(-i)) for i in range(12)]),
+        )
+    ]
+    job = plot.SheetJob("Site A", "1000", panels, out, cols=2)
+    plot.render_sheet(job, plot.PngOptions(palette=palette))
+    w, h, pixels = _decode_png(out.read_bytes())
+    assert (w, h) == job.size() == (600, 520)
+    for panel, (x0, y0) in zip(panels, job.offsets(), strict=True):
+        _, x_label, y_label = panel.labels()
+        ref = plot.render_series(
+            panel.points,
+            panel.metric.replace("_", " "),
+            x_label,
+            y_label,
+            300,
+            260,
+            x_range=(1985, 2006),
+        )
+        crop = b"".join(
+            pixels[((y0 + y) * w + x0) * 3 : ((y0 + y) * w + x0 + 300) * 3] for y in range(260)
+        )
+        assert crop == bytes(ref.px)
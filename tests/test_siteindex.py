@@ -0,0 +1,112 @@
+import os
+from contextlib import closing
+
+import pytest
+
+from dig_eco import io as dig_io
+from dig_eco import siteindex
+
+EXPORT = (
+    "system:index,site_id,site_name,buffer_m,year,mean_ndvi,.geo\n"
+    '0_a,s1,Alpha,1000,1984.0,0.1,"{""type"":""Point""}"\n'
+    '0_b,s1,Alpha,1000,1985.0,0.2,"{""type"":""Point""}"\n'
+    '0_c,s2,"Beta, North",1000,1984.0,0.3,"{""type"":\n""Point""}"\n'
+    '0_d,s1,Alpha,2000,1990.0,0.4,"{}"\n'
+    '0_e,s1,Alpha,1000,1986.0,0.5,"{}"\n'
+)
+
+
+def test_index_records_byte_ranges_of_each_site_in_the_export(tmp_path) -> None:
+    export = tmp_path / "export.csv"
+    export.write_bytes(EXPORT.encode())
+    with closing(siteindex.load_index(export)) as con:
+        info = siteindex.index_info(con)
+        spans = con.execute(
+            "SELECT site, buffer_m, n_rows, first_year, last_year FROM spans ORDER BY rowid"
+        ).fetchall()
+        alpha = siteindex.find_spans(con, ["Alpha"], ["1000"])
+        beta = siteindex.find_spans(con, ["s2"], None)
+        plan = " ".join(
+            row[-1]
+            for row in con.execute(
+                "EXPLAIN QUERY PLAN SELECT ranges FROM spans WHERE site = ? AND buffer_m = ?",
+                ("s1", "1000"),
+            )
+        )
+
+    assert (info["rows"], info["years"], info["clustered"]) == (5, [1984, 1990], False)
+    assert "USING INDEX" in plan
+    assert spans == [
+        ("s1", "1000", 3, 1984, 1986),
+        ("s2", "1000", 1, 1984, 1984),
+        ("s1", "2000", 1, 1990, 1990),
+    ]
+    # ranges point into the export itself: 0_a and 0_b merged, then 0_e
+    data = export.read_bytes()
+    assert [data[a:b].decode()[:3] for a, b in alpha] == ["0_a", "0_e"]
+    assert data[alpha[0][0] : alpha[0][1]].decode().count("\n") == 2
+    assert data[beta[0][0] : beta[0][1]].startswith(b'0_c,s2,"Beta, North"')
+    assert not siteindex.rows_path(export).exists()
+
+
+def test_cluster_copy_is_opt_in_and_one_range_per_site(tmp_path) -> None:
+    export = tmp_path / "export.csv"
+    export.write_bytes(EXPORT.encode())
+    dig_io.read_clean_table(export, ["mean_ndvi"], ["Alpha"])
+    assert not siteindex.rows_path(export).exists()  # a filtered read writes no copy
+
+    siteindex.main([str(export), "--cluster"])
+    with closing(siteindex.load_index(export)) as con:
+        assert siteindex.index_info(con)["clustered"]
+        (alpha,) = siteindex.find_spans(con, ["Alpha"], ["1000"])
+    rows = siteindex.rows_path(export).read_bytes()
+    assert [line[:3] for line in rows[alpha[0] : alpha[1]].decode().splitlines()] == [
+        "0_a",
+        "0_b",
+        "0_e",
+    ]
+
+    siteindex.main([str(export), "--no-cluster"])
+    assert not siteindex.rows_path(export).exists()
+
+
+@pytest.mark.parametrize("cluster", [False, True])
+def test_filtered_read_matches_full_read(tmp_path, monkeypatch, cluster) -> None:
+    monkeypatch.setattr(siteindex, "READ_BLOCK", 16)  # ranges decoded over many blocks
+    export = tmp_path / "export.csv"
+    export.write_bytes(EXPORT.encode())
+    siteindex.build_index(export, cluster)
+    _, full = dig_io.read_clean_table(export, ["mean_ndvi"])
+    for sites, buffers in [(["Alpha"], ["1000"]), (["s2"], None), (None, ["2000"])]:
+        _, subset = dig_io.read_clean_table(export, ["mean_ndvi"], sites, buffers)
+        keep = [
+            i
+            for i in range(len(full))
+            if (not sites or {full.column("site_id")[i], full.column("site_name")[i]} & set(sites))
+            and (not buffers or full.column("buffer_m")[i] in buffers)
+        ]
+        if cluster:
+            assert subset.sorted() == full.take(keep).sorted()
+        else:
+            assert subset == full.take(keep)  # in file order
+
+
+def test_stale_index_is_rebuilt(tmp_path) -> None:
+    export = tmp_path / "export.csv"
+    export.write_bytes(EXPORT.encode())
+    with closing(siteindex.load_index(export)) as con:
+        assert siteindex.index_info(con)["rows"] == 5
+
+    export.write_bytes(EXPORT.encode() + b'0_f,s3,Gamma,1000,2001,0.6,"{}"\n')
+    st = export.stat()
+    os.utime(export, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    _, table = dig_io.read_clean_table(export, ["mean_ndvi"], ["Gamma"])
+    assert table.column("site_name") == ["Gamma"]
+    with closing(siteindex.load_index(export)) as con:
+        assert siteindex.index_info(con)["rows"] == 6
+
+    siteindex.build_index(export, cluster=True)
+    siteindex.rows_path(export).write_bytes(b"")  # a damaged copy is rebuilt, still clustered
+    _, table = dig_io.read_clean_table(export, ["mean_ndvi"], ["Gamma"])
+    assert table.column("site_name") == ["Gamma"]
+    assert siteindex.rows_path(export).stat().st_size > 0
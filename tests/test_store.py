@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from dig_eco import store
+from dig_eco.io import Point
+
+HEADER = (
+    "system:index,site_buffer_key,site_year_key,site_id,site_name,buffer_m,year,mean_ndvi,.geo\n"
+)
+
+
+def _row(site: str, buffer_m: int, year: int, ndvi: str) -> str:
+    return f'x,{site}_{buffer_m},{site}_{year}.0,{site},{site},{buffer_m},{year}.0,{ndvi},"{{}}"\n'
+
+
+def test_ingest_upserts_and_skips_unchanged_files(tmp_path) -> None:
+    export = tmp_path / "export.csv"
+    export.write_text(
+        HEADER + "".join(_row("A", 1000, y, str(y - 2000)) for y in range(2000, 2010))
+    )
+    con = store.connect(tmp_path / "mrds.sqlite")
+    assert store.ingest(con, [export], ["mean_ndvi"]) == (1, 10)
+    assert store.ingest(con, [export], ["mean_ndvi"]) == (0, 0)
+
+    # a re-export revising one year and adding another updates rows in place
+    export.write_text(HEADER + _row("A", 1000, 2005, "") + _row("A", 1000, 2010, "10"))
+    os.utime(export, ns=(1, 1))
+    assert store.ingest(con, [export], ["mean_ndvi", "bare_pct"]) == (1, 2)
+    assert con.execute("SELECT COUNT(*) FROM observations").fetchone() == (11,)
+    keys, series = store.query_series(con, ["mean_ndvi"])
+    assert keys == [("A", "1000", "mean_ndvi")]
+    assert [p.year for p in series[0]] == [y for y in range(2000, 2011) if y != 2005]
+
+
+def test_query_series_filters_by_site_buffer_and_years(tmp_path) -> None:
+    export = tmp_path / "export.csv"
+    rows = [
+        _row(site, buffer_m, y, str(0.1 * y))
+        for site in ("A", "B")
+        for buffer_m in (1000, 2000)
+        for y in range(2008, 2016)
+    ]
+    export.write_text(HEADER + "".join(rows))
+    con = store.connect(tmp_path / "mrds.sqlite")
+    store.ingest(con, [export], ["mean_ndvi", "bare_pct"])
+
+    keys, series = store.query_series(
+        con, ["mean_ndvi", "bare_pct"], sites=["B"], buffers=["2000"], since=2013
+    )
+    assert keys == [("B", "2000", "mean_ndvi"), ("B", "2000", "bare_pct")]
+    assert series == [[Point(y, 0.1 * y) for y in (2013, 2014, 2015)], []]
+    with pytest.raises(ValueError, match="not in the store"):
+        store.query_series(con, ["mean_bsi"])
+
+
+def test_clean_csv_rows_get_gee_style_keys(tmp_path) -> None:
+    clean = tmp_path / "export_clean.csv"
+    clean.write_text(
+        "site_name,site_id,buffer_m,year,image_count,qa_flag,mean_ndvi\nA,A_01,1000,1984,2,ok,0.5\n"
+    )
+    (row,) = store.store_rows(clean, ["mean_ndvi"])
+    assert row[:2] == ("A_01_1000", "A_01_1984")
+    assert row[-1] == 0.5
+
+
+def test_buffer_and_year_query_uses_an_index(tmp_path) -> None:
+    con = store.connect(tmp_path / "mrds.sqlite")
+    store.ensure_metrics(con, ["mean_ndvi"])
+    sql, params = store.series_query(["mean_ndvi"], buffers=["2000"], since=2013)
+    plan = " ".join(row[-1] for row in con.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    # a SEARCH, not a SCAN of the whole table in (site_name, buffer_m, year) order
+    assert "SEARCH observations USING INDEX observations_buffer_year" in plan
+
+
+def test_ingest_keeps_metrics_a_file_lacks(tmp_path) -> None:
+    export = tmp_path / "export.csv"
+    export.write_text(HEADER + _row("A", 1000, 2000, "0.5"))
+    con = store.connect(tmp_path / "mrds.sqlite")
+    store.ingest(con, [export], ["mean_ndvi"])
+
+    # a later export of the same site-year with only bare_pct leaves mean_ndvi alone
+    other = tmp_path / "bare.csv"
+    other.write_text(
+        "site_buffer_key,site_year_key,site_id,site_name,buffer_m,year,bare_pct\n"
+        "A_1000,A_2000.0,A,A,1000,2000.0,12\n"
+    )
+    assert store.ingest(con, [other], ["mean_ndvi", "bare_pct"]) == (1, 1)
+    assert con.execute("SELECT mean_ndvi, bare_pct, source FROM observations").fetchall() == [
+        (0.5, 12.0, str(other))
+    ]
+
+
+def test_unchanged_file_is_reingested_for_new_metrics(tmp_path) -> None:
+    export = tmp_path / "export.csv"
+    export.write_text(
+        "site_buffer_key,site_year_key,site_id,site_name,buffer_m,year,mean_ndvi,bare_pct\n"
+        "A_1000,A_2000.0,A,A,1000,2000.0,0.5,12\n"
+    )
+    con = store.connect(tmp_path / "mrds.sqlite")
+    assert store.ingest(con, [export], ["mean_ndvi"]) == (1, 1)
+    assert store.ingest(con, [export], ["mean_ndvi", "bare_pct"]) == (1, 1)
+    assert store.ingest(con, [export], ["bare_pct"]) == (0, 0)
+    assert con.execute("SELECT mean_ndvi, bare_pct FROM observations").fetchall() == [(0.5, 12.0)]
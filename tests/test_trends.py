@@ -0,0 +1,136 @@
+import math
+import random
+from bisect import bisect_left
+from statistics import median
+
+import pytest
+
+from dig_eco import trends as t
+
+
+def _random_series(rng: random.Random) -> list[t.Point]:
+    n = rng.choice([0, 1, 2, 5, 12, 40])
+    years = sorted(rng.sample(range(1984, 2026), n))
+    pts = [t.Point(year=y, value=rng.uniform(-1, 100)) for y in years]
+    if pts and rng.random() < 0.2:
+        pts[0].value = 0.0
+    return pts
+
+
+def test_batch_summary_matches_per_group() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    series = [_random_series(rng) for _ in range(200)]
+    series.append([t.Point(2000, 1.0), t.Point(2000, 2.0), t.Point(2000, 3.0)])
+    keys = [(f"site {i}", "1000", "mean_ndvi") for i in range(len(series))]
+
+    expected = [t.summarize_series(*k, pts, 2) for k, pts in zip(keys, series, strict=True)]
+    assert t.summarize_batch(keys, series, 2) == expected
+
+
+def test_mann_kendall_tie_correction_matches_batch() -> None:
+    pts = [t.Point(2000 + i, v) for i, v in enumerate([1.0, 2.0, 2.0, 3.0])]
+    s, z, p = t.mann_kendall(pts)
+    # ties {2.0: 2} remove 2*1*9 from n(n-1)(2n+5) = 156
+    assert s == 5
+    assert z == pytest.approx(4 / math.sqrt(138 / 18))
+    assert p == pytest.approx(math.erfc(z / math.sqrt(2)))
+
+    pytest.importorskip("numpy")
+    rng = random.Random(3)
+    series = [pts] + [
+        [t.Point(2000 + i, float(rng.randint(0, 3))) for i in range(rng.randint(2, 30))]
+        for _ in range(50)
+    ]
+    years, values, counts = t.pack_series(series)
+    batch = zip(*(col.tolist() for col in t.batch_mann_kendall(values, counts)), strict=True)
+    assert list(batch) == [t.mann_kendall(p) for p in series]
+
+
+def test_bootstrap_resamples_match_brute_force_theil_sen() -> None:
+    np = pytest.importorskip("numpy")
+    rng = random.Random(11)
+    series = [_random_series(rng) for _ in range(30)]
+    keys = [(f"site {i}", "1000", "bare_pct") for i in range(len(series))]
+    years, values, counts = t.pack_series(series)
+    estimates = t.batch_bootstrap_theil_sen(keys, years, values, counts, 40, seed=5)
+    for key, pts, row in zip(keys, series, estimates, strict=True):
+        if len(pts) < 2:
+            assert np.isnan(row).all()
+            continue
+        for draw, est in zip(t.bootstrap_draws(key, len(pts), 40, 5), row.tolist(), strict=True):
+            ref = t.theil_sen_slope(sorted((pts[i] for i in draw), key=lambda p: p.year))
+            assert est == ref or (ref is None and math.isnan(est))
+
+    # resamples are keyed by group, so a subset reproduces the same intervals
+    full = t.summarize_batch(keys, series, 2, n_boot=200, seed=1)
+    part = t.summarize_batch(keys[5:9], series[5:9], 2, n_boot=200, seed=1)
+    assert part == full[5:9]
+    assert any(row["theil_sen_ci_low"] is not None for row in part)
+
+
+def _brute_theil_sen(points: list[t.Point]) -> float | None:
+    slopes = [
+        (b.value - a.value) / (b.year - a.year)
+        for i, a in enumerate(points)
+        for b in points[i + 1 :]
+        if b.year != a.year
+    ]
+    return float(median(slopes)) if slopes else None
+
+
+@pytest.mark.parametrize("zero_share", [0.0, 0.8])
+def test_theil_sen_selection_matches_brute_force(monkeypatch, zero_share: float) -> None:
+    monkeypatch.setattr(t, "THEIL_SEN_SELECT_MIN_POINTS", 2)
+    rng = random.Random(11)
+    for n in (2, 3, 40, 400, 1200):
+        years = sorted(rng.randrange(1984, 1984 + n) for _ in range(n))
+        pts = [t.Point(y, 0.0 if rng.random() < zero_share else rng.gauss(0, 1)) for y in years]
+        assert repr(t.theil_sen_slope(pts)) == repr(_brute_theil_sen(pts))
+
+
+def test_theil_sen_approx_rank_error_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(t, "THEIL_SEN_APPROX_COST_RATIO", math.inf)  # sample even at n=600
+    rng = random.Random(5)
+    pts = [t.Point(i, 0.01 * i + rng.gauss(0, 1)) for i in range(600)]
+    slopes = sorted(
+        (b.value - a.value) / (b.year - a.year) for i, a in enumerate(pts) for b in pts[i + 1 :]
+    )
+    approx = t.theil_sen_slope_approx(pts, eps=0.01)
+    rank = bisect_left(slopes, approx) / len(slopes)
+    assert abs(rank - 0.5) <= 0.01
+
+
+def test_theil_sen_approx_is_exact_where_sampling_is_slower() -> None:
+    rng = random.Random(6)
+    pts = [t.Point(i, 0.01 * i + rng.gauss(0, 1)) for i in range(2000)]
+    assert t.theil_sen_slope_approx(pts) == t.theil_sen_slope(pts)
+    assert t.theil_sen_slope_approx(pts, eps=0.05) != t.theil_sen_slope(pts)
+
+
+def test_summarize_cached_refits_only_changed_groups(tmp_path) -> None:
+    keys = [("Site A", "1000", "mean_ndvi"), ("Site B", "1000", "mean_ndvi")]
+    series = [
+        [t.Point(1984 + i, 0.1 * i) for i in range(10)],
+        [t.Point(1984 + i, 0.2 * i) for i in range(10)],
+    ]
+    refit: list[tuple[str, str, str]] = []
+
+    def summarize(ks, ss):
+        refit.extend(ks)
+        return [t.summarize_series(*k, pts, 8) for k, pts in zip(ks, ss, strict=True)]
+
+    path = tmp_path / "trend_cache.json"
+    params = {"min_years": 8}
+    rows, cache, _ = t.summarize_cached(keys, series, t.load_trend_cache(path, params), summarize)
+    t.save_trend_cache(path, params, cache)
+
+    series[1].append(t.Point(1994, 5.0))
+    refit.clear()
+    rows2, _, n_refit = t.summarize_cached(
+        keys, series, t.load_trend_cache(path, params), summarize
+    )
+    assert n_refit == 1 and refit == [keys[1]]
+    assert rows2[0] == rows[0]
+    assert rows2[1] == t.summarize_series(*keys[1], series[1], 8)
+    assert t.load_trend_cache(path, {"min_years": 5}) == {}